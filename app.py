@@ -1,67 +1,181 @@
 # app/app.py
-import pandas as pd
-import plotly.graph_objects as go
 import streamlit as st
-from datetime import datetime, timedelta, timezone
-from collections import defaultdict
-
-from utils.format import fnum
-from services.upbit import fetch_usdt_krw
-from services.bitget import fetch_positions, fetch_account, fetch_account_bills, fetch_kline_futures
-from services.history import try_record_snapshot, load_history
-from services.fund import get_nav_metrics
+from dataclasses import replace
+
 from ui.styles import inject as inject_styles
-from ui.chart import render_chart
-from ui.cards import render_top_bar, render_left_summary
-from ui.table import render_bottom_section
+from utils.telemetry import span, start_metrics_server
+
+# pandas/plotly와 services/*, ui/* 는 첫 사용 시점에 import (bench/startup.py로 측정)
+# -> 페이지 설정과 CSS가 먼저 그려지고, 무거운 모듈 로딩은 첫 틱에서 한 번만 발생
+#    (이후 실행에서는 sys.modules 조회뿐이라 비용 없음)
 
 # Config
 PRODUCT_TYPE = "USDT-FUTURES"
 MARGIN_COIN = "USDT"
+FETCH_TIMEOUT = 8  # 호출별 최대 대기 시간(초)
+SNAPSHOT_TTL = 10  # 이 시간 동안은 모든 세션이 같은 스냅샷을 공유
+SNAPSHOT_MAX_STALE = 60  # 이 시간까지는 오래된 스냅샷을 먼저 보여주고 백그라운드 갱신
+COLLECTOR_STALE = 30  # 수집기 스냅샷이 이보다 오래되면 수집기가 멈춘 것으로 보고 직접 조회
+
+# 프로세스 전역 1개 (계정 구성별) -> 접속자 수와 무관하게 API 호출량 고정
+# 모든 계정/상품 조합을 동시에 조회해 하나의 통합 스냅샷으로 합침
+@st.cache_resource
+def get_snapshot_service(accounts):
+    from services.snapshot import SnapshotService
+    from services.portfolio import load_portfolio_snapshot
+    def loader(previous):
+        return load_portfolio_snapshot(accounts, timeout=FETCH_TIMEOUT, previous=previous)
+    return SnapshotService(loader, ttl=SNAPSHOT_TTL, max_stale=SNAPSHOT_MAX_STALE)
+
+# Prometheus 텍스트 익스포트 (secrets.toml의 [telemetry] port 설정 시, 프로세스당 1회)
+@st.cache_resource
+def get_metrics_server(port):
+    return start_metrics_server(port)
+
+# 스트리밍 모드: WS로 유지되는 인메모리 상태 (프로세스 전역 1개)
+@st.cache_resource
+def get_stream(api_key, api_secret, passphrase):
+    from services.snapshot import load_live_snapshot
+    from services.bitget_ws import BitgetStream
+    def resync():
+        return load_live_snapshot(api_key, api_secret, passphrase, PRODUCT_TYPE, MARGIN_COIN, timeout=FETCH_TIMEOUT)
+    return BitgetStream(api_key, api_secret, passphrase, PRODUCT_TYPE, MARGIN_COIN, resync=resync).start()
+
+def read_snapshot(accounts, stream_mode=False):
+    """
+    Returns: (snapshot, read_only)
+    collector.py가 동작 중이면 그 스냅샷만 읽고(read_only=True) API 호출/기록은 하지 않음
+    """
+    from services.snapshot import load_published_snapshot
+    from services.upbit import fetch_usdt_krw
+    published = load_published_snapshot(max_age=COLLECTOR_STALE)
+    if published is not None:
+        return published, True
+    if stream_mode:
+        # WS 스트리밍은 기본 계정의 USDT-FUTURES만 지원
+        # 환율은 WS 대상이 아니므로 기존 캐시(60s)를 사용
+        return replace(get_stream(*accounts[0].creds).snapshot(), usdt_rate=fetch_usdt_krw()), False
+    return get_snapshot_service(accounts).get(), False
 
 # [핵심 변경 1] 10초마다 이 함수 내부만 부분 새로고침 (전체 리로딩 X)
 # 주의: Streamlit 1.37 이상 버전 필요 (requirements.txt 확인)
 @st.fragment(run_every=10)
-def run_dashboard(api_key, api_secret, passphrase):
+def run_dashboard(accounts, stream_mode=False, debug=False):
+    with span("tick"):
+        _render_tick(accounts, stream_mode)
+    if debug:
+        from ui.debug import render_debug_panel
+        render_debug_panel()
+
+# 재현 모드 (?replay=1): 스냅샷 로그에서 고른 시점을 라이브와 같은 render_* 경로로 그림
+# 자동 갱신 없이 시점을 바꿀 때만 이 부분이 다시 실행됨
+@st.fragment
+def run_replay(accounts, debug=False):
+    from services.replay import load_frame
+    from ui.replay import render_replay_bar, render_replay_caption
+    at = render_replay_bar()
+    if at is None:
+        return
+    frame = load_frame(at)
+    if frame is None:
+        st.info("선택한 시각 이전에 기록된 스냅샷이 없습니다.")
+        return
+    render_replay_caption(frame)
+    with span("tick"):
+        _render_tick(accounts, False, replay=frame)
+    if debug:
+        from ui.debug import render_debug_panel
+        render_debug_panel()
+
+def _fund_admin_enabled():
+    # secrets.toml의 [fund] admin = false 이면 입출금 기록 폼을 숨김 (조회 전용 배포)
+    return bool(st.secrets.get("fund", {}).get("admin", True))
+
+def _render_tick(accounts, stream_mode, replay=None):
+    with span("tick.imports"):
+        from utils.format import fnum
+        from services.history import try_record_snapshot, load_history
+        from services.timeseries import record_tick
+        from services.series import get_equity_series
+        from services.metrics import get_risk_engine
+        from services.fund import get_nav_metrics
+        from services.positions import frame_for, summarize
+        from services.snaplog import record_snapshot
+        from services.ledger import sync_in_background
+        from ui.chart import render_chart
+        from ui.cards import render_top_bar, render_left_summary
+        from ui.table import render_bottom_section
+
     # ---------------------------
     # 1. Data Fetch
     # ---------------------------
-    # API 호출이 실패해도 화면이 깨지지 않도록 예외처리 권장
-    try:
-        pos_data, _ = fetch_positions(api_key, api_secret, passphrase, PRODUCT_TYPE, MARGIN_COIN)
-        acct_data, _ = fetch_account(api_key, api_secret, passphrase, PRODUCT_TYPE, MARGIN_COIN)
-        usdt_rate = fetch_usdt_krw()
-    except Exception as e:
-        st.error(f"API Error: {e}")
-        return
+    # 모든 세션이 공유하는 스냅샷을 읽음 (수집기 발행본 / 폴링: SNAPSHOT_TTL당 1회 / 스트리밍: WS 상태)
+    # 재현 모드는 로그에서 읽은 스냅샷을 그대로 사용하고 아무것도 기록하지 않음
+    if replay is not None:
+        snap, read_only = replay.snapshot, True
+    else:
+        with span("tick.snapshot"):
+            snap, read_only = read_snapshot(accounts, stream_mode)
+    if not read_only:
+        # 원본 스냅샷을 압축 로그에 남김 (같은 fetched_at은 1회만)
+        record_snapshot(snap)
+        # 수집기가 없으면 bill 장부도 대시보드 프로세스가 백그라운드로 동기화 (손익 분석 탭)
+        sync_in_background(accounts)
+    pos_data, acct_data, usdt_rate = snap.positions, snap.account, snap.usdt_rate
+    if snap.errors:
+        st.warning("일부 데이터 조회 실패: " + ", ".join(f"{k} ({v})" for k, v in snap.errors.items()))
 
     # Metrics Calc
     available = fnum(acct_data.get("available")) if acct_data else 0.0
     equity = fnum(acct_data.get("usdtEquity")) if acct_data else available
     
-    upl_pnl = sum(fnum(p.get("unrealizedPL",0)) for p in pos_data)
-    margin_used = sum(fnum(p.get("marginSize",0)) for p in pos_data)
-    
-    roe = (upl_pnl / equity * 100) if equity > 0 else 0
-    usage_pct = (margin_used / equity * 100) if equity > 0 else 0
-    leverage = (sum(fnum(p.get("marginSize",0)) * fnum(p.get("leverage",0)) for p in pos_data) / equity) if equity > 0 else 0
+    # 포지션은 스냅샷당 한 번만 파싱하고 집계값을 모든 컴포넌트가 공유
+    with span("tick.positions"):
+        pos_df = frame_for(pos_data)
+        pos_summary = summarize(pos_df, equity)
+    upl_pnl = pos_summary["upl"]
+    margin_used = pos_summary["margin_used"]
+    leverage = pos_summary["leverage"]
 
     # History & NAV
-    history_df, _ = try_record_snapshot(equity)
-    nav_data = get_nav_metrics(equity, history_df)
+    # 수집기가 기록을 담당하면 읽기만 함 / 계좌 조회 실패 시 0 자산이 기록되지 않도록 저장은 건너뜀
+    if acct_data and not read_only:
+        history_df, _ = try_record_snapshot(equity)
+        # 틱 단위 기록 (스냅샷 시각 기준이라 세션이 여러 개여도 1회만 저장)
+        record_tick(equity, upl_pnl, margin_used, ts=snap.fetched_at)
+    elif replay is not None:
+        history_df = replay.history
+    else:
+        history_df = load_history()
+    with span("tick.nav"):
+        nav_data = get_nav_metrics(equity, history_df)
+
+    # 차트용 시계열은 프로세스 전역 캐시에서 끝 부분만 갱신 (재현 모드는 그 시점까지만 담은 별도 인스턴스)
+    if replay is not None:
+        series, risk = replay.series, replay.risk
+    else:
+        with span("tick.series"):
+            series = get_equity_series()
+            series.sync_daily(history_df)
+            risk = get_risk_engine()
+            risk.sync(history_df)
 
     # ---------------------------
     # 2. Layout Render
     # ---------------------------
-    render_top_bar(equity, available, leverage, usdt_rate=usdt_rate)
+    with span("ui.top_bar"):
+        render_top_bar(equity, available, leverage, usdt_rate=usdt_rate)
     
     c1, c2 = st.columns([1, 3])
-    with c1:
-        render_left_summary(equity, usage_pct, upl_pnl, roe, pos_data, usdt_rate=usdt_rate)
-    with c2:
-        render_chart(history_df, equity, usdt_rate=usdt_rate)
+    with c1, span("ui.left_summary"):
+        render_left_summary(equity, pos_summary, usdt_rate=usdt_rate)
+    with c2, span("ui.chart"):
+        render_chart(series, equity, usdt_rate=usdt_rate, risk=risk)
 
-    render_bottom_section(st, pos_data, nav_data, usdt_rate=usdt_rate)
+    with span("ui.bottom"):
+        render_bottom_section(st, pos_df, nav_data, usdt_rate=usdt_rate, breakdown=snap.breakdown, equity=equity,
+                              history_df=history_df, fund_admin=replay is None and _fund_admin_enabled(),
+                              market=replay is None)
     
     # [핵심 변경 2] time.sleep() 및 st.rerun() 삭제됨
 
@@ -73,12 +187,26 @@ def main():
         st.error("Secrets required")
         st.stop()
         
-    api_key = st.secrets["bitget"]["api_key"]
-    api_secret = st.secrets["bitget"]["api_secret"]
-    passphrase = st.secrets["bitget"]["passphrase"]
+    from services.portfolio import load_accounts
+    # [bitget] 기본 계정 + [[bitget.accounts]] 서브 계정, product_types로 상품 유형 지정
+    accounts = tuple(load_accounts(st.secrets["bitget"]))
+    if not accounts:
+        st.error("Secrets required")
+        st.stop()
+    # secrets.toml의 [bitget] stream = true 이면 WS 스트리밍 모드
+    stream_mode = bool(st.secrets["bitget"].get("stream", False))
+    metrics_port = st.secrets.get("telemetry", {}).get("port")
+    if metrics_port:
+        get_metrics_server(int(metrics_port))
+    # URL에 ?debug=1 을 붙이면 구간별 지연 패널 표시
+    debug = st.query_params.get("debug") == "1"
+    # URL에 ?replay=1 을 붙이면 기록된 스냅샷으로 과거 화면 재현
+    if st.query_params.get("replay") == "1":
+        run_replay(accounts, debug)
+        return
     
     # 대시보드 루프 실행
-    run_dashboard(api_key, api_secret, passphrase)
+    run_dashboard(accounts, stream_mode, debug)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,47 @@
+# bench/record.py
+"""
+실제 API 응답을 bench/fixtures/ 에 다시 녹화 (네트워크 + 자격 증명 필요)
+
+    python -m bench.record
+
+자격 증명은 collector.py와 같은 방식(환경변수 또는 .streamlit/secrets.toml)으로 읽습니다.
+녹화본에는 실제 포지션/잔고가 들어가므로 커밋 전에 확인할 것.
+"""
+import json
+import os
+
+from bench.replay import FIXTURE_DIR, ROUTES
+from collector import load_credentials
+from services.bitget import _private_get, _acquire, _send, BASE_URL
+from services.ratelimit import PUBLIC_KEY, PRIORITY_HIGH
+from services.http import http_get
+
+PRODUCT_TYPE = "USDT-FUTURES"
+
+def main():
+    creds = load_credentials()[0].creds
+    private = {
+        "/api/v2/mix/position/all-position": {"productType": PRODUCT_TYPE, "marginCoin": "USDT"},
+        "/api/v2/mix/account/accounts": {"productType": PRODUCT_TYPE},
+        "/api/v2/mix/account/bill": {"productType": PRODUCT_TYPE, "limit": "100"},
+    }
+    recorded = {path: _private_get(*creds, path, params) for path, params in private.items()}
+    path = "/api/v2/mix/market/candles"
+    recorded[path] = (_acquire(path, PUBLIC_KEY, PRIORITY_HIGH)
+                      or _send(path, PUBLIC_KEY, f"{BASE_URL}{path}",
+                               params={"symbol": "BTCUSDT", "granularity": "1H", "productType": PRODUCT_TYPE, "limit": "200"}))
+    recorded["/v1/ticker"] = http_get("https://api.upbit.com/v1/ticker", params={"markets": "KRW-USDT"}, timeout=5).json()
+
+    for path, body in recorded.items():
+        if isinstance(body, dict):
+            body.pop("httpStatus", None)
+            if body.get("code") != "00000":
+                print(f"skip {path}: {body.get('code')} {body.get('msg')}")
+                continue
+        out = os.path.join(FIXTURE_DIR, ROUTES[path])
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(body, f, indent=1, ensure_ascii=False)
+        print(f"recorded {path} -> {out}")
+
+if __name__ == "__main__":
+    main()
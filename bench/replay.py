@@ -0,0 +1,70 @@
+# bench/replay.py
+"""
+녹화된 JSON 응답을 공용 HTTP 세션에 끼워 넣는 transport adapter
+네트워크 없이 services/* 의 실제 코드 경로(서명, 리미터, 파싱)를 그대로 실행합니다.
+"""
+import json
+import os
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+
+from services.http import get_session
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 요청 경로 -> 픽스처 파일
+ROUTES = {
+    "/api/v2/mix/position/all-position": "positions.json",
+    "/api/v2/mix/account/accounts": "accounts.json",
+    "/api/v2/mix/account/bill": "bills.json",
+    "/api/v2/mix/market/candles": "candles.json",
+    "/api/v2/mix/market/history-candles": "candles.json",
+    "/v1/ticker": "upbit_ticker.json",
+}
+
+def load_fixture(name: str) -> Any:
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+class ReplayAdapter(BaseAdapter):
+    """
+    경로별로 미리 직렬화한 본문을 돌려줌 (overrides로 특정 경로 응답을 교체 가능)
+    응답 본문은 bytes로 한 번만 만들어 두므로 측정값에 픽스처 파일 I/O가 섞이지 않음
+    """
+    def __init__(self, overrides: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        payloads = {path: load_fixture(name) for path, name in ROUTES.items()}
+        payloads.update(overrides or {})
+        self._bodies = {path: json.dumps(body).encode() for path, body in payloads.items()}
+        self.calls: Dict[str, int] = {}
+
+    def send(self, request, **kwargs):
+        path = urlsplit(request.url).path
+        self.calls[path] = self.calls.get(path, 0) + 1
+        resp = requests.Response()
+        resp.request = request
+        resp.url = request.url
+        body = self._bodies.get(path)
+        if body is None:
+            resp.status_code = 404
+            resp._content = b'{"code": "40404", "msg": "no fixture"}'
+        else:
+            resp.status_code = 200
+            resp._content = body
+        resp.headers["Content-Type"] = "application/json"
+        resp.encoding = "utf-8"
+        return resp
+
+    def close(self):
+        pass
+
+def mount_replay(overrides: Optional[Dict[str, Any]] = None) -> ReplayAdapter:
+    """공용 세션의 Bitget/Upbit 호스트를 ReplayAdapter로 교체"""
+    adapter = ReplayAdapter(overrides)
+    session = get_session()
+    for host in ("https://api.bitget.com", "https://api.upbit.com"):
+        session.mount(host, adapter)
+    return adapter
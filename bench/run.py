@@ -0,0 +1,269 @@
+# bench/run.py
+"""
+오프라인 벤치마크 (네트워크 없이 녹화된 픽스처를 재생)
+
+    python -m bench.run                          # realistic 규모
+    python -m bench.run --scale scaled           # 500 포지션 / 10년 일별 / 100만 인트라데이 포인트
+    python -m bench.run --out before.json
+    python -m bench.run --out after.json --compare before.json
+
+- 모든 데이터 파일은 임시 디렉터리에 만들어지므로 data/ 를 건드리지 않음
+- 결과는 JSON (구간별 min/median/mean/p95/max ms) -> 실행 간 비교 가능
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SCALES = {
+    "realistic": {"positions": 20, "days": 365, "intraday": 50_000, "ticks": 500, "investors": 5},
+    "scaled": {"positions": 500, "days": 3650, "intraday": 1_000_000, "ticks": 5_000, "investors": 50},
+}
+DEFAULT_OUT = "bench_output.json"
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    a = np.asarray(samples) * 1000
+    return {"runs": len(a), "min_ms": float(a.min()), "median_ms": float(np.median(a)),
+            "mean_ms": float(a.mean()), "p95_ms": float(np.percentile(a, 95)), "max_ms": float(a.max())}
+
+def timeit(fn: Callable[[], Any], repeat: int, warmup: int = 1,
+           setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """setup은 매 실행 전에 호출하고 측정에서 제외 (캐시 비우기 등)"""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return _stats(samples)
+
+# ---------------------------
+# 데이터 생성 (픽스처를 규모에 맞게 복제)
+# ---------------------------
+def scale_positions(n: int) -> List[Dict[str, Any]]:
+    from bench.replay import load_fixture
+    base = load_fixture("positions.json")["data"]
+    out = []
+    for i in range(n):
+        p = dict(base[i % len(base)])
+        p["symbol"] = f"{p['symbol'][:-4]}{i // len(base) or ''}USDT"
+        out.append(p)
+    return out
+
+def daily_history(days: int) -> List[Tuple[str, float]]:
+    rng = np.random.default_rng(7)
+    equity = 10_000 * np.cumprod(1 + rng.normal(0.0005, 0.02, days))
+    start = date.today() - timedelta(days=days)
+    return [((start + timedelta(days=i)).isoformat(), float(e)) for i, e in enumerate(equity)]
+
+def intraday_points(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(11)
+    end = np.datetime64(int(time.time()), "s").astype("datetime64[ns]")
+    x = end - np.arange(n)[::-1] * np.timedelta64(10, "s")
+    y = 10_000 * np.cumprod(1 + rng.normal(0, 0.0005, n))
+    return x, y
+
+# ---------------------------
+# 벤치마크
+# ---------------------------
+def run(scale: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    from bench.replay import mount_replay, load_fixture
+    from services.ratelimit import get_limiter
+    from services.portfolio import Account, load_portfolio_snapshot
+    from services.bitget import fetch_kline_futures
+    from services.positions import positions_frame, summarize
+    from services.history import record_equity, load_history, _query_history
+    from services.timeseries import record_tick
+    from services.series import EquitySeries
+    from services.metrics import RiskEngine
+    from services.fund import subscribe, get_nav_metrics, investor_history
+    from services.ledger import sync_bills, pnl_breakdown
+    from services.stress import build_book, uniform_shocks, correlated_shocks, run_scenarios, run_per_symbol
+    from services import snaplog
+    from utils.downsample import auto_downsample
+    from utils.markup import clear_memo
+    from ui.cards import render_top_bar, render_left_summary
+    from ui.table import render_bottom_section, _render_positions
+    import streamlit as st
+
+    # bare 모드에서 Streamlit 요소를 호출할 때마다 찍히는 경고 숨김
+    from streamlit import config as st_config
+    st_config.set_option("global.showWarningOnDirectExecution", False)
+    # (Streamlit이 첫 호출 때 로거 레벨을 다시 설정하므로 레벨 대신 필터 사용)
+    for name in ("streamlit.delta_generator", "streamlit.runtime.scriptrunner_utils.script_run_context"):
+        logging.getLogger(name).addFilter(lambda record: record.levelno >= logging.ERROR)
+
+    size = SCALES[scale]
+    # 리미터는 실제 API 보호용이므로 재생 중에는 예산 제한 없이 측정
+    limiter = get_limiter()
+    limiter.limits, limiter.default = {}, 1e9
+
+    positions = scale_positions(size["positions"])
+    pos_payload = dict(load_fixture("positions.json"), data=positions)
+    mount_replay({"/api/v2/mix/position/all-position": pos_payload})
+    accounts = [Account("main", "bench-key", "bench-secret", "bench-pass")]
+    history = daily_history(size["days"])
+    results: Dict[str, Dict[str, float]] = {}
+
+    def bench(name, fn, n=repeat, setup=None):
+        results[name] = timeit(fn, n, setup=setup)
+        print(f"  {name:<34} median {results[name]['median_ms']:>10.2f} ms", flush=True)
+
+    # 1. API 응답 파싱 (재생 adapter 경유: 서명 + 리미터 + JSON)
+    bench("fetch.portfolio_snapshot", lambda: load_portfolio_snapshot(accounts))
+    bench("fetch.kline_frame", lambda: fetch_kline_futures("BTCUSDT", "1h", limit=200))
+    bench("parse.positions_frame", lambda: positions_frame(positions))
+    df = positions_frame(positions)
+    equity = 12_543.22
+    bench("parse.summarize", lambda: summarize(df, equity))
+    summary = summarize(df, equity)
+
+    # 2. 장부 (첫 실행은 백필, 이후는 중복 제거 경로)
+    bench("ledger.sync_bills", lambda: sync_bills(*accounts[0].creds, "USDT-FUTURES"))
+    bench("ledger.pnl_breakdown", lambda: pnl_breakdown("symbol"))
+
+    # 3. 일별 기록 I/O
+    bench("history.write_all", lambda: [record_equity(d, e, upsert=True) for d, e in history], n=max(1, repeat // 2))
+    bench("history.query", lambda: _query_history(None, None))
+    bench("history.load_cached", lambda: load_history())
+    history_df = load_history()
+
+    # 4. NAV / 투자자
+    for i in range(size["investors"]):
+        subscribe(f"Investor {i:03d}", 1000.0 + i, equity_before=equity + i * 1000.0, date=history[i % len(history)][0])
+    bench("nav.get_nav_metrics", lambda: get_nav_metrics(equity, history_df))
+    bench("nav.investor_history", lambda: investor_history(history_df))
+    bench("risk.full_sync", lambda: RiskEngine().sync(history_df))
+    engine = RiskEngine()
+    engine.sync(history_df)
+    bench("risk.metrics_1m", lambda: engine.metrics("1M", live_equity=equity))
+
+    # 5. 인트라데이 (틱 기록 + 차트 시계열)
+    now = int(time.time())
+    ticks = iter(range(10 ** 9))
+    def write_ticks():
+        base = now - size["ticks"] * 10 + next(ticks) * size["ticks"] * 10
+        for i in range(size["ticks"]):
+            record_tick(equity + i * 0.01, 10.0, 100.0, ts=base + i * 10)
+    bench("timeseries.record_ticks", write_ticks, n=max(1, repeat // 2))
+    def series_window():
+        s = EquitySeries()
+        s.sync_daily(history_df)
+        s.sync_intraday("1W")
+        return s.window("1W", equity)
+    bench("series.sync_window", series_window)
+    x, y = intraday_points(size["intraday"])
+    bench("downsample.auto", lambda: auto_downsample(x, y))
+
+    # 6. 스트레스 시나리오 (포지션 x 시나리오 배열 연산)
+    book = build_book(df)
+    n_sym = len(book.symbols)
+    bench("stress.uniform_grid", lambda: run_scenarios(book, equity, uniform_shocks(n_sym)))
+    bench("stress.per_symbol_grid", lambda: run_per_symbol(book, equity))
+    bench("stress.correlated_5000", lambda: run_scenarios(book, equity, correlated_shocks(n_sym, 5000)))
+
+    # 7. 스냅샷 로그 (압축 추가 / 인덱스 이진 탐색 + 레코드 1건 해제)
+    snap = load_portfolio_snapshot(accounts)
+    log_start = now - size["ticks"] * snaplog.MIN_INTERVAL
+    appended = iter(range(10 ** 9))
+    def append_log():
+        i = next(appended)
+        snaplog.append_snapshot(replace(snap, fetched_at=log_start + i * snaplog.MIN_INTERVAL))
+    bench("snaplog.append", append_log, n=size["ticks"])
+    probes = iter(np.random.default_rng(3).uniform(log_start, log_start + size["ticks"] * snaplog.MIN_INTERVAL, 10 ** 6))
+    bench("snaplog.seek", lambda: snaplog.seek(next(probes)))
+
+    # 8. UI (HTML 생성 + Streamlit 요소 호출, bare 모드)
+    # 같은 입력을 반복하면 warmup 이후는 모두 마크업 캐시 적중이므로
+    # cold(매 실행 전 캐시 비움 = 값이 바뀐 첫 렌더)와 warm(캐시 적중 = 값이 그대로인 재실행)을 따로 잼
+    nav = get_nav_metrics(equity, history_df)
+    ui_benches = (
+        ("ui.top_bar", lambda: render_top_bar(equity, 8123.45, summary["leverage"], usdt_rate=1392.0)),
+        ("ui.left_summary", lambda: render_left_summary(equity, summary, usdt_rate=1392.0)),
+        ("ui.positions_table", lambda: _render_positions(df)),
+        ("ui.bottom_section", lambda: render_bottom_section(st, df, nav, usdt_rate=1392.0)),
+    )
+    for name, fn in ui_benches:
+        bench(f"{name}.cold", fn, setup=clear_memo)
+        bench(f"{name}.warm", fn)
+    return results
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\n{'benchmark':<34} {'base ms':>10} {'now ms':>10} {'delta':>8}")
+    for name, r in current["results"].items():
+        b = baseline.get("results", {}).get(name)
+        if not b:
+            print(f"{name:<34} {'-':>10} {r['median_ms']:>10.2f} {'new':>8}")
+            continue
+        delta = (r["median_ms"] - b["median_ms"]) / b["median_ms"] * 100 if b["median_ms"] else 0.0
+        print(f"{name:<34} {b['median_ms']:>10.2f} {r['median_ms']:>10.2f} {delta:>+7.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperdash offline benchmarks")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="realistic")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="result JSON path")
+    parser.add_argument("--compare", help="baseline result JSON to compare against")
+    args = parser.parse_args()
+
+    out_path = os.path.abspath(args.out)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory(prefix="hyperdash-bench-") as work:
+        # services/* 는 상대 경로 data/ 를 쓰므로 임시 디렉터리에서 실행
+        os.makedirs(os.path.join(work, "data"))
+        os.chdir(work)
+        sys.path.insert(0, repo_dir)
+        print(f"scale={args.scale} repeat={args.repeat} ({SCALES[args.scale]})")
+        results = run(args.scale, args.repeat)
+        os.chdir(repo_dir)
+
+    report = {
+        "meta": {
+            "scale": args.scale,
+            "sizes": SCALES[args.scale],
+            "repeat": args.repeat,
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nwrote {out_path}")
+    if baseline is not None:
+        compare(report, baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench/startup.py
+"""
+콜드 스타트 import 프로파일 (python -X importtime 을 새 프로세스에서 실행)
+
+    python -m bench.startup                  # app 기동 + 첫 틱 import 비용
+    python -m bench.startup --top 30
+    python -m bench.startup --out startup.json
+
+- "startup"   : import app (페이지 설정/CSS 전송 전까지 필요한 모듈)
+- "first_tick": 첫 틱에서 지연 로드되는 services/*, ui/* (pandas 포함)
+매 측정마다 새 인터프리터를 띄우므로 .pyc 외의 캐시 영향이 없음
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# app._render_tick / read_snapshot 에서 지연 import 하는 모듈
+FIRST_TICK_MODULES = [
+    "services.portfolio", "services.snapshot", "services.upbit",
+    "utils.format", "services.history", "services.timeseries", "services.series",
+    "services.metrics", "services.fund", "services.positions",
+    "ui.chart", "ui.cards", "ui.table",
+]
+
+def profile(code: str, runs: int) -> Dict[str, Any]:
+    """
+    Returns: {"total_ms", "modules": [{"module", "self_ms", "cumulative_ms"}]}
+    runs번 실행해 모듈별 최소값을 사용 (디스크 캐시/스케줄링 잡음 제거)
+    """
+    best: Dict[str, List[float]] = {}
+    totals = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              cwd=REPO_DIR, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+        total = 0.0
+        for line in proc.stderr.splitlines():
+            # "import time:  self [us] | cumulative | imported package"
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+            depth = len(name) - len(name.lstrip())
+            name = name.strip()
+            self_ms, cum_ms = int(self_us) / 1000, int(cum_us) / 1000
+            if depth == 1:  # 최상위 import만 합산 (하위는 cumulative에 포함)
+                total += cum_ms
+            prev = best.get(name)
+            if prev is None or cum_ms < prev[1]:
+                best[name] = [self_ms, cum_ms]
+        totals.append(total)
+    modules = [{"module": m, "self_ms": v[0], "cumulative_ms": v[1]} for m, v in best.items()]
+    return {"total_ms": min(totals), "modules": modules}
+
+def _print(title: str, prof: Dict[str, Any], top: int, watch: List[str]):
+    print(f"\n[{title}] total {prof['total_ms']:.1f} ms")
+    print(f"  {'module':<44} {'self ms':>9} {'cum ms':>9}")
+    for m in sorted(prof["modules"], key=lambda m: m["cumulative_ms"], reverse=True)[:top]:
+        print(f"  {m['module']:<44} {m['self_ms']:>9.1f} {m['cumulative_ms']:>9.1f}")
+    loaded = {m["module"] for m in prof["modules"]}
+    print("  heavy deps loaded: " + (", ".join(w for w in watch if w in loaded) or "-"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperdash cold-start import profile")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--out", help="result JSON path")
+    args = parser.parse_args()
+
+    watch = ["pandas", "numpy", "plotly.graph_objects", "requests", "websocket"]
+    startup = profile("import app", args.runs)
+    # app이 이미 로드한 모듈은 제외하고 첫 틱에서 추가되는 비용만 측정
+    baseline = {m["module"] for m in startup["modules"]}
+    tick = profile("import app; " + "; ".join(f"import {m}" for m in FIRST_TICK_MODULES), args.runs)
+    tick["modules"] = [m for m in tick["modules"] if m["module"] not in baseline]
+    tick["total_ms"] = max(0.0, tick["total_ms"] - startup["total_ms"])
+
+    _print("startup: import app", startup, args.top, watch)
+    _print("first tick: deferred imports", tick, args.top, watch)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "startup": startup, "first_tick": tick}, f, indent=2)
+        print(f"\nwrote {os.path.abspath(args.out)}")
+
+if __name__ == "__main__":
+    main()
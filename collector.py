@@ -0,0 +1,138 @@
+# collector.py
+"""
+Hyperdash 백그라운드 수집기 (Streamlit 없이 단독 실행)
+
+    python collector.py            # 계속 실행
+    python collector.py --once     # 한 번만 수집하고 종료
+    python collector.py --metrics-port 9464   # /metrics (Prometheus 텍스트) 제공
+
+- 10초마다: 포지션/계좌/환율 조회 -> data/live_snapshot.json 발행 + data/snapshots/ 로그 추가, 일별/인트라데이 자산 기록
+- 10분마다: 계정 bill 장부 동기화
+- 1분마다: 보유 심볼 캔들 캐시 갱신
+자격 증명은 환경변수(BITGET_API_KEY, BITGET_API_SECRET, BITGET_PASSPHRASE) 또는
+.streamlit/secrets.toml의 [bitget] 섹션(서브 계정은 [[bitget.accounts]])에서 읽습니다.
+"""
+import argparse
+import os
+import signal
+import threading
+import time
+import tomllib
+
+from services.snapshot import publish_snapshot
+from services.snaplog import record_snapshot
+from services.portfolio import load_accounts, load_portfolio_snapshot
+from services.history import try_record_snapshot
+from services.timeseries import record_tick
+from services.ledger import sync_bills
+from services.klines import get_klines
+from services.positions import positions_frame, summarize
+from utils.format import fnum
+from utils.telemetry import span, start_metrics_server
+
+# Config (app.py와 동일)
+PRODUCT_TYPE = "USDT-FUTURES"  # 캔들 캐시 대상
+FETCH_TIMEOUT = 8
+
+POLL_INTERVAL = 10
+LEDGER_INTERVAL = 600
+KLINE_INTERVAL = 60
+KLINE_GRANULARITIES = ["1m", "5m", "15m", "1H", "4H", "1D"]  # ui/toolbar.py의 GRANULARITY_MAP
+DEFAULT_SYMBOLS = ["BTCUSDT"]
+SECRETS_FILE = os.path.join(".streamlit", "secrets.toml")
+
+_stop = threading.Event()
+
+def load_credentials():
+    key = os.environ.get("BITGET_API_KEY")
+    secret = os.environ.get("BITGET_API_SECRET")
+    passphrase = os.environ.get("BITGET_PASSPHRASE")
+    if key and secret and passphrase:
+        return load_accounts({"api_key": key, "api_secret": secret, "passphrase": passphrase})
+    with open(SECRETS_FILE, "rb") as f:
+        return load_accounts(tomllib.load(f)["bitget"])
+
+def log(msg):
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
+
+class Collector:
+    def __init__(self, accounts):
+        self.accounts = tuple(accounts)
+        self.snapshot = None
+        self._next = {"poll": 0.0, "ledger": 0.0, "klines": 0.0}
+
+    def poll(self):
+        snap = load_portfolio_snapshot(self.accounts, timeout=FETCH_TIMEOUT, previous=self.snapshot)
+        self.snapshot = snap
+        publish_snapshot(snap)
+        record_snapshot(snap)
+        if snap.errors:
+            log(f"partial snapshot: {dict(snap.errors)}")
+
+        acct = snap.account
+        if not acct:
+            return  # 계좌 조회 실패 시 0 자산이 기록되지 않도록 저장은 건너뜀
+        equity = fnum(acct.get("usdtEquity"))
+        summary = summarize(positions_frame(snap.positions), equity)
+        _, saved = try_record_snapshot(equity)
+        if saved:
+            log(f"daily snapshot recorded: {equity:,.2f}")
+        record_tick(equity, summary["upl"], summary["margin_used"], ts=snap.fetched_at)
+
+    def sync_ledger(self):
+        for acc in self.accounts:
+            for pt in acc.product_types:
+                added = sync_bills(*acc.creds, pt, account=acc.name)
+                if added:
+                    log(f"ledger[{acc.name}/{pt}]: {added} new bills")
+
+    def refresh_klines(self):
+        symbols = set(DEFAULT_SYMBOLS)
+        if self.snapshot is not None:
+            symbols |= {str(p.get("symbol") or "").split("_")[0].upper() for p in self.snapshot.positions
+                        if p.get("productType", PRODUCT_TYPE) == PRODUCT_TYPE}
+        for sym in sorted(s for s in symbols if s):
+            for gran in KLINE_GRANULARITIES:
+                get_klines(sym, gran, PRODUCT_TYPE)
+
+    def run_once(self):
+        for name, fn, interval in (("poll", self.poll, POLL_INTERVAL),
+                                   ("ledger", self.sync_ledger, LEDGER_INTERVAL),
+                                   ("klines", self.refresh_klines, KLINE_INTERVAL)):
+            now = time.monotonic()
+            if now < self._next[name]:
+                continue
+            self._next[name] = now + interval
+            try:
+                with span(f"collector.{name}"):
+                    fn()
+            except Exception as e:
+                log(f"{name} failed: {e}")
+
+    def run_forever(self):
+        while not _stop.is_set():
+            started = time.monotonic()
+            self.run_once()
+            _stop.wait(max(0.0, POLL_INTERVAL - (time.monotonic() - started)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Hyperdash background collector")
+    parser.add_argument("--once", action="store_true", help="collect once and exit")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    args = parser.parse_args()
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: _stop.set())
+
+    collector = Collector(load_credentials())
+    log("collector started")
+    if args.once:
+        collector.run_once()
+    else:
+        collector.run_forever()
+    log("collector stopped")
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,26 @@ import time
 import hmac
 import hashlib
 import base64
-import requests
-import pandas as pd
 from urllib.parse import urlencode
-from typing import Optional, Tuple, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, Tuple, List, Dict, Any
+
+import requests
+
+from services.http import http_get
+from services.ratelimit import get_limiter, PRIORITY_HIGH, PRIORITY_LOW, PUBLIC_KEY
+from utils.telemetry import span, count_error
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 BASE_URL = "https://api.bitget.com"
 
+# 클라이언트 측 에러 코드 (Bitget 응답 코드와 구분)
+ERR_RATE_LIMITED = "429"      # 로컬 예산 초과 또는 서버 429
+ERR_TIMEOUT = "timeout"
+ERR_NETWORK = "network"
+ERR_BAD_RESPONSE = "bad_response"
+
 def _timestamp_ms() -> str:
     return str(int(time.time() * 1000))
 
@@ -22,7 +35,63 @@ def _sign(ts: str, method: str, path: str, query_params: Optional[Dict], body: s
     mac = hmac.new(secret.encode(), target.encode(), hashlib.sha256)
     return base64.b64encode(mac.digest()).decode()
 
-def _private_get(api_key: str, api_secret: str, passphrase: str, path: str, params: Optional[Dict] = None) -> Dict:
+def _error(code: str, msg: str, status: Optional[int] = None) -> Dict:
+    return {"code": code, "msg": msg, "data": None, "httpStatus": status}
+
+def _retry_after(resp) -> float:
+    try:
+        return max(1.0, float(resp.headers.get("Retry-After", 1)))
+    except (TypeError, ValueError):
+        return 1.0
+
+def _acquire(path: str, key: str, priority: int) -> Optional[Dict]:
+    """리미터 예산을 얻으면 None, 얻지 못하면 (요청하지 않고) ERR_RATE_LIMITED 응답"""
+    with span(f"bitget.wait {path}"):
+        if get_limiter().acquire(path, key, priority):
+            return None
+    count_error(path, ERR_RATE_LIMITED)
+    return _error(ERR_RATE_LIMITED, f"Rate limited (local budget): {path}")
+
+def _send(path: str, key: str, url: str, params: Optional[Dict] = None,
+          headers: Optional[Dict] = None, timeout: float = 10) -> Dict:
+    """GET 후 응답 코드별 에러 수를 집계 (구간 이름은 엔드포인트 경로)"""
+    with span(f"bitget {path}"):
+        res = _send_once(path, key, url, params, headers, timeout)
+    if res.get("code") != "00000":
+        count_error(path, res.get("code"))
+    return res
+
+def _send_once(path: str, key: str, url: str, params: Optional[Dict] = None,
+               headers: Optional[Dict] = None, timeout: float = 10) -> Dict:
+    """
+    GET 후 JSON 반환 (예외 대신 에러 코드가 담긴 dict)
+    서버 429는 해당 버킷을 Retry-After 동안 막음
+    """
+    try:
+        resp = http_get(url, params=params, headers=headers, timeout=timeout)
+    except requests.Timeout as e:
+        return _error(ERR_TIMEOUT, f"Timeout: {e}")
+    except requests.RequestException as e:
+        return _error(ERR_NETWORK, f"Network Error: {e}")
+    if resp.status_code == 429:
+        get_limiter().penalize(path, key, _retry_after(resp))
+    try:
+        res = resp.json()
+    except ValueError:
+        res = None
+    if not isinstance(res, dict):
+        code = ERR_RATE_LIMITED if resp.status_code == 429 else ERR_BAD_RESPONSE
+        return _error(code, f"HTTP {resp.status_code}: {resp.text[:200]}", resp.status_code)
+    res.setdefault("httpStatus", resp.status_code)
+    return res
+
+def _private_get(api_key: str, api_secret: str, passphrase: str, path: str, params: Optional[Dict] = None,
+                 priority: int = PRIORITY_HIGH) -> Dict:
+    # 버킷은 엔드포인트 x API 키 단위 (같은 키를 쓰는 모든 세션이 예산을 공유)
+    # 대기가 끝난 뒤에 서명해야 타임스탬프 만료로 거절되지 않음
+    limited = _acquire(path, api_key, priority)
+    if limited:
+        return limited
     try:
         ts = _timestamp_ms()
         sig = _sign(ts, "GET", path, params, "", api_secret)
@@ -38,10 +107,9 @@ def _private_get(api_key: str, api_secret: str, passphrase: str, path: str, para
             "locale": "en-US",
             "Content-Type": "application/json",
         }
-        resp = requests.get(url, headers=headers, timeout=10)
-        return resp.json()
     except Exception as e:
-        return {"code": "99999", "msg": f"Network Error: {str(e)}", "data": None}
+        return _error(ERR_BAD_RESPONSE, f"Request Error: {e}")
+    return _send(path, api_key, url, headers=headers, timeout=10)
 
 def fetch_positions(api_key: str, api_secret: str, passphrase: str, product_type: str, margin_coin: str) -> Tuple[List[Dict], Dict]:
     res = _private_get(api_key, api_secret, passphrase,
@@ -57,42 +125,81 @@ def fetch_account(api_key: str, api_secret: str, passphrase: str, product_type:
     acct = next((a for a in arr if a.get("marginCoin") == margin_coin), None)
     return acct, res
 
-def fetch_account_bills(api_key: str, api_secret: str, passphrase: str, product_type: str, limit: int = 100) -> List[Dict]:
+def fetch_accounts(api_key: str, api_secret: str, passphrase: str, product_type: str) -> Tuple[List[Dict], Dict]:
+    """상품 유형의 모든 증거금 코인 계좌 (COIN-FUTURES처럼 코인별 계좌가 여러 개인 경우용)"""
     res = _private_get(api_key, api_secret, passphrase,
-                       "/api/v2/mix/account/bill",
-                       {"productType": product_type, "limit": str(limit)})
+                       "/api/v2/mix/account/accounts",
+                       {"productType": product_type})
+    return (res.get("data") or [], res)
+
+def fetch_account_bills_page(api_key: str, api_secret: str, passphrase: str, product_type: str, limit: int = 100,
+                             id_less_than: Optional[str] = None, start_ms: Optional[int] = None,
+                             end_ms: Optional[int] = None) -> Tuple[List[Dict], Optional[str], Dict]:
+    """
+    계정 거래 내역(bill) 한 페이지 조회
+    Returns: (bills, end_id, raw) - end_id를 다음 호출의 id_less_than으로 넘기면 이전 페이지
+    """
+    params = {"productType": product_type, "limit": str(limit)}
+    if id_less_than:
+        params["idLessThan"] = str(id_less_than)
+    if start_ms is not None:
+        params["startTime"] = str(int(start_ms))
+    if end_ms is not None:
+        params["endTime"] = str(int(end_ms))
+    # bill 동기화는 대량 백그라운드 작업이라 화면용 호출에 밀리도록 저우선
+    res = _private_get(api_key, api_secret, passphrase, "/api/v2/mix/account/bill", params, priority=PRIORITY_LOW)
     data_obj = res.get("data", {}) if res.get("data") else {}
-    return data_obj.get("bills", [])
+    return data_obj.get("bills", []) or [], data_obj.get("endId"), res
+
+def fetch_account_bills(api_key: str, api_secret: str, passphrase: str, product_type: str, limit: int = 100) -> List[Dict]:
+    bills, _, _ = fetch_account_bills_page(api_key, api_secret, passphrase, product_type, limit)
+    return bills
+
+def fetch_candles(symbol: str, granularity: str, product_type: str = "USDT-FUTURES", limit: int = 100,
+                  start_ms: Optional[int] = None, end_ms: Optional[int] = None, history: bool = False) -> List[List]:
+    """
+    선물(Mix) 캔들 원본 조회 (V2)
+    history=True이면 history-candles(과거 구간, 최대 200개)를 사용합니다.
+    Returns: [[timestamp, open, high, low, close, vol, amount], ...] (실패 시 빈 리스트)
+    """
+    path = "/api/v2/mix/market/history-candles" if history else "/api/v2/mix/market/candles"
+    params = {
+        "symbol": symbol,
+        "granularity": granularity,
+        "productType": product_type,
+        "limit": str(limit)
+    }
+    if start_ms is not None:
+        params["startTime"] = str(int(start_ms))
+    if end_ms is not None:
+        params["endTime"] = str(int(end_ms))
+    res = (_acquire(path, PUBLIC_KEY, PRIORITY_LOW if history else PRIORITY_HIGH)
+           or _send(path, PUBLIC_KEY, f"{BASE_URL}{path}", params=params, timeout=5))
+    if res.get("code") != "00000":
+        return []
+    return res.get("data") or []
+
+def candles_to_frame(data: List[List]) -> "pd.DataFrame":
+    # pandas는 캔들을 쓰는 경로에서만 로드 (스냅샷 조회만 하는 수집기/대시보드 기동 시간 단축)
+    import pandas as pd
+    if not data:
+        return pd.DataFrame()
+    # [timestamp, open, high, low, close, vol, amount]
+    df = pd.DataFrame(data, columns=["timestamp", "open", "high", "low", "close", "vol", "amount"])
+    df["timestamp"] = pd.to_datetime(df["timestamp"].astype(float), unit="ms")
+
+    # 형변환
+    numeric_cols = ["open", "high", "low", "close"]
+    df[numeric_cols] = df[numeric_cols].astype(float)
+
+    return df.sort_values("timestamp")
 
-def fetch_kline_futures(symbol: str = "BTCUSDT", granularity: str = "1h", product_type: str = "USDT-FUTURES", limit: int = 100) -> pd.DataFrame:
+def fetch_kline_futures(symbol: str = "BTCUSDT", granularity: str = "1h", product_type: str = "USDT-FUTURES", limit: int = 100) -> "pd.DataFrame":
     """
     선물(Mix) 캔들 데이터 조회 (V2)
+    캐시 없이 매번 조회합니다. 반복 조회는 services.klines.get_klines를 사용하세요.
     """
     try:
-        path = "/api/v2/mix/market/candles"
-        params = {
-            "symbol": symbol,
-            "granularity": granularity,
-            "productType": product_type,
-            "limit": str(limit)
-        }
-        res = requests.get(f"{BASE_URL}{path}", params=params, timeout=5).json()
-        
-        if res.get("code") != "00000": 
-            return pd.DataFrame()
-            
-        data = res.get("data", [])
-        if not data: 
-            return pd.DataFrame()
-        
-        # [timestamp, open, high, low, close, vol, amount]
-        df = pd.DataFrame(data, columns=["timestamp", "open", "high", "low", "close", "vol", "amount"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"].astype(float), unit="ms")
-        
-        # 형변환
-        numeric_cols = ["open", "high", "low", "close"]
-        df[numeric_cols] = df[numeric_cols].astype(float)
-        
-        return df.sort_values("timestamp")
+        return candles_to_frame(fetch_candles(symbol, granularity, product_type, limit))
     except Exception:
-        return pd.DataFrame()
+        return candles_to_frame([])
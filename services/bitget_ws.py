@@ -0,0 +1,311 @@
+# services/bitget_ws.py
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from services.snapshot import Snapshot
+
+PUBLIC_WS_URL = "wss://ws.bitget.com/v2/ws/public"
+PRIVATE_WS_URL = "wss://ws.bitget.com/v2/ws/private"
+
+PING_INTERVAL = 25     # Bitget은 30초 무응답 시 연결을 끊음
+STALE_AFTER = 60       # 이 시간 동안 아무 메시지도 없으면 끊긴 것으로 간주
+RECONNECT_BACKOFF = (1, 2, 5, 10, 30)
+
+def _ws_sign(ts: str, secret: str) -> str:
+    mac = hmac.new(secret.encode(), f"{ts}GET/user/verify".encode(), hashlib.sha256)
+    return base64.b64encode(mac.digest()).decode()
+
+def _normalize_position(p: Dict) -> Dict:
+    """WS 포지션 필드를 REST(all-position) 필드명에 맞춤 -> UI 코드 재사용"""
+    out = dict(p)
+    out.setdefault("symbol", p.get("instId"))
+    if "averageOpenPrice" not in out and "openPriceAvg" in p:
+        out["averageOpenPrice"] = p["openPriceAvg"]
+    return out
+
+class StreamState:
+    """WS로 유지되는 인메모리 상태 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.positions: Dict[Tuple[str, str], Dict] = {}
+        self.account: Optional[Dict] = None
+        self.mark_prices: Dict[str, float] = {}
+        self.updated_at = 0.0
+
+    def replace_positions(self, rows: List[Dict]) -> None:
+        with self._lock:
+            self.positions = {}
+            for p in rows:
+                p = _normalize_position(p)
+                sym = str(p.get("symbol") or "")
+                if sym in self.mark_prices:
+                    p["markPrice"] = str(self.mark_prices[sym])
+                self.positions[(sym, str(p.get("holdSide", "")))] = p
+            self.updated_at = time.time()
+
+    def set_account(self, acct: Optional[Dict]) -> None:
+        if acct is None:
+            return
+        with self._lock:
+            self.account = dict(acct)
+            self.updated_at = time.time()
+
+    def set_mark_price(self, symbol: str, price: float) -> None:
+        with self._lock:
+            self.mark_prices[symbol] = price
+            for (sym, _), p in self.positions.items():
+                if sym == symbol:
+                    p["markPrice"] = str(price)
+            self.updated_at = time.time()
+
+    def symbols(self) -> Set[str]:
+        with self._lock:
+            return {sym for sym, _ in self.positions}
+
+    def to_snapshot(self, errors: Dict[str, str]) -> Snapshot:
+        with self._lock:
+            positions = tuple(MappingProxyType(dict(p)) for p in self.positions.values())
+            account = MappingProxyType(dict(self.account)) if self.account is not None else None
+            return Snapshot(positions, account, None, MappingProxyType(dict(errors)), self.updated_at)
+
+class _Connection:
+    """
+    단일 WS 연결 루프: 접속 -> (로그인) -> 구독 -> 수신
+    끊기면 backoff 후 재접속하고 기존 구독을 모두 다시 보냄.
+    재접속하면 on_reconnect(끊긴 시각, time.monotonic 기준)을 호출
+    """
+
+    def __init__(self, name: str, url: str, on_message: Callable[[Dict], None],
+                 on_reconnect: Callable[[float], None], login_args: Optional[Callable[[], Dict]] = None):
+        self.name = name
+        self.url = url
+        self.on_message = on_message
+        self.on_reconnect = on_reconnect
+        self.login_args = login_args
+        self.subscriptions: List[Dict] = []
+        self.connected = False
+        self.last_error: Optional[str] = None
+        self._ws = None
+        self._send_lock = threading.Lock()
+        self._sub_lock = threading.Lock()   # 구독 목록 + connected 전환을 함께 보호
+        self._stop = threading.Event()
+
+    def subscribe(self, args: List[Dict]) -> None:
+        # run()의 "목록 전송 + connected=True"와 같은 잠금 -> 그 사이에 추가된 구독이 빠지지 않음
+        with self._sub_lock:
+            new = [a for a in args if a not in self.subscriptions]
+            if not new:
+                return
+            self.subscriptions.extend(new)
+            if not self.connected:
+                return  # 접속되면 run()이 전체 목록을 보냄
+            try:
+                self._send({"op": "subscribe", "args": new})
+            except Exception:
+                pass  # 연결이 막 끊긴 경우: 재접속 시 전체 목록을 다시 보냄
+
+    def _send(self, payload) -> None:
+        with self._send_lock:
+            if self._ws is not None:
+                self._ws.send(payload if isinstance(payload, str) else json.dumps(payload))
+
+    def _login(self) -> None:
+        self._send({"op": "login", "args": [self.login_args()]})
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            raw = self._ws.recv()
+            if raw == "pong":
+                continue
+            msg = json.loads(raw)
+            if msg.get("event") == "login":
+                if str(msg.get("code")) not in ("0", "00000"):
+                    raise RuntimeError(f"login failed: {msg.get('msg')}")
+                return
+            if msg.get("event") == "error":
+                raise RuntimeError(f"login failed: {msg.get('msg')}")
+        raise RuntimeError("login timeout")
+
+    def run(self) -> None:
+        import websocket  # 스트리밍 모드에서만 필요한 선택 의존성
+
+        attempt = 0
+        dropped_at = time.monotonic()  # 첫 접속이 실패해 재시도하는 경우도 시작 이후를 재동기화
+        while not self._stop.is_set():
+            try:
+                self._ws = websocket.create_connection(self.url, timeout=10)
+                if self.login_args is not None:
+                    self._login()
+                with self._sub_lock:
+                    if self.subscriptions:
+                        self._send({"op": "subscribe", "args": list(self.subscriptions)})
+                    self.connected = True
+                self.last_error = None
+                if attempt > 0:
+                    self.on_reconnect(dropped_at)  # 끊긴 동안 놓친 이벤트는 REST로 재동기화
+                attempt = 0
+                self._read_loop(websocket)
+            except Exception as e:
+                self.last_error = str(e)
+            finally:
+                with self._sub_lock:
+                    if self.connected:
+                        dropped_at = time.monotonic()
+                    self.connected = False
+                if self._ws is not None:
+                    try:
+                        self._ws.close()
+                    except Exception:
+                        pass
+                    self._ws = None
+
+            if self._stop.is_set():
+                break
+            delay = RECONNECT_BACKOFF[min(attempt, len(RECONNECT_BACKOFF) - 1)]
+            attempt += 1
+            self._stop.wait(delay)
+
+    def _read_loop(self, websocket) -> None:
+        self._ws.settimeout(1)
+        last_ping = last_msg = time.monotonic()
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now - last_ping >= PING_INTERVAL:
+                self._send("ping")
+                last_ping = now
+            if now - last_msg >= STALE_AFTER:
+                raise RuntimeError("stream stale")
+            try:
+                raw = self._ws.recv()
+            except websocket.WebSocketTimeoutException:
+                continue
+            if not raw:
+                raise RuntimeError("connection closed")
+            last_msg = time.monotonic()
+            if raw == "pong":
+                continue
+            msg = json.loads(raw)
+            if msg.get("event") == "error":
+                self.last_error = msg.get("msg")
+                continue
+            if "data" in msg:
+                self.on_message(msg)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+class BitgetStream:
+    """
+    스트리밍 수집 모드: private(positions, account) + public(ticker markPrice)
+    - 시작/재접속 시 resync()로 REST 스냅샷을 받아 상태를 맞춤
+    - 포지션 심볼이 바뀌면 ticker 구독을 자동 추가
+    public_url/private_url을 바꾸면 로컬 가짜 WS 서버로도 동작합니다.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, passphrase: str,
+                 product_type: str = "USDT-FUTURES", margin_coin: str = "USDT",
+                 resync: Optional[Callable[[], Snapshot]] = None,
+                 public_url: str = PUBLIC_WS_URL, private_url: str = PRIVATE_WS_URL):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.passphrase = passphrase
+        self.product_type = product_type
+        self.margin_coin = margin_coin
+        self.resync_fn = resync
+        self.state = StreamState()
+        self._resync_error: Optional[str] = None
+        self._resync_lock = threading.Lock()
+        self._last_resync = float("-inf")   # 마지막 재동기화 시작 시각 (time.monotonic)
+
+        self.public = _Connection("public", public_url, self._on_public, self.resync)
+        self.private = _Connection("private", private_url, self._on_private, self.resync,
+                                   login_args=self._login_args)
+        self.private.subscribe([
+            {"instType": product_type, "channel": "positions", "instId": "default"},
+            {"instType": product_type, "channel": "account", "coin": "default"},
+        ])
+        self._threads: List[threading.Thread] = []
+
+    def _login_args(self) -> Dict:
+        ts = str(int(time.time()))
+        return {"apiKey": self.api_key, "passphrase": self.passphrase,
+                "timestamp": ts, "sign": _ws_sign(ts, self.api_secret)}
+
+    def start(self) -> "BitgetStream":
+        self.resync()
+        for conn in (self.private, self.public):
+            t = threading.Thread(target=conn.run, name=f"bitget-ws-{conn.name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self) -> None:
+        self.private.stop()
+        self.public.stop()
+
+    def resync(self, since: Optional[float] = None) -> None:
+        """
+        REST 스냅샷으로 상태를 맞춤
+        since(끊긴 시각) 이후에 시작한 재동기화가 이미 있으면 건너뜀
+        -> public/private가 같은 끊김으로 함께 재접속해도 REST 호출은 한 번 (진행 중이면 끝날 때까지 기다림)
+        """
+        if self.resync_fn is None:
+            return
+        with self._resync_lock:
+            if since is not None and self._last_resync >= since:
+                return
+            self._last_resync = time.monotonic()
+            try:
+                snap = self.resync_fn()
+                if "positions" not in snap.errors:
+                    self.state.replace_positions([dict(p) for p in snap.positions])
+                if snap.account is not None:
+                    self.state.set_account(dict(snap.account))
+                self._resync_error = None
+            except Exception as e:
+                self._resync_error = str(e)
+        self._track_tickers()
+
+    def _track_tickers(self) -> None:
+        self.public.subscribe([
+            {"instType": self.product_type, "channel": "ticker", "instId": sym}
+            for sym in sorted(self.state.symbols()) if sym
+        ])
+
+    def _on_private(self, msg: Dict) -> None:
+        channel = msg.get("arg", {}).get("channel")
+        data = msg.get("data") or []
+        if channel == "positions":
+            # Bitget은 변경 시 전체 포지션 목록을 푸시함
+            self.state.replace_positions(data)
+            self._track_tickers()
+        elif channel == "account":
+            acct = next((a for a in data if a.get("marginCoin") == self.margin_coin), None)
+            self.state.set_account(acct)
+
+    def _on_public(self, msg: Dict) -> None:
+        if msg.get("arg", {}).get("channel") != "ticker":
+            return
+        for t in msg.get("data") or []:
+            sym = t.get("instId")
+            price = t.get("markPrice") or t.get("lastPr")
+            if sym and price:
+                try:
+                    self.state.set_mark_price(sym, float(price))
+                except (TypeError, ValueError):
+                    pass
+
+    def snapshot(self) -> Snapshot:
+        errors = {}
+        for conn in (self.private, self.public):
+            if not conn.connected:
+                errors[f"ws-{conn.name}"] = conn.last_error or "disconnected"
+        if self._resync_error:
+            errors["resync"] = self._resync_error
+        return self.state.to_snapshot(errors)
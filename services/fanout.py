@@ -0,0 +1,34 @@
+# services/fanout.py
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Tuple
+
+# 프로세스 전역 워커 풀 (세션마다 스레드를 새로 만들지 않음)
+MAX_WORKERS = 16
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fetch")
+
+def fetch_concurrently(tasks: Dict[str, Callable[[], Any]], timeout: float = 8.0) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    독립적인 fetch 함수들을 병렬 실행합니다.
+    전체 소요 시간은 합이 아니라 가장 느린 호출 + 오버헤드가 되며,
+    각 호출은 timeout(초) 안에 끝나지 않으면 실패로 처리됩니다.
+
+    Returns: (results, errors)
+        results: 성공한 작업 이름 -> 반환값
+        errors:  실패/타임아웃된 작업 이름 -> 에러 메시지
+    """
+    futures = {name: _executor.submit(fn) for name, fn in tasks.items()}
+    deadline = time.monotonic() + timeout
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for name, fut in futures.items():
+        remaining = max(0.0, deadline - time.monotonic())
+        try:
+            results[name] = fut.result(timeout=remaining)
+        except FutureTimeout:
+            fut.cancel()
+            errors[name] = f"timeout after {timeout:.0f}s"
+        except Exception as e:
+            errors[name] = str(e)
+    return results, errors
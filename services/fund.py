@@ -1,9 +1,23 @@
 # services/fund.py
 import json
 import os
-from typing import Dict, Any
+import threading
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Any, List, Optional
 
-DATA_FILE = "data/fund_state.json"
+from utils.filecache import cached_read, file_lock, atomic_write
+
+DATA_FILE = "data/fund_state.json"      # 현재 보유 좌수 스냅샷 (O(1) 조회용)
+LEDGER_FILE = "data/fund_ledger.jsonl"  # 좌수 변동 이벤트 로그 (append-only)
+
+MANAGER = "Manager"                     # 수수료 좌수를 받는 운용자 계정
+EVENT_TYPES = ("init", "subscribe", "redeem", "fee", "hwm")   # hwm: 좌수 변동 없이 HWM만 설정
+
+_write_lock = threading.Lock()
+
+def _today_kst() -> str:
+    return datetime.now(timezone(timedelta(hours=9))).strftime("%Y-%m-%d")
 
 def load_fund_state() -> Dict[str, Any]:
     """
@@ -15,32 +29,161 @@ def load_fund_state() -> Dict[str, Any]:
         "investors": {
             "Investor A": 1624.0,
             "Investor B": 1.0
-        }
+        },
+        "hwm": 0.0,
+        "seq": 0,
     }
 
-    if not os.path.exists(DATA_FILE):
-        return default_state
-    
     try:
-        with open(DATA_FILE, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            if "investors" not in data:
-                return default_state
-            return data
+        data = cached_read(DATA_FILE, _parse_state)
     except Exception as e:
         print(f"Error loading fund state: {e}")
         return default_state
+    if data is None or "investors" not in data:
+        return default_state
+    return data
+
+def _parse_state(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding='utf-8') as f:
+        data = json.load(f)
+    data.setdefault("hwm", 0.0)
+    data.setdefault("seq", 0)
+    return data
+
+def save_fund_state(investors_dict: Dict[str, float], hwm: float = 0.0, seq: int = 0) -> None:
+    """투자자별 현황 저장 (이벤트 로그를 반영한 스냅샷, 임시 파일 + rename으로 원자적 교체)"""
+    payload = json.dumps({"investors": investors_dict, "hwm": hwm, "seq": seq}, indent=2, ensure_ascii=False)
+    with file_lock(DATA_FILE):
+        atomic_write(DATA_FILE, payload)
+
+# ---------------------------
+# 이벤트 로그 (좌수 원장)
+# ---------------------------
+def _parse_ledger(path: str) -> List[Dict[str, Any]]:
+    events = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    return events
+
+def load_ledger() -> List[Dict[str, Any]]:
+    return cached_read(LEDGER_FILE, _parse_ledger, default=[])
+
+def _append_event(event: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(LEDGER_FILE), exist_ok=True)
+    with open(LEDGER_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def _ensure_ledger(state: Dict[str, Any]) -> None:
+    """원장이 없으면 현재 스냅샷을 init 이벤트로 기록 (구버전 fund_state.json 마이그레이션)"""
+    if os.path.exists(LEDGER_FILE):
+        return
+    seq = 0
+    for name, units in state["investors"].items():
+        seq += 1
+        _append_event({"seq": seq, "date": "1970-01-01", "type": "init", "investor": name,
+                       "units": float(units), "amount": 0.0, "nav": 0.0})
+    save_fund_state(state["investors"], state.get("hwm", 0.0), seq)
+
+def _record(event_type: str, investor: str, price: Callable[[Dict[str, Any]], Optional[Dict[str, float]]],
+            date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    이벤트 1건 기록 후 스냅샷 갱신 (로그 먼저 -> 스냅샷)
+    price(state)는 잠금 안에서 최신 상태로 units/amount/nav(/hwm/type)를 계산합니다. None이면 기록하지 않음.
+    type을 돌려주면 event_type 대신 그 이벤트 종류로 기록
+    """
+    # 스레드/프로세스 모두 직렬화 -> 동시 세션이 같은 seq를 쓰거나 스냅샷을 깨뜨리지 않음
+    with _write_lock, file_lock(LEDGER_FILE):
+        _ensure_ledger(load_fund_state())
+        state = load_fund_state()
+        priced = price(state)
+        if priced is None:
+            return None
+        units = priced["units"]
+        investors = dict(state["investors"])
+        new_units = investors.get(investor, 0.0) + units
+        if new_units < -1e-9:
+            raise ValueError(f"{investor}: 보유 좌수({investors.get(investor, 0.0):,.4f})보다 많이 환매할 수 없습니다.")
+        investors[investor] = max(new_units, 0.0)
+
+        event = {"seq": int(state["seq"]) + 1, "date": date or _today_kst(), "type": priced.get("type", event_type),
+                 "investor": investor, "units": units, "amount": priced["amount"], "nav": priced["nav"]}
+        _append_event(event)
+        save_fund_state(investors, priced.get("hwm", state["hwm"]), event["seq"])
+        return event
+
+def _current_nav(equity: float, state: Dict[str, Any]) -> float:
+    total_units = sum(state["investors"].values())
+    if total_units <= 0:
+        return 1.0
+    return equity / total_units
+
+def subscribe(investor: str, amount: float, equity_before: float, date: Optional[str] = None) -> Dict[str, Any]:
+    """입금: 입금 직전 자산 기준 NAV로 좌수 발행 -> 기존 투자자 NAV는 변하지 않음"""
+    if amount <= 0:
+        raise ValueError("amount must be positive")
 
-def save_fund_state(investors_dict: Dict[str, float]) -> None:
-    """투자자별 현황 저장"""
-    os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
-    with open(DATA_FILE, "w", encoding='utf-8') as f:
-        json.dump({"investors": investors_dict}, f, indent=2, ensure_ascii=False)
+    def price(state):
+        nav = _current_nav(equity_before, state)
+        return {"units": amount / nav, "amount": amount, "nav": nav}
+    return _record("subscribe", investor, price, date)
 
+def redeem(investor: str, amount: float, equity_before: float, date: Optional[str] = None) -> Dict[str, Any]:
+    """출금: 출금 직전 자산 기준 NAV로 좌수 소각"""
+    if amount <= 0:
+        raise ValueError("amount must be positive")
+
+    def price(state):
+        nav = _current_nav(equity_before, state)
+        return {"units": -amount / nav, "amount": -amount, "nav": nav}
+    return _record("redeem", investor, price, date)
+
+def charge_performance_fee(equity: float, rate: float = 0.2, date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    성과보수: NAV가 HWM을 넘은 부분의 rate만큼을 운용자 좌수로 발행 (희석 방식)
+    발행 후 NAV를 새 HWM으로 기록합니다. HWM이 없으면 현재 NAV를 hwm 이벤트로 기록만 하고 None.
+    """
+    def price(state):
+        total_units = sum(state["investors"].values())
+        nav = _current_nav(equity, state)
+        hwm = float(state.get("hwm") or 0.0)
+        if total_units <= 0 or nav <= hwm:
+            return None
+        if hwm <= 0:
+            # 최초 HWM 설정 (좌수 0) -> 원장에 남겨야 rebuild_state가 복구함
+            return {"type": "hwm", "units": 0.0, "amount": 0.0, "nav": nav, "hwm": nav}
+        fee_value = (nav - hwm) * total_units * rate
+        # 발행 후 NAV: equity / (U + u) ,  u * NAV' = fee_value
+        fee_units = fee_value * total_units / (equity - fee_value)
+        nav_after = equity / (total_units + fee_units)
+        return {"units": fee_units, "amount": fee_value, "nav": nav_after, "hwm": nav_after}
+    event = _record("fee", MANAGER, price, date)
+    return event if event is not None and event["type"] == "fee" else None
+
+def rebuild_state() -> Dict[str, Any]:
+    """스냅샷이 손상/유실됐을 때 원장을 처음부터 재생해 복구"""
+    investors: Dict[str, float] = {}
+    hwm, seq = 0.0, 0
+    for e in sorted(load_ledger(), key=lambda e: e["seq"]):
+        investors[e["investor"]] = investors.get(e["investor"], 0.0) + float(e["units"])
+        if e["type"] in ("fee", "hwm"):
+            hwm = float(e["nav"])
+        seq = e["seq"]
+    with _write_lock, file_lock(LEDGER_FILE):
+        save_fund_state(investors, hwm, seq)
+    return {"investors": investors, "hwm": hwm, "seq": seq}
+
+# ---------------------------
+# 조회
+# ---------------------------
 def get_nav_metrics(current_equity: float, history_df) -> Dict[str, Any]:
-    """NAV, 변동률, 그리고 투자자별 평가액 계산"""
+    """NAV, 변동률, 그리고 투자자별 평가액 계산 (스냅샷만 읽음 -> 원장 재생 없음)"""
     state = load_fund_state()
-    investors = state.get("investors", {})
+    investors = {k: v for k, v in state.get("investors", {}).items() if v > 0}
     
     total_units = sum(investors.values())
     if total_units <= 0: 
@@ -59,5 +202,66 @@ def get_nav_metrics(current_equity: float, history_df) -> Dict[str, Any]:
         "nav": current_nav,
         "total_units": total_units,
         "change_pct": nav_change_pct,
-        "investors": investors
+        "investors": investors,
+        "hwm": float(state.get("hwm") or 0.0),
     }
+
+def _build_timeline(path: str) -> Dict[str, Any]:
+    """
+    원장 -> 날짜별 누적 좌수 배열
+    Returns: {"dates": [...], "total": ndarray, "investors": {name: ndarray}}
+    """
+    events = sorted(_parse_ledger(path), key=lambda e: (e["date"], e["seq"]))
+    dates: List[str] = []
+    names = sorted({e["investor"] for e in events})
+    per = {n: [] for n in names}
+    running = {n: 0.0 for n in names}
+    for e in events:
+        running[e["investor"]] += float(e["units"])
+        if dates and dates[-1] == e["date"]:
+            for n in names:
+                per[n][-1] = running[n]
+        else:
+            dates.append(e["date"])
+            for n in names:
+                per[n].append(running[n])
+
+    investors = {n: np.asarray(v, dtype=float) for n, v in per.items()}
+    total = np.sum(list(investors.values()), axis=0) if investors else np.zeros(len(dates))
+    return {"dates": np.asarray(dates, dtype="U10"), "total": total, "investors": investors}
+
+_EMPTY_TIMELINE = {"dates": np.asarray([], dtype="U10"), "total": np.zeros(0), "investors": {}}
+
+def _units_timeline() -> Dict[str, Any]:
+    """원장 파일이 바뀔 때만 재계산"""
+    return cached_read(LEDGER_FILE, _build_timeline, default=_EMPTY_TIMELINE)
+
+def investor_history(history_df, investor: Optional[str] = None):
+    """
+    일별 자산 기록과 좌수 원장으로 날짜별 NAV와 투자자 평가액을 계산
+    각 날짜의 좌수는 이진 탐색(np.searchsorted)으로 찾으므로 원장을 다시 재생하지 않습니다.
+    """
+    import pandas as pd
+
+    tl = _units_timeline()
+    out = pd.DataFrame({"date": history_df["date"].astype(str).str[:10], "equity": history_df["equity"].astype(float)})
+    if not len(tl["dates"]):
+        out["nav"] = np.nan
+        return out
+
+    # 각 날짜 종료 시점 기준 보유 좌수 (해당 날짜 이전/당일 마지막 이벤트)
+    idx = np.searchsorted(tl["dates"], out["date"].to_numpy(dtype="U10"), side="right") - 1
+    valid = idx >= 0
+    total = np.where(valid, tl["total"][np.clip(idx, 0, None)], np.nan)
+    out["total_units"] = total
+    out["nav"] = np.where(total > 0, out["equity"] / np.where(total > 0, total, 1.0), np.nan)
+
+    names = [investor] if investor else list(tl["investors"])
+    for n in names:
+        units = tl["investors"].get(n)
+        if units is None:
+            continue
+        u = np.where(valid, units[np.clip(idx, 0, None)], 0.0)
+        out[f"{n} units"] = u
+        out[f"{n} value"] = u * out["nav"]
+    return out
@@ -1,47 +1,147 @@
 # services/history.py
+import csv
 import os
+import sqlite3
+import threading
 import pandas as pd
 from datetime import datetime, timedelta, timezone
-import streamlit as st
+from typing import Optional
+
+from utils.filecache import file_lock
+from utils.telemetry import timed
 
 DATA_DIR = "data"
-FILE_PATH = os.path.join(DATA_DIR, "equity_history.csv")
+FILE_PATH = os.path.join(DATA_DIR, "equity_history.csv")  # 구버전 CSV (1회 마이그레이션 원본)
+DB_PATH = os.path.join(DATA_DIR, "history.db")
+
+_conn: Optional[sqlite3.Connection] = None
+DB_LOCK = threading.RLock()  # 같은 연결을 쓰는 모든 모듈이 공유
 
 def get_kst_now():
     return datetime.now(timezone(timedelta(hours=9)))
 
-def load_history():
-    if not os.path.exists(FILE_PATH):
-        return pd.DataFrame(columns=["date", "equity"])
-    try:
-        df = pd.read_csv(FILE_PATH)
+def _migrate_csv(conn: sqlite3.Connection) -> None:
+    """equity_history.csv -> equity_daily (최초 1회만)"""
+    done = conn.execute("SELECT 1 FROM meta WHERE key = 'csv_migrated'").fetchone()
+    if done:
+        return
+    rows = []
+    if os.path.exists(FILE_PATH):
+        with open(FILE_PATH, newline="", encoding="utf-8") as f:
+            for r in csv.DictReader(f):
+                try:
+                    rows.append((str(r["date"]).strip(), float(r["equity"])))
+                except (KeyError, TypeError, ValueError):
+                    continue
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO equity_daily (date, equity) VALUES (?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_migrated', ?)", (str(len(rows)),))
+
+def get_conn() -> sqlite3.Connection:
+    """프로세스 전역 SQLite 연결 (WAL, date PK 인덱스)"""
+    global _conn
+    with DB_LOCK:
+        if _conn is None:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS equity_daily ("
+                " date TEXT PRIMARY KEY,"
+                " equity REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            # 여러 프로세스(대시보드/수집기)가 동시에 처음 열어도 마이그레이션은 한 번만
+            with file_lock(DB_PATH):
+                _migrate_csv(conn)
+            _conn = conn
+        return _conn
+
+def has_date(date_str: str) -> bool:
+    """해당 날짜 기록 여부 (PK 인덱스 조회)"""
+    with DB_LOCK:
+        return get_conn().execute("SELECT 1 FROM equity_daily WHERE date = ?", (date_str,)).fetchone() is not None
+
+def record_equity(date_str: str, equity: float, upsert: bool = False) -> bool:
+    """
+    하루치 자산 기록 (append-only)
+    upsert=True이면 같은 날짜를 원자적으로 덮어씀. 저장 여부를 반환합니다.
+    """
+    with DB_LOCK:
+        conn = get_conn()
+        with conn:
+            if upsert:
+                cur = conn.execute(
+                    "INSERT INTO equity_daily (date, equity) VALUES (?, ?) "
+                    "ON CONFLICT(date) DO UPDATE SET equity = excluded.equity",
+                    (date_str, float(equity)))
+            else:
+                cur = conn.execute("INSERT OR IGNORE INTO equity_daily (date, equity) VALUES (?, ?)",
+                                   (date_str, float(equity)))
+        return cur.rowcount > 0
+
+_history_cache = {"key": None, "df": None}
+
+def _fingerprint(conn) -> tuple:
+    """
+    일별 테이블 변경 감지용 지문 (행 수, 마지막 날짜, 마지막 값)
+    쓰기는 append 또는 오늘 행 upsert뿐이라 이 세 값으로 충분합니다.
+    DB 파일 mtime은 인트라데이 틱 기록으로 10초마다 바뀌므로 쓰지 않음.
+    """
+    return conn.execute(
+        "SELECT COUNT(*), MAX(date), (SELECT equity FROM equity_daily ORDER BY date DESC LIMIT 1) "
+        "FROM equity_daily").fetchone()
+
+def load_history(start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+    """
+    날짜 범위 조회 (YYYY-MM-DD, 양끝 포함). 인자가 없으면 전체.
+    전체 조회는 테이블이 바뀌었을 때만 다시 읽음 (반환된 DataFrame은 공유되므로 수정 금지)
+    """
+    if start is None and end is None:
+        try:
+            with DB_LOCK:
+                key = _fingerprint(get_conn())
+        except sqlite3.Error:
+            key = None
+        if key is not None and _history_cache["key"] == key:
+            return _history_cache["df"]
+        df = _query_history(None, None)
+        if key is not None:
+            _history_cache.update(key=key, df=df)
         return df
-    except Exception:
-        return pd.DataFrame(columns=["date", "equity"])
+    return _query_history(start, end)
+
+def _query_history(start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+    sql = "SELECT date, equity FROM equity_daily"
+    cond, args = [], []
+    if start:
+        cond.append("date >= ?"); args.append(start)
+    if end:
+        cond.append("date <= ?"); args.append(end)
+    if cond:
+        sql += " WHERE " + " AND ".join(cond)
+    sql += " ORDER BY date"
+    try:
+        with DB_LOCK:
+            rows = get_conn().execute(sql, args).fetchall()
+    except sqlite3.Error:
+        rows = []
+    return pd.DataFrame(rows, columns=["date", "equity"])
 
 # [수정됨] force=True일 경우 조건 무시하고 저장
+@timed("history.try_record_snapshot")
 def try_record_snapshot(current_equity, force=False):
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
-
-    df = load_history()
     now_kst = get_kst_now()
     today_str = now_kst.strftime("%Y-%m-%d")
 
-    # 이미 오늘 데이터가 있는지 확인
-    is_exist = today_str in df["date"].values
-
-    # 조건 1: 오늘 기록이 없고 & 9시가 지났거나
-    # 조건 2: 강제 저장(force) 버튼을 눌렀을 때
-    if (not is_exist and now_kst.hour >= 9) or force:
-        
-        # 만약 강제 저장인데 오늘 날짜가 이미 있다면 -> 덮어쓰기 위해 기존 행 삭제
-        if force and is_exist:
-            df = df[df["date"] != today_str]
-
-        new_row = pd.DataFrame([{"date": today_str, "equity": current_equity}])
-        df = pd.concat([df, new_row], ignore_index=True)
-        df.to_csv(FILE_PATH, index=False)
-        return df, True # 저장됨
-        
-    return df, False
+    saved = False
+    # 조건 1: 오늘 기록이 없고 & 9시가 지났거나 (INSERT OR IGNORE -> 이미 있으면 무시)
+    # 조건 2: 강제 저장(force) 버튼을 눌렀을 때 -> 오늘 행을 원자적으로 덮어쓰기
+    if force:
+        saved = record_equity(today_str, current_equity, upsert=True)
+    elif now_kst.hour >= 9 and not has_date(today_str):
+        saved = record_equity(today_str, current_equity)
+
+    return load_history(), saved
@@ -0,0 +1,54 @@
+# services/http.py
+import threading
+from typing import Optional, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 호스트별 커넥션 풀 설정 (Bitget / Upbit 공용)
+POOL_CONNECTIONS = 4      # 캐시할 호스트 풀 개수
+POOL_MAXSIZE = 16         # 호스트당 keep-alive 연결 최대치 (동시 세션 수 고려)
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3       # 0.3s, 0.6s, 1.2s ...
+RETRY_STATUS = (500, 502, 503, 504)   # 429는 재시도하지 않고 호출부(레이트 리미터)로 바로 넘김
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=1,
+        status=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=False,  # 켜 두면 Retry-After가 붙은 429도 여기서 재시도됨
+        raise_on_status=False,  # 재시도 소진 시 마지막 응답을 그대로 반환
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def get_session() -> requests.Session:
+    """
+    프로세스 전역 HTTP 세션 (커넥션 풀 + keep-alive + 5xx 재시도)
+    모든 브라우저 세션/스레드가 같은 풀을 공유하므로 매 틱마다 TCP+TLS 핸드셰이크를 하지 않습니다.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def http_get(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None, timeout: float = 10) -> requests.Response:
+    return get_session().get(url, params=params, headers=headers, timeout=timeout)
@@ -0,0 +1,154 @@
+# services/klines.py
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from typing import Dict, Optional, Tuple
+
+from services.bitget import fetch_candles
+
+DATA_DIR = "data"
+DB_PATH = os.path.join(DATA_DIR, "market.db")
+
+# Bitget granularity -> 봉 길이(ms)
+GRANULARITY_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1H": 3_600_000, "2H": 7_200_000, "4H": 14_400_000, "6H": 21_600_000, "12H": 43_200_000,
+    "1D": 86_400_000, "3D": 259_200_000, "1W": 604_800_000, "1M": 2_592_000_000,
+}
+RECENT_LIMIT = 1000     # candles 엔드포인트 1회 최대
+HISTORY_LIMIT = 200     # history-candles 엔드포인트 1회 최대
+MIN_REFRESH_SEC = 5     # 같은 키에 대한 tail 갱신 최소 간격
+
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.RLock()
+_last_refresh: Dict[Tuple[str, str, str], float] = {}
+_refresh_lock = threading.Lock()   # 수집기 스레드/세션이 같은 키를 동시에 갱신하지 않도록
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    with _lock:
+        if _conn is None:
+            os.makedirs(DATA_DIR, exist_ok=True)
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS candles ("
+                " symbol TEXT, granularity TEXT, product_type TEXT, ts INTEGER,"
+                " open REAL, high REAL, low REAL, close REAL, vol REAL, amount REAL,"
+                " PRIMARY KEY (symbol, granularity, product_type, ts)"
+                ") WITHOUT ROWID"
+            )
+            _conn = conn
+        return _conn
+
+def _norm_granularity(granularity: str) -> str:
+    """'1h' -> '1H' 등 Bitget 표기로 통일 (분봉 '1m'과 월봉 '1M'은 구분)"""
+    if granularity in GRANULARITY_MS:
+        return granularity
+    up = granularity[:-1] + granularity[-1].upper()
+    return up if up in GRANULARITY_MS else granularity
+
+def _upsert(key: Tuple[str, str, str], rows) -> int:
+    if not rows:
+        return 0
+    params = []
+    for r in rows:
+        try:
+            params.append((*key, int(r[0]), float(r[1]), float(r[2]), float(r[3]), float(r[4]),
+                           float(r[5]), float(r[6]) if len(r) > 6 else 0.0))
+        except (TypeError, ValueError, IndexError):
+            continue
+    with _lock:
+        conn = _get_conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO candles "
+                "(symbol, granularity, product_type, ts, open, high, low, close, vol, amount) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", params)
+    return len(params)
+
+def _bounds(key: Tuple[str, str, str]) -> Tuple[Optional[int], Optional[int], int]:
+    with _lock:
+        row = _get_conn().execute(
+            "SELECT MIN(ts), MAX(ts), COUNT(*) FROM candles "
+            "WHERE symbol = ? AND granularity = ? AND product_type = ?", key).fetchone()
+    return row[0], row[1], row[2] or 0
+
+def _claim_refresh(key: Tuple[str, str, str], now: float) -> bool:
+    """MIN_REFRESH_SEC 안에 같은 키를 갱신한 스레드가 없으면 갱신 시각을 기록하고 True"""
+    with _refresh_lock:
+        if now - _last_refresh.get(key, 0.0) < MIN_REFRESH_SEC:
+            return False
+        _last_refresh[key] = now
+        return True
+
+def refresh_tail(symbol: str, granularity: str, product_type: str = "USDT-FUTURES", limit: int = 100) -> None:
+    """
+    마지막 '마감된' 봉 이후만 조회해서 붙임 (진행 중인 봉은 매번 덮어씀)
+    저장된 데이터가 없으면 최근 limit개를 받아옴.
+    """
+    granularity = _norm_granularity(granularity)
+    key = (symbol, granularity, product_type)
+    now = time.time()
+    if not _claim_refresh(key, now):
+        return
+
+    step = GRANULARITY_MS.get(granularity, 60_000)
+    _, last_ts, _ = _bounds(key)
+    now_ms = int(now * 1000)
+    if last_ts is None:
+        _upsert(key, fetch_candles(symbol, granularity, product_type, min(limit, RECENT_LIMIT)))
+        return
+
+    # 마지막 봉이 아직 진행 중이면 그 봉부터, 마감됐으면 다음 봉부터
+    start = last_ts if last_ts + step > now_ms else last_ts + step
+    # candles는 endTime 이전의 최신 limit개를 돌려주므로, 봉 RECENT_LIMIT개 폭의 창마다 endTime을 명시해서
+    # 오래된 창부터 채움 (응답이 없는 창은 거래 중단 구간일 수 있으므로 건너뛰고 다음 창으로)
+    span_ms = RECENT_LIMIT * step
+    while start <= now_ms:
+        end = min(start + span_ms - step, now_ms)
+        rows = fetch_candles(symbol, granularity, product_type, RECENT_LIMIT, start_ms=start, end_ms=end)
+        _upsert(key, [r for r in rows if start <= int(r[0]) <= end])
+        start = end + step
+
+def backfill(symbol: str, granularity: str, product_type: str = "USDT-FUTURES", bars: int = 100) -> int:
+    """저장된 가장 오래된 봉 이전으로 거슬러 올라가며 bars개가 될 때까지 채움"""
+    granularity = _norm_granularity(granularity)
+    key = (symbol, granularity, product_type)
+    added = 0
+    first_ts, _, count = _bounds(key)
+    while count < bars and first_ts is not None:
+        need = min(HISTORY_LIMIT, bars - count)
+        rows = fetch_candles(symbol, granularity, product_type, need, end_ms=first_ts - 1, history=True)
+        rows = [r for r in rows if int(r[0]) < first_ts]
+        n = _upsert(key, rows)
+        if not n:
+            break  # 상장 이전 등 더 이상 과거 데이터 없음
+        added += n
+        first_ts, _, count = _bounds(key)
+    return added
+
+def get_klines(symbol: str = "BTCUSDT", granularity: str = "1h", product_type: str = "USDT-FUTURES", limit: int = 100) -> pd.DataFrame:
+    """
+    로컬 캔들 저장소에서 최근 limit개를 반환 (fetch_kline_futures와 같은 형식)
+    tail만 증분 갱신하고, 부족하면 과거로 페이지네이션해서 채웁니다.
+    디스크(data/market.db)에 저장되므로 재시작 후에도 캐시가 유지됩니다.
+    """
+    granularity = _norm_granularity(granularity)
+    key = (symbol, granularity, product_type)
+    refresh_tail(symbol, granularity, product_type, limit)
+    _, _, count = _bounds(key)
+    if count < limit:
+        backfill(symbol, granularity, product_type, limit)
+
+    with _lock:
+        rows = _get_conn().execute(
+            "SELECT ts, open, high, low, close, vol, amount FROM candles "
+            "WHERE symbol = ? AND granularity = ? AND product_type = ? "
+            "ORDER BY ts DESC LIMIT ?", (*key, int(limit))).fetchall()
+    df = pd.DataFrame(rows[::-1], columns=["timestamp", "open", "high", "low", "close", "vol", "amount"])
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+    return df
@@ -0,0 +1,229 @@
+# services/ledger.py
+import json
+import threading
+import time
+import pandas as pd
+from typing import Dict, Optional, Tuple
+
+from services.bitget import fetch_account_bills_page
+from services.history import get_conn, DB_LOCK
+
+PAGE_LIMIT = 100
+WINDOW_MS = 30 * 86400 * 1000          # Bitget bill 조회 기간 최대 30일
+RETENTION_MS = 90 * 86400 * 1000       # Bitget이 제공하는 과거 범위
+OVERLAP_MS = 3600 * 1000               # 증분 동기화 시 겹쳐서 조회할 구간
+MAX_PAGES = 200                        # 한 번의 동기화에서 호출할 최대 페이지 수
+SYNC_INTERVAL = 600                    # 대시보드 단독 실행 시 동기화 주기 (collector.py의 LEDGER_INTERVAL과 동일)
+
+# businessType 분류
+FUNDING_TYPES = ("contract_main_settle_fee", "contract_margin_settle_fee")
+PNL_PREFIXES = ("close_", "burst_", "offset_", "delivery_")
+TRANSFER_PREFIXES = ("trans_",)
+
+_schema_ready = False
+
+def _ensure_schema(conn) -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bills ("
+            " bill_id TEXT PRIMARY KEY,"
+            " account TEXT, product_type TEXT, symbol TEXT, coin TEXT, business_type TEXT,"
+            " amount REAL, fee REAL, balance REAL, c_time INTEGER"
+            ") WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS bills_time ON bills (account, product_type, c_time)")
+        conn.execute("CREATE INDEX IF NOT EXISTS bills_symbol ON bills (symbol, c_time)")
+    _schema_ready = True
+
+def _fnum(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _insert(conn, account: str, product_type: str, bills) -> int:
+    """bill_id 기준 중복 제거 후 삽입, 새로 들어간 건수를 반환"""
+    rows = [(
+        str(b.get("billId")), account, product_type, (b.get("symbol") or "").upper(), b.get("coin"),
+        b.get("businessType"), _fnum(b.get("amount")),
+        _fnum(b.get("fee")) + _fnum(b.get("feeByCoupon")), _fnum(b.get("balance")), int(_fnum(b.get("cTime"))),
+    ) for b in bills if b.get("billId")]
+    before = conn.total_changes
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO bills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return conn.total_changes - before
+
+def _sync_window(creds, account, product_type, start_ms, end_ms, stop_on_known: bool, budget: Dict[str, int],
+                 cursor: Optional[str] = None) -> Tuple[int, bool, Optional[str]]:
+    """
+    [start_ms, end_ms] 구간을 최신 -> 과거 방향으로 idLessThan 커서를 따라 페이지 조회
+    Returns: (추가 건수, 구간을 끝까지 받았는지, 예산이 떨어져 멈췄다면 이어서 조회할 idLessThan)
+    """
+    added = 0
+    while budget["pages"] > 0:
+        budget["pages"] -= 1
+        bills, end_id, res = fetch_account_bills_page(*creds, product_type, PAGE_LIMIT,
+                                                      id_less_than=cursor, start_ms=start_ms, end_ms=end_ms)
+        if res.get("code") != "00000":
+            raise RuntimeError(res.get("msg") or f"code {res.get('code')}")
+        if not bills:
+            return added, True, None
+        with DB_LOCK:
+            n = _insert(get_conn(), account, product_type, bills)
+        added += n
+        # 이미 가진 bill을 만나면 그 이전은 모두 동기화된 상태
+        if (stop_on_known and n < len(bills)) or len(bills) < PAGE_LIMIT or not end_id or end_id == cursor:
+            return added, True, None
+        cursor = end_id
+    return added, False, cursor
+
+def sync_bills(api_key: str, api_secret: str, passphrase: str, product_type: str = "USDT-FUTURES",
+               account: str = "main", now_ms: Optional[int] = None) -> int:
+    """
+    로컬 장부를 Bitget bill과 동기화하고 새로 추가된 건수를 반환
+    - 최초 실행: 30일 구간씩 과거로 이동하며 보관 범위(90일) 전체를 받음
+      (MAX_PAGES로 끝나지 않으면 멈춘 위치를 meta에 저장하고 다음 실행에서 이어서 받음)
+    - 이후 실행: 마지막 bill 시각 이후만 조회하고, 이미 가진 bill을 만나면 중단
+    """
+    creds = (api_key, api_secret, passphrase)
+    now_ms = int(now_ms if now_ms is not None else time.time() * 1000)
+    budget = {"pages": MAX_PAGES}
+    state_key = f"bills_backfilled:{account}:{product_type}"
+    cursor_key = f"bills_backfill_cursor:{account}:{product_type}"
+
+    with DB_LOCK:
+        conn = get_conn()
+        _ensure_schema(conn)
+        done = conn.execute("SELECT 1 FROM meta WHERE key = ?", (state_key,)).fetchone() is not None
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (cursor_key,)).fetchone()
+        resume = json.loads(row[0]) if row else None
+        last = conn.execute("SELECT MAX(c_time) FROM bills WHERE account = ? AND product_type = ?",
+                            (account, product_type)).fetchone()[0]
+
+    added = 0
+    if done and last is not None:
+        start = max(int(last) - OVERLAP_MS, now_ms - RETENTION_MS)
+        end = now_ms
+        while start < end and budget["pages"] > 0:
+            # 마지막 동기화 이후가 30일을 넘으면 구간을 나눠서 조회
+            win_start = max(start, end - WINDOW_MS)
+            added += _sync_window(creds, account, product_type, win_start, end, True, budget)[0]
+            end = win_start
+        return added
+
+    # 최초 백필: 예산이 떨어지면 (구간 끝, idLessThan)을 저장해 두고 다음 실행에서 이어서 조회
+    oldest = now_ms - RETENTION_MS
+    end, cursor = (int(resume["end"]), resume["id"]) if resume else (now_ms, None)
+    while end > oldest and budget["pages"] > 0:
+        win_start = max(oldest, end - WINDOW_MS)
+        n, finished, cursor = _sync_window(creds, account, product_type, win_start, end, False, budget, cursor)
+        added += n
+        if not finished:
+            break
+        end, cursor = win_start, None
+    with DB_LOCK:
+        conn = get_conn()
+        with conn:
+            if end <= oldest:
+                # 보관 범위(90일) 시작까지 받은 뒤에만 완료 표시
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (state_key, str(now_ms)))
+                conn.execute("DELETE FROM meta WHERE key = ?", (cursor_key,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                             (cursor_key, json.dumps({"end": end, "id": cursor})))
+    return added
+
+_sync_lock = threading.Lock()
+_sync_state: Dict[str, object] = {"at": float("-inf"), "running": False, "error": None}
+
+def sync_in_background(accounts, interval: float = SYNC_INTERVAL) -> bool:
+    """
+    collector.py 없이 대시보드만 실행할 때: interval마다 한 번, 모든 계정/상품의 bill을 백그라운드 스레드에서 동기화
+    (틱을 막지 않고, 세션 수와 무관하게 프로세스당 1개만 실행)
+    Returns: 이번 호출로 동기화를 시작했는지
+    """
+    now = time.monotonic()
+    with _sync_lock:
+        if _sync_state["running"] or now - _sync_state["at"] < interval:
+            return False
+        _sync_state.update(at=now, running=True)
+
+    def run():
+        error = None
+        try:
+            for acc in accounts:
+                for pt in acc.product_types:
+                    try:
+                        sync_bills(*acc.creds, pt, account=acc.name)
+                    except Exception as e:
+                        error = f"{acc.name}/{pt}: {e}"
+        finally:
+            with _sync_lock:
+                _sync_state.update(running=False, error=error)
+
+    threading.Thread(target=run, name="ledger-sync", daemon=True).start()
+    return True
+
+def sync_error() -> Optional[str]:
+    """마지막 백그라운드 동기화 오류 (없으면 None)"""
+    with _sync_lock:
+        return _sync_state["error"]
+
+def load_bills(start_ms: Optional[int] = None, end_ms: Optional[int] = None, symbol: Optional[str] = None) -> pd.DataFrame:
+    sql = "SELECT * FROM bills"
+    cond, args = [], []
+    if start_ms is not None:
+        cond.append("c_time >= ?"); args.append(int(start_ms))
+    if end_ms is not None:
+        cond.append("c_time <= ?"); args.append(int(end_ms))
+    if symbol:
+        cond.append("symbol = ?"); args.append(symbol.upper())
+    if cond:
+        sql += " WHERE " + " AND ".join(cond)
+    sql += " ORDER BY c_time"
+    with DB_LOCK:
+        conn = get_conn()
+        _ensure_schema(conn)
+        cur = conn.execute(sql, args)
+        cols = [c[0] for c in cur.description]
+        return pd.DataFrame(cur.fetchall(), columns=cols)
+
+def pnl_breakdown(by: str = "symbol", start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> pd.DataFrame:
+    """
+    로컬 장부에서 실현손익/수수료/펀딩 집계 (SQL 집계, API 호출 없음)
+    by: "symbol" 또는 "day"(KST 기준 날짜)
+    """
+    if by == "day":
+        key = "date(c_time / 1000 + 9 * 3600, 'unixepoch')"
+    elif by == "symbol":
+        key = "symbol"
+    else:
+        raise ValueError(f"unsupported breakdown: {by}")
+
+    funding = " OR ".join("business_type = ?" for _ in FUNDING_TYPES)
+    pnl = " OR ".join("business_type LIKE ?" for _ in PNL_PREFIXES)
+    transfer = " OR ".join("business_type LIKE ?" for _ in TRANSFER_PREFIXES)
+    sql = (
+        f"SELECT {key} AS key,"
+        f" SUM(CASE WHEN {pnl} THEN amount ELSE 0 END) AS realized_pnl,"
+        f" SUM(fee) AS fees,"
+        f" SUM(CASE WHEN {funding} THEN amount ELSE 0 END) AS funding"
+        f" FROM bills WHERE NOT ({transfer})"
+    )
+    args = [f"{p}%" for p in PNL_PREFIXES] + list(FUNDING_TYPES) + [f"{p}%" for p in TRANSFER_PREFIXES]
+    if start_ms is not None:
+        sql += " AND c_time >= ?"; args.append(int(start_ms))
+    if end_ms is not None:
+        sql += " AND c_time <= ?"; args.append(int(end_ms))
+    sql += f" GROUP BY {key} ORDER BY {key}"
+
+    with DB_LOCK:
+        conn = get_conn()
+        _ensure_schema(conn)
+        rows = conn.execute(sql, args).fetchall()
+    df = pd.DataFrame(rows, columns=[by, "realized_pnl", "fees", "funding"])
+    df["net"] = df["realized_pnl"] + df["fees"] + df["funding"]
+    return df
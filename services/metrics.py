@@ -0,0 +1,148 @@
+# services/metrics.py
+import math
+import threading
+from collections import deque
+from datetime import date
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from services.history import get_kst_now
+
+ANNUALIZE = 365                      # 코인 시장은 365일 거래
+WINDOWS = {"1W": 7, "1M": 30}        # 일 단위 롤링 창 (All은 누적 상태 사용)
+MAX_WINDOW = max(WINDOWS.values())
+
+def _new_state() -> Dict[str, Any]:
+    return {
+        "n": 0, "first": None, "last": None, "last_date": None,
+        "peak": None, "max_dd": 0.0,
+        "uw_start": None, "longest_uw": 0,
+        # 일간 수익률 누적 (Welford)
+        "r_n": 0, "r_mean": 0.0, "r_m2": 0.0, "r_down_sq": 0.0,
+    }
+
+def _apply(st: Dict[str, Any], d: date, equity: float) -> None:
+    """누적 상태에 한 점을 반영 (O(1))"""
+    if st["last"] is not None and st["last"] > 0:
+        r = equity / st["last"] - 1.0
+        st["r_n"] += 1
+        delta = r - st["r_mean"]
+        st["r_mean"] += delta / st["r_n"]
+        st["r_m2"] += delta * (r - st["r_mean"])
+        st["r_down_sq"] += min(r, 0.0) ** 2
+
+    if st["peak"] is None or equity >= st["peak"]:
+        if st["uw_start"] is not None:
+            st["longest_uw"] = max(st["longest_uw"], (d - st["uw_start"]).days)
+        st["peak"], st["uw_start"] = equity, None
+    else:
+        if st["uw_start"] is None:
+            st["uw_start"] = st["last_date"] or d
+        if st["peak"] > 0:
+            st["max_dd"] = min(st["max_dd"], equity / st["peak"] - 1.0)
+
+    if st["first"] is None:
+        st["first"] = equity
+    st["n"] += 1
+    st["last"], st["last_date"] = equity, d
+
+def _ratios(n: int, mean: float, m2: float, down_sq: float) -> Dict[str, Optional[float]]:
+    if n < 2:
+        return {"volatility_pct": None, "sharpe": None, "sortino": None}
+    std = math.sqrt(m2 / (n - 1))
+    down = math.sqrt(down_sq / n)
+    ann = math.sqrt(ANNUALIZE)
+    return {
+        "volatility_pct": std * ann * 100.0,
+        "sharpe": (mean / std * ann) if std > 0 else None,
+        "sortino": (mean / down * ann) if down > 0 else None,
+    }
+
+class RiskEngine:
+    """
+    자산 곡선 리스크 지표 (MDD, 변동성, Sharpe/Sortino, 손실 구간 기간, 기간 수익률)
+    - All: 새 점이 들어올 때마다 누적 상태만 갱신 (전체 재계산 없음)
+    - 1W/1M: 최근 MAX_WINDOW일만 보관하는 deque에서 계산
+    - 현재 자산(live)은 상태를 바꾸지 않고 복사본에 임시로 반영
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = _new_state()
+        self._prev = None                   # 마지막 점 반영 직전 상태 (같은 날짜 덮어쓰기용)
+        self._recent = deque(maxlen=MAX_WINDOW + 1)
+        self._count = 0
+
+    def _push(self, d: date, equity: float) -> None:
+        self._prev = dict(self._state)
+        _apply(self._state, d, equity)
+        self._recent.append((d, equity))
+
+    def sync(self, history_df: pd.DataFrame) -> None:
+        """일별 기록 중 새로 추가/변경된 끝부분만 반영"""
+        if history_df is None or history_df.empty:
+            return
+        n = len(history_df)
+        with self._lock:
+            last_date = self._state["last_date"]
+            if self._count and n >= self._count and str(history_df["date"].iloc[self._count - 1]) == str(last_date):
+                start = self._count
+                # 마지막 행 값이 바뀌었으면(force 저장) 직전 상태로 되돌린 뒤 다시 반영
+                last_val = float(history_df["equity"].iloc[self._count - 1])
+                if last_val != self._state["last"] and self._prev is not None:
+                    self._state = dict(self._prev)
+                    self._recent.pop()
+                    start -= 1
+            else:
+                # 처음이거나 과거 기록이 바뀜 -> 한 번만 전체 재구성
+                self._state, self._prev = _new_state(), None
+                self._recent.clear()
+                start = 0
+            for d, eq in zip(history_df["date"].iloc[start:], history_df["equity"].iloc[start:]):
+                self._push(date.fromisoformat(str(d)[:10]), float(eq))
+            self._count = n
+
+    def metrics(self, timeframe: str = "All", live_equity: Optional[float] = None,
+                today: Optional[date] = None) -> Dict[str, Any]:
+        # 일별 기록과 같은 KST 날짜 기준 (서버 로컬 시간대와 무관)
+        today = today or get_kst_now().date()
+        with self._lock:
+            if timeframe in WINDOWS:
+                return self._window_metrics(WINDOWS[timeframe], live_equity, today)
+            st = dict(self._state)
+        if live_equity is not None and live_equity > 0 and st["last_date"] != today:
+            _apply(st, today, live_equity)
+        return self._summarize(st, today)
+
+    def _summarize(self, st: Dict[str, Any], today: date) -> Dict[str, Any]:
+        out = {
+            "return_pct": ((st["last"] / st["first"] - 1.0) * 100.0) if st["first"] else 0.0,
+            "max_drawdown_pct": st["max_dd"] * 100.0,
+            "drawdown_pct": ((st["last"] / st["peak"] - 1.0) * 100.0) if st["peak"] else 0.0,
+            "underwater_days": (today - st["uw_start"]).days if st["uw_start"] else 0,
+            "longest_underwater_days": st["longest_uw"],
+        }
+        out["longest_underwater_days"] = max(out["longest_underwater_days"], out["underwater_days"])
+        out.update(_ratios(st["r_n"], st["r_mean"], st["r_m2"], st["r_down_sq"]))
+        return out
+
+    def _window_metrics(self, days: int, live_equity: Optional[float], today: date) -> Dict[str, Any]:
+        points = [(d, e) for d, e in self._recent if (today - d).days <= days]
+        if live_equity is not None and live_equity > 0 and (not points or points[-1][0] != today):
+            points.append((today, live_equity))
+        st = _new_state()
+        for d, e in points:  # 최대 MAX_WINDOW + 1 점
+            _apply(st, d, e)
+        return self._summarize(st, today)
+
+_engine: Optional[RiskEngine] = None
+_engine_lock = threading.Lock()
+
+def get_risk_engine() -> RiskEngine:
+    """프로세스 전역 지표 엔진 (모든 세션 공유)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RiskEngine()
+        return _engine
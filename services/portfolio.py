@@ -0,0 +1,145 @@
+# services/portfolio.py
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from services.bitget import fetch_positions, fetch_accounts
+from services.upbit import fetch_usdt_krw
+from services.fanout import fetch_concurrently
+from services.snapshot import Snapshot, _freeze
+from utils.telemetry import timed
+
+# 상품 유형별 증거금 코인 (None = 코인별 계좌 여러 개)
+PRODUCT_MARGIN_COIN = {
+    "USDT-FUTURES": "USDT",
+    "USDC-FUTURES": "USDC",
+    "COIN-FUTURES": None,
+}
+STABLE_COINS = {"USDT", "USDC"}
+MAX_INFLIGHT_PRIVATE = 6   # 모든 계정이 공유하는 동시 private 요청 한도
+
+_budget = threading.BoundedSemaphore(MAX_INFLIGHT_PRIVATE)
+
+@dataclass(frozen=True)
+class Account:
+    name: str
+    api_key: str
+    api_secret: str
+    passphrase: str
+    product_types: Tuple[str, ...] = ("USDT-FUTURES",)
+
+    @property
+    def creds(self) -> Tuple[str, str, str]:
+        return (self.api_key, self.api_secret, self.passphrase)
+
+def load_accounts(conf: Mapping[str, Any]) -> List[Account]:
+    """
+    secrets.toml의 [bitget] 섹션 -> 계정 목록
+
+        [bitget]
+        api_key = "..."            # 기본 계정 (name = "main")
+        product_types = ["USDT-FUTURES", "USDC-FUTURES", "COIN-FUTURES"]
+
+        [[bitget.accounts]]        # 서브 계정 (product_types 생략 시 기본값 상속)
+        name = "sub1"
+        api_key = "..."
+    """
+    default_products = tuple(conf.get("product_types") or ("USDT-FUTURES",))
+    accounts = []
+    if conf.get("api_key"):
+        accounts.append(Account(conf.get("name", "main"), conf["api_key"], conf["api_secret"],
+                                conf["passphrase"], default_products))
+    for sub in conf.get("accounts") or []:
+        accounts.append(Account(sub["name"], sub["api_key"], sub["api_secret"], sub["passphrase"],
+                                tuple(sub.get("product_types") or default_products)))
+    return accounts
+
+def _limited(fn, *args):
+    """공유 예산 안에서 private 호출 (한 계정이 많아도 전체 동시 요청 수는 고정)"""
+    with _budget:
+        return fn(*args)
+
+def _fnum(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+@timed("snapshot.load")
+def load_portfolio_snapshot(accounts: Sequence[Account], timeout: float = 8.0,
+                            previous: Optional[Snapshot] = None) -> Snapshot:
+    """
+    모든 (계정, 상품) 조합의 포지션/계좌를 동시에 조회해 하나의 스냅샷으로 합침
+    - 소요 시간은 가장 느린 호출 기준 (합이 아님)
+    - positions의 각 항목에는 account / productType 필드가 붙음
+    - breakdown에 계정/상품별 자산 요약을 담아 드릴다운에 사용
+    - 일부 조합이 실패하면 직전 스냅샷의 해당 조합 값을 유지
+    """
+    tasks = {"usdt_rate": fetch_usdt_krw}
+    for acc in accounts:
+        for pt in acc.product_types:
+            coin = PRODUCT_MARGIN_COIN.get(pt)
+            tasks[f"positions:{acc.name}:{pt}"] = (
+                lambda acc=acc, pt=pt, coin=coin: _limited(fetch_positions, *acc.creds, pt, coin or ""))
+            tasks[f"account:{acc.name}:{pt}"] = (
+                lambda acc=acc, pt=pt: _limited(fetch_accounts, *acc.creds, pt))
+    results, errors = fetch_concurrently(tasks, timeout=timeout)
+
+    prev_positions: Dict[Tuple[str, str], List[Mapping]] = {}
+    prev_breakdown: Dict[Tuple[str, str], Mapping] = {}
+    if previous is not None:
+        for p in previous.positions:
+            prev_positions.setdefault((p.get("account"), p.get("productType")), []).append(p)
+        for b in previous.breakdown:
+            prev_breakdown[(b.get("account"), b.get("productType"))] = b
+
+    positions: List[Mapping] = []
+    breakdown: List[Mapping] = []
+    for acc in accounts:
+        for pt in acc.product_types:
+            key = (acc.name, pt)
+            coin = PRODUCT_MARGIN_COIN.get(pt)
+
+            pkey, akey = f"positions:{acc.name}:{pt}", f"account:{acc.name}:{pt}"
+            pos_data, pos_res = results.get(pkey, ([], {}))
+            acct_list, acct_res = results.get(akey, ([], {}))
+            for name, res in ((pkey, pos_res), (akey, acct_res)):
+                if name not in errors and res.get("code") != "00000":
+                    errors[name] = res.get("msg") or f"code {res.get('code')}"
+
+            if pkey in errors:
+                positions.extend(prev_positions.get(key, []))
+            else:
+                positions.extend(_freeze({**p, "account": acc.name, "productType": pt}) for p in pos_data)
+
+            if akey in errors:
+                if key in prev_breakdown:
+                    breakdown.append(prev_breakdown[key])
+                continue
+            accts = [a for a in acct_list if coin is None or a.get("marginCoin") == coin]
+            breakdown.append(_freeze({
+                "account": acc.name,
+                "productType": pt,
+                "usdtEquity": sum((_fnum(a.get("usdtEquity")) for a in accts), 0.0),
+                # 코인 마진 계좌의 available은 코인 수량이라 합산하지 않음
+                "available": sum((_fnum(a.get("available")) for a in accts
+                                 if str(a.get("marginCoin", "")).upper() in STABLE_COINS), 0.0),
+            }))
+
+    account = None
+    if breakdown:
+        account = _freeze({
+            "marginCoin": "USDT",
+            "usdtEquity": sum(b["usdtEquity"] for b in breakdown),
+            "available": sum(b["available"] for b in breakdown),
+        })
+    elif previous is not None:
+        account = previous.account
+
+    usdt_rate = results.get("usdt_rate")
+    if usdt_rate is None and previous is not None:
+        usdt_rate = previous.usdt_rate
+
+    return Snapshot(tuple(positions), account, usdt_rate, MappingProxyType(errors), time.time(), tuple(breakdown))
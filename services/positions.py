@@ -0,0 +1,135 @@
+# services/positions.py
+import threading
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+# Bitget all-position 필드 -> 컬럼 (숫자형)
+NUMERIC_FIELDS = {
+    "leverage": "leverage",
+    "unrealizedPL": "upl",
+    "marginSize": "margin",
+    "averageOpenPrice": "entry",
+    "markPrice": "mark",
+    "liquidationPrice": "liq",
+    "total": "size",
+}
+# 코인 마진 상품은 손익/증거금이 코인 수량이라 시장가를 곱해 USD로 환산
+COIN_MARGINED = {"COIN-FUTURES"}
+COLUMNS = ["account", "symbol", "side", *NUMERIC_FIELDS.values(), "notional", "signed_notional", "roe", "liq_dist_pct"]
+
+def positions_frame(positions: Iterable[Mapping[str, Any]]) -> pd.DataFrame:
+    """
+    Bitget 포지션 payload를 한 번만 파싱해 타입이 고정된 컬럼형 DataFrame으로 변환
+    (숫자 변환 실패 값은 fnum과 동일하게 0.0)
+    """
+    rows = list(positions or [])
+    if not rows:
+        return pd.DataFrame({c: pd.Series(dtype="object" if c in ("account", "symbol", "side") else "float64") for c in COLUMNS})
+
+    raw = pd.DataFrame.from_records([dict(p) for p in rows])
+    df = pd.DataFrame(index=raw.index)
+    account = raw["account"] if "account" in raw else pd.Series("", index=raw.index)
+    df["account"] = account.fillna("").astype(str)
+    sym = raw["symbol"] if "symbol" in raw else pd.Series("", index=raw.index)
+    df["symbol"] = sym.fillna("").astype(str).str.split("_").str[0].str.upper()
+    side = raw["holdSide"] if "holdSide" in raw else pd.Series("", index=raw.index)
+    df["side"] = side.fillna("").astype(str).str.upper()
+
+    for src, col in NUMERIC_FIELDS.items():
+        if src in raw:
+            df[col] = pd.to_numeric(raw[src], errors="coerce").fillna(0.0).astype("float64")
+        else:
+            df[col] = 0.0
+    if "productType" in raw:
+        coin = raw["productType"].isin(COIN_MARGINED).to_numpy()
+        if coin.any():
+            for col in ("upl", "margin"):
+                df[col] = np.where(coin, df[col] * df["mark"], df[col])
+
+    # 파생 컬럼 (한 번에 벡터 연산)
+    df["notional"] = df["margin"] * df["leverage"]
+    sign = np.where(df["side"] == "SHORT", -1.0, np.where(df["side"] == "LONG", 1.0, 0.0))
+    df["signed_notional"] = df["notional"] * sign
+    df["roe"] = np.where(df["margin"] != 0, df["upl"] / df["margin"].where(df["margin"] != 0, 1.0) * 100.0, 0.0)
+    # 청산가까지 남은 거리 (%), 청산가가 없으면 NaN
+    valid = (df["liq"] > 0) & (df["mark"] > 0)
+    df["liq_dist_pct"] = np.where(valid, (df["mark"] - df["liq"]).abs() / df["mark"].where(valid, 1.0) * 100.0, np.nan)
+    return df[COLUMNS].reset_index(drop=True)
+
+def summarize(df: pd.DataFrame, equity: float) -> Dict[str, Any]:
+    """모든 UI 컴포넌트가 공유하는 집계값 (한 번의 벡터 연산)"""
+    upl = float(df["upl"].sum())
+    margin_used = float(df["margin"].sum())
+    notional = float(df["notional"].sum())
+    long_notional = float(df.loc[df["side"] == "LONG", "notional"].sum())
+    short_notional = float(df.loc[df["side"] == "SHORT", "notional"].sum())
+    net_delta = long_notional - short_notional
+    equity_base = equity if equity > 0 else 1.0
+
+    by_symbol = (df.groupby("symbol", sort=False)[["notional", "signed_notional", "upl"]].sum()
+                 .sort_values("notional", ascending=False))
+    liq = df["liq_dist_pct"].dropna()
+
+    return {
+        "upl": upl,
+        "margin_used": margin_used,
+        "notional": notional,
+        "long_notional": long_notional,
+        "short_notional": short_notional,
+        "net_delta": net_delta,
+        "exposure": long_notional + short_notional,
+        "delta_ratio": net_delta / equity_base,
+        "roe": (upl / equity * 100) if equity > 0 else 0.0,
+        "usage_pct": (margin_used / equity * 100) if equity > 0 else 0.0,
+        "leverage": (notional / equity) if equity > 0 else 0.0,
+        "by_symbol": by_symbol,
+        "min_liq_dist_pct": float(liq.min()) if len(liq) else None,
+    }
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, Any] = {"positions": None, "frame": None}
+
+def frame_for(positions) -> pd.DataFrame:
+    """
+    같은 스냅샷(불변 tuple)은 한 번만 파싱 -> 모든 세션이 같은 프레임을 공유
+    (참조를 함께 보관하므로 id 재사용 문제 없음)
+    """
+    with _cache_lock:
+        if _cache["positions"] is positions and _cache["frame"] is not None:
+            return _cache["frame"]
+    df = positions_frame(positions)
+    if isinstance(positions, tuple):
+        with _cache_lock:
+            _cache.update(positions=positions, frame=df)
+    return df
+
+# 정렬 가능한 컬럼 (청산 거리는 청산가가 없으면 NaN -> 항상 마지막)
+SORT_COLUMNS = ("upl", "notional", "roe", "liq_dist_pct")
+_view_cache: Dict[str, Any] = {"key": None, "src": None, "frame": None}
+
+def view_positions(df: pd.DataFrame, sort_by: Optional[str] = "notional", descending: bool = True,
+                   query: str = "", offset: int = 0, limit: Optional[int] = None) -> Tuple[pd.DataFrame, int]:
+    """
+    필터 + 정렬 + 페이지 잘라내기 (컬럼형 프레임에서 서버 측 처리)
+    Returns: (보이는 행만 담은 프레임, 필터 후 전체 행 수)
+    같은 프레임/조건의 정렬 결과는 재사용하므로 페이지 이동은 슬라이스만 수행합니다.
+    """
+    if sort_by is not None and sort_by not in SORT_COLUMNS:
+        raise ValueError(f"unknown sort column: {sort_by}")
+    query = (query or "").strip().upper()
+    key = (id(df), sort_by, descending, query)
+    with _cache_lock:
+        hit = _view_cache["frame"] if _view_cache["key"] == key and _view_cache["src"] is df else None
+    if hit is None:
+        out = df
+        if query:
+            mask = out["symbol"].str.contains(query, regex=False) | out["account"].str.upper().str.contains(query, regex=False)
+            out = out[mask]
+        if sort_by is not None:
+            out = out.sort_values(sort_by, ascending=not descending, na_position="last", kind="stable")
+        hit = out
+        with _cache_lock:
+            _view_cache.update(key=key, src=df, frame=hit)
+    end = None if limit is None else offset + limit
+    return hit.iloc[offset:end], len(hit)
@@ -0,0 +1,149 @@
+# services/ratelimit.py
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# 우선순위 (낮을수록 먼저)
+PRIORITY_HIGH = 0   # 계좌/포지션 등 화면에 바로 보이는 호출
+PRIORITY_LOW = 1    # bill/과거 캔들 등 백그라운드 대량 동기화
+
+# Bitget V2 엔드포인트별 한도 (초당 요청 수, 문서 기준보다 약간 낮게 설정)
+ENDPOINT_LIMITS = {
+    "/api/v2/mix/position/all-position": 5,
+    "/api/v2/mix/account/accounts": 8,
+    "/api/v2/mix/account/bill": 8,
+    "/api/v2/mix/market/candles": 15,
+    "/api/v2/mix/market/history-candles": 8,
+}
+DEFAULT_LIMIT = 8
+LOW_PRIORITY_RESERVE = 0.5   # 저우선 호출은 버킷의 이 비율만큼은 남겨둠 (고우선 호출용 여유분)
+ACQUIRE_TIMEOUT = {PRIORITY_HIGH: 3.0, PRIORITY_LOW: 30.0}
+USAGE_WINDOW = 60            # 사용량 집계 구간(초)
+PUBLIC_KEY = "public"        # 공개 엔드포인트는 키 대신 IP 단위
+
+class TokenBucket:
+    """
+    토큰 버킷 (초당 rate개 충전, 최대 capacity개)
+    - 고우선 호출은 토큰이 1개만 있어도 통과
+    - 저우선 호출은 고우선 대기자가 없고 여유분(reserve) 이상 남았을 때만 통과
+    """
+    def __init__(self, rate: float, capacity: Optional[float] = None, reserve: float = LOW_PRIORITY_RESERVE):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.reserve = self.capacity * reserve
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+        self._waiting = {PRIORITY_HIGH: 0, PRIORITY_LOW: 0}
+        self._used = deque()       # 최근 USAGE_WINDOW 동안 통과한 호출 시각
+        self.throttled = 0         # 예산 부족으로 실패한 호출 수
+        self.server_limited = 0    # 서버 429 응답 수
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _wait_for(self, priority: int, now: float) -> float:
+        """지금 통과할 수 없으면 다시 확인할 때까지 기다릴 시간, 통과 가능하면 0"""
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if priority == PRIORITY_HIGH:
+            need = 1.0
+        else:
+            if self._waiting[PRIORITY_HIGH]:
+                return 1.0 / self.rate
+            need = 1.0 + self.reserve
+        return 0.0 if self._tokens >= need else (need - self._tokens) / self.rate
+
+    def acquire(self, priority: int = PRIORITY_HIGH, timeout: Optional[float] = None) -> bool:
+        timeout = ACQUIRE_TIMEOUT.get(priority, 3.0) if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self._wait_for(priority, now)
+                    if wait <= 0:
+                        self._tokens -= 1.0
+                        self._used.append(now)
+                        # 고우선 호출이 빠지면 대기 중인 저우선 호출이 다시 확인하도록 깨움
+                        self._cond.notify_all()
+                        return True
+                    if now + wait > deadline:
+                        self.throttled += 1
+                        return False
+                    self._cond.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+
+    def penalize(self, seconds: float):
+        """서버가 429를 돌려주면 버킷을 비우고 seconds 동안 막음"""
+        with self._cond:
+            now = time.monotonic()
+            self._tokens = 0.0
+            self._updated = now
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self.server_limited += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            while self._used and self._used[0] < now - USAGE_WINDOW:
+                self._used.popleft()
+            return {
+                "rate": self.rate,
+                "tokens": round(self._tokens, 2),
+                "headroom_pct": max(0.0, self._tokens) / self.capacity * 100,
+                "used_1m": len(self._used),
+                "waiting_high": self._waiting[PRIORITY_HIGH],
+                "waiting_low": self._waiting[PRIORITY_LOW],
+                "blocked_for": max(0.0, self._blocked_until - now),
+                "throttled": self.throttled,
+                "server_limited": self.server_limited,
+            }
+
+class RateLimiter:
+    """(엔드포인트, API 키)별 토큰 버킷 묶음"""
+    def __init__(self, limits: Optional[Dict[str, float]] = None, default: float = DEFAULT_LIMIT):
+        self.limits = dict(ENDPOINT_LIMITS if limits is None else limits)
+        self.default = default
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint: str, key: str = PUBLIC_KEY) -> TokenBucket:
+        with self._lock:
+            b = self._buckets.get((endpoint, key))
+            if b is None:
+                b = self._buckets[(endpoint, key)] = TokenBucket(self.limits.get(endpoint, self.default))
+            return b
+
+    def acquire(self, endpoint: str, key: str = PUBLIC_KEY, priority: int = PRIORITY_HIGH,
+                timeout: Optional[float] = None) -> bool:
+        return self.bucket(endpoint, key).acquire(priority, timeout)
+
+    def penalize(self, endpoint: str, key: str = PUBLIC_KEY, seconds: float = 1.0):
+        self.bucket(endpoint, key).penalize(seconds)
+
+    def usage(self) -> List[Dict[str, Any]]:
+        """버킷별 현재 사용량/여유분 (API 키는 끝 4자리만 표시)"""
+        with self._lock:
+            items = list(self._buckets.items())
+        return [{"endpoint": ep, "key": key if key == PUBLIC_KEY else f"…{key[-4:]}", **b.stats()}
+                for (ep, key), b in sorted(items)]
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def get_limiter() -> RateLimiter:
+    """프로세스 전역 리미터 (모든 세션/스레드가 같은 예산을 공유)"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
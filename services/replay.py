@@ -0,0 +1,107 @@
+# services/replay.py
+"""
+과거 시점 재현: 스냅샷 로그(services/snaplog.py)에서 시점 하나를 찾아
+대시보드가 그 시각에 그렸을 입력(스냅샷 / 일별 기록 / 차트 시계열 / 리스크 지표)을 다시 만듦
+
+- 일별 기록은 해당 날짜까지만, 차트 인트라데이는 해당 시각까지만 조회
+- 전역 캐시(get_equity_series / get_risk_engine)는 건드리지 않고 시점별 인스턴스를 따로 만듦
+- 투자자 좌수는 현재 원장 기준 (과거 좌수 재현 대상 아님)
+"""
+import threading
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from services import snaplog
+from services.history import load_history
+from services.metrics import RiskEngine
+from services.series import EquitySeries
+from services.snapshot import Snapshot
+from services.timeseries import tier_for_timeframe, load_rows, chart_time
+
+KST = timezone(timedelta(hours=9))    # 일별 기록 날짜 기준 (history.get_kst_now와 동일)
+
+class ReplaySeries(EquitySeries):
+    """at 시각에서 본 차트 시계열 (인트라데이는 at까지만, 창의 끝도 at)"""
+
+    def __init__(self, at: float):
+        super().__init__()
+        self.at = int(at)
+
+    def sync_intraday(self, timeframe: str) -> None:
+        # 과거 구간은 바뀌지 않으므로 기간별로 한 번만 조회
+        if timeframe in self._intraday:
+            return
+        table, start_ts = tier_for_timeframe(timeframe, now=self.at)
+        df = load_rows(table, start_ts, end_ts=self.at)
+        with self._lock:
+            self._intraday[timeframe] = (table, df["date"].to_numpy(dtype="datetime64[ns]"),
+                                         df["equity"].to_numpy(dtype="float64"), self.at)
+            self._version += 1
+
+    def window(self, timeframe: str, current_equity: float, now: Optional[pd.Timestamp] = None):
+        return super().window(timeframe, current_equity, now=now if now is not None else chart_time(self.at))
+
+class ReplayRisk(RiskEngine):
+    """기간 창(1W/1M)을 오늘이 아니라 재현 날짜 기준으로 계산"""
+
+    def __init__(self, as_of: date):
+        super().__init__()
+        self.as_of = as_of
+
+    def metrics(self, timeframe: str = "All", live_equity: Optional[float] = None,
+                today: Optional[date] = None) -> Dict[str, Any]:
+        return super().metrics(timeframe, live_equity=live_equity, today=today or self.as_of)
+
+@dataclass(frozen=True)
+class ReplayFrame:
+    """한 시점을 렌더링하는 데 필요한 입력 묶음"""
+    at: float                       # 요청 시각
+    snapshot: Snapshot              # at 이하 가장 최근 스냅샷
+    history: pd.DataFrame           # 스냅샷 날짜(KST)까지의 일별 기록
+    series: ReplaySeries
+    risk: ReplayRisk
+
+_cache_lock = threading.Lock()
+_frame_cache: Dict[str, Any] = {"key": None, "frame": None}
+
+def load_frame(at: float, log_dir: str = snaplog.LOG_DIR) -> Optional[ReplayFrame]:
+    """
+    at 시각의 대시보드 입력 (로그가 비었거나 at 이전 기록이 없으면 None)
+    같은 스냅샷을 가리키는 요청은 모든 세션이 같은 프레임을 공유
+    """
+    loc = snaplog.locate(at, log_dir)
+    if loc is None:
+        return None
+    with _cache_lock:
+        if _frame_cache["key"] == loc:
+            return replace(_frame_cache["frame"], at=at)
+    snap = snaplog.read_record(loc[0], loc[1], log_dir)
+    fetched_at = loc[2]
+    as_of = datetime.fromtimestamp(fetched_at, tz=KST).date()
+    history = load_history(end=as_of.isoformat())
+    series = ReplaySeries(fetched_at)
+    series.sync_daily(history)
+    risk = ReplayRisk(as_of)
+    risk.sync(history)
+    frame = ReplayFrame(at=at, snapshot=snap, history=history, series=series, risk=risk)
+    with _cache_lock:
+        _frame_cache.update(key=loc, frame=frame)
+    return frame
+
+def neighbor(ts: float, step: int, log_dir: str = snaplog.LOG_DIR) -> Optional[float]:
+    """
+    ts에 보이는 스냅샷 기준 앞(step<0)/뒤(step>0) 스냅샷 시각
+    하루 범위 안에서 찾고 없으면 None
+    """
+    loc = snaplog.locate(ts, log_dir)
+    anchor = loc[2] if loc is not None else ts
+    if step < 0:
+        stamps = snaplog.timestamps(anchor - 86400, anchor, log_dir)
+        stamps = stamps[stamps < anchor]
+        return float(stamps[max(len(stamps) + step, 0)]) if len(stamps) else None
+    stamps = snaplog.timestamps(anchor, anchor + 86400, log_dir)
+    stamps = stamps[stamps > anchor]
+    return float(stamps[min(step, len(stamps)) - 1]) if len(stamps) else None
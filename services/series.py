@@ -0,0 +1,132 @@
+# services/series.py
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple
+
+from services.timeseries import TIMEFRAMES, tier_for_timeframe, load_rows, chart_time
+
+_EMPTY_X = np.empty(0, dtype="datetime64[ns]")
+_EMPTY_Y = np.empty(0, dtype="float64")
+
+class EquitySeries:
+    """
+    차트용 자산 시계열 캐시 (미리 파싱된 datetime64/float64 배열)
+    - 일별 기록: 새로 추가된 행만 파싱해서 뒤에 붙임
+    - 인트라데이: 기간별 롤업 테이블에서 마지막 버킷 이후만 조회
+    - 기간 창: 정렬된 x에 대한 이진 탐색 (np.searchsorted)
+    틱마다 바뀌는 건 끝 점뿐이므로 준비 비용이 히스토리 길이에 비례하지 않습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.daily_x, self.daily_y = _EMPTY_X, _EMPTY_Y
+        self._daily_last: Optional[str] = None
+        # timeframe -> (table, x, y, last_bucket_ts)
+        self._intraday: Dict[str, Tuple[str, np.ndarray, np.ndarray, int]] = {}
+        # timeframe -> (version, x, y)  # 현재 자산 점은 window()가 복사본에 붙임
+        self._assembled: Dict[str, Tuple[int, np.ndarray, np.ndarray]] = {}
+        self._version = 0
+
+    # ---------------------------
+    # 일별 기록
+    # ---------------------------
+    def sync_daily(self, history_df: pd.DataFrame) -> None:
+        if history_df is None or history_df.empty:
+            return
+        n = len(self.daily_x)
+        last = str(history_df["date"].iloc[-1])
+        with self._lock:
+            if len(history_df) == n and last == self._daily_last and self.daily_y[-1] == history_df["equity"].iloc[-1]:
+                return
+            if 0 < n <= len(history_df) and str(history_df["date"].iloc[n - 1]) == self._daily_last:
+                # 앞부분은 그대로 -> 마지막 행(값 변경 가능)부터 다시 파싱
+                tail = history_df.iloc[n - 1:]
+                x = pd.to_datetime(tail["date"]).to_numpy(dtype="datetime64[ns]")
+                y = tail["equity"].to_numpy(dtype="float64")
+                self.daily_x = np.concatenate([self.daily_x[:n - 1], x])
+                self.daily_y = np.concatenate([self.daily_y[:n - 1], y])
+            else:
+                self.daily_x = pd.to_datetime(history_df["date"]).to_numpy(dtype="datetime64[ns]")
+                self.daily_y = history_df["equity"].to_numpy(dtype="float64")
+            self._daily_last = last
+            self._version += 1
+
+    # ---------------------------
+    # 인트라데이 (롤업 티어)
+    # ---------------------------
+    def sync_intraday(self, timeframe: str) -> None:
+        table, start_ts = tier_for_timeframe(timeframe)
+        with self._lock:
+            cached = self._intraday.get(timeframe)
+            if cached is None or cached[0] != table:
+                df = load_rows(table, start_ts)
+                x = df["date"].to_numpy(dtype="datetime64[ns]")
+                y = df["equity"].to_numpy(dtype="float64")
+                last_ts = int(df["ts"].iloc[-1]) if len(df) else start_ts
+                self._intraday[timeframe] = (table, x, y, last_ts)
+                self._version += 1
+                return
+
+            _, x, y, last_ts = cached
+            tail = load_rows(table, last_ts)  # 마지막 버킷(갱신 중) + 새 버킷
+            if tail.empty:
+                return
+            tx = tail["date"].to_numpy(dtype="datetime64[ns]")
+            ty = tail["equity"].to_numpy(dtype="float64")
+            keep = len(x) - 1 if len(x) and int(tail["ts"].iloc[0]) == last_ts else len(x)
+            if keep == len(x) - 1 and len(tail) == 1 and y[-1] == ty[0]:
+                return
+            # 기간 밖으로 밀려난 앞부분은 창 계산(이진 탐색)에서 걸러지므로 그대로 둠
+            self._intraday[timeframe] = (table, np.concatenate([x[:keep], tx]),
+                                         np.concatenate([y[:keep], ty]), int(tail["ts"].iloc[-1]))
+            self._version += 1
+
+    # ---------------------------
+    # 기간 창
+    # ---------------------------
+    def _assemble(self, timeframe: str) -> Tuple[np.ndarray, np.ndarray]:
+        cached = self._assembled.get(timeframe)
+        if cached is not None and cached[0] == self._version:
+            return cached[1], cached[2]
+
+        dx, dy = self.daily_x, self.daily_y
+        intraday = self._intraday.get(timeframe)
+        if intraday is not None and len(intraday[1]):
+            ix, iy = intraday[1], intraday[2]
+            # 인트라데이 시작일 이전의 일별 기록만 사용
+            cut = np.searchsorted(dx, ix[0].astype("datetime64[D]"), side="left")
+            dx, dy = dx[:cut], dy[:cut]
+        else:
+            ix, iy = _EMPTY_X, _EMPTY_Y
+
+        x = np.concatenate([dx, ix])
+        y = np.concatenate([dy, iy])
+        self._assembled[timeframe] = (self._version, x, y)
+        return x, y
+
+    def window(self, timeframe: str, current_equity: float, now: Optional[pd.Timestamp] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """기간 필터가 적용된 (x, y). 마지막 점은 현재 자산. (now는 chart_time 기준 = tz 없는 KST)"""
+        now = now if now is not None else chart_time()
+        with self._lock:
+            x, y = self._assemble(timeframe)
+            span = TIMEFRAMES.get(timeframe)
+            start = 0
+            if span:
+                cutoff = np.datetime64((now - pd.Timedelta(seconds=span)).to_datetime64(), "ns")
+                start = int(np.searchsorted(x, cutoff, side="left"))
+            # 캐시된 배열은 모든 세션이 공유하므로 현재 자산 점은 새 배열에 붙여서 반환
+            # (세션마다 now/자산이 달라도 서로의 차트 데이터를 덮어쓰지 않음)
+            return (np.append(x[start:], np.datetime64(now.to_datetime64(), "ns")),
+                    np.append(y[start:], current_equity))
+
+_series: Optional[EquitySeries] = None
+_series_lock = threading.Lock()
+
+def get_equity_series() -> EquitySeries:
+    """프로세스 전역 시계열 캐시 (모든 세션 공유)"""
+    global _series
+    with _series_lock:
+        if _series is None:
+            _series = EquitySeries()
+        return _series
@@ -0,0 +1,223 @@
+# services/snaplog.py
+"""
+원본 스냅샷(포지션/계좌/환율) 압축 로그 -> 과거 시점 재현용 (services/replay.py)
+
+data/snapshots/YYYYMMDD.log  : 레코드를 뒤에 붙이기만 하는 로그 (UTC 날짜별 세그먼트)
+    레코드 = 헤더 <4sBdII (magic, zdict 버전, fetched_at, 본문 길이, crc32) + zlib(JSON)
+data/snapshots/YYYYMMDD.idx  : 고정 크기 인덱스 <dQI (fetched_at, 로그 오프셋, 본문 길이) = 20바이트
+    -> mmap + 이진 탐색으로 시점 하나만 읽음 (로그 전체를 풀지 않음)
+
+쓰기 순서는 로그 -> 인덱스. 중간에 죽으면 로그 끝에 인덱스 없는 레코드가 남을 뿐
+(다음 레코드는 그 뒤에 붙고, rebuild_index로 복구 가능)
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.snapshot import Snapshot, snapshot_to_dict, snapshot_from_dict
+from utils.filecache import file_lock
+from utils.telemetry import timed
+
+LOG_DIR = "data/snapshots"
+MAGIC = b"HDS1"
+HEADER = struct.Struct("<4sBdII")
+INDEX = struct.Struct("<dQI")
+INDEX_DTYPE = np.dtype([("ts", "<f8"), ("offset", "<u8"), ("length", "<u4")])
+MIN_INTERVAL = 10.0       # 이보다 촘촘한 스냅샷은 건너뜀 (스트리밍 모드 대비, 초)
+RETENTION_DAYS = 30       # 세그먼트 보관 기간
+COMPRESS_LEVEL = 6
+
+# zlib 사전: Bitget 응답에 반복되는 키 (작은 레코드의 압축률 개선)
+# 값을 바꾸면 기존 레코드를 못 읽으므로 바꿀 때는 새 버전을 추가할 것
+ZDICTS = {
+    1: (b'"marginCoin": "USDT", "symbol": "USDT", "holdSide": "long", "holdSide": "short", "openDelegateSize": "0", '
+        b'"marginSize": "", "available": "", "locked": "0", "total": "", "leverage": "", "achievedProfits": "", '
+        b'"averageOpenPrice": "", "openPriceAvg": "", "marginMode": "crossed", "posMode": "hedge_mode", '
+        b'"unrealizedPL": "", "liquidationPrice": "", "keepMarginRate": "", "markPrice": "", "marginRatio": "", '
+        b'"breakEvenPrice": "", "totalFee": "", "deductedFee": "", "cTime": "", "uTime": "", "account": "main", '
+        b'"productType": "USDT-FUTURES", "usdtEquity": "", "accountEquity": "", "crossedMaxAvailable": "", '
+        b'"isolatedMaxAvailable": "", "unionAvailable": "", "crossedRiskRate": "", "positions": [{'),
+}
+ZDICT_VERSION = 1
+
+_lock = threading.Lock()
+_last_ts: Dict[str, float] = {}   # 로그 디렉터리 -> 이 프로세스가 마지막으로 기록한 ts
+
+def _segment(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y%m%d")
+
+def _paths(segment: str, log_dir: str = LOG_DIR) -> Tuple[str, str]:
+    base = os.path.join(log_dir, segment)
+    return base + ".log", base + ".idx"
+
+def segments(log_dir: str = LOG_DIR) -> List[str]:
+    """세그먼트 이름 (YYYYMMDD, 오름차순)"""
+    try:
+        names = os.listdir(log_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(n[:-4] for n in names if n.endswith(".idx") and len(n) == 12)
+
+def read_index(segment: str, log_dir: str = LOG_DIR) -> np.ndarray:
+    """
+    인덱스를 구조화 배열로 (mmap 위의 뷰라 복사 없음, 정렬은 쓰기 순서 = 시간 순)
+    반쯤 쓰인 마지막 항목은 무시
+    """
+    _, idx_path = _paths(segment, log_dir)
+    try:
+        with open(idx_path, "rb") as f:
+            n = os.fstat(f.fileno()).st_size // INDEX.size
+            if n == 0:
+                return np.empty(0, dtype=INDEX_DTYPE)
+            mm = mmap.mmap(f.fileno(), n * INDEX.size, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return np.empty(0, dtype=INDEX_DTYPE)
+    return np.frombuffer(mm, dtype=INDEX_DTYPE, count=n)
+
+def _encode(snap: Snapshot) -> bytes:
+    body = json.dumps(snapshot_to_dict(snap), ensure_ascii=False, separators=(",", ":")).encode()
+    comp = zlib.compressobj(COMPRESS_LEVEL, zdict=ZDICTS[ZDICT_VERSION])
+    return comp.compress(body) + comp.flush()
+
+def _decode(version: int, payload: bytes) -> Snapshot:
+    decomp = zlib.decompressobj(zdict=ZDICTS[version]) if version else zlib.decompressobj()
+    return snapshot_from_dict(json.loads(decomp.decompress(payload) + decomp.flush()))
+
+@timed("snaplog.append")
+def append_snapshot(snap: Snapshot, log_dir: str = LOG_DIR, min_interval: float = MIN_INTERVAL) -> bool:
+    """
+    스냅샷 1건을 로그에 추가 (같은 fetched_at이나 min_interval 이내는 무시 -> 세션 수와 무관하게 1회)
+    Returns: 기록 여부
+    """
+    ts = float(snap.fetched_at or 0.0)
+    if ts <= 0:
+        return False
+    with _lock:
+        if log_dir in _last_ts and ts - _last_ts[log_dir] < min_interval:
+            return False
+    payload = _encode(snap)
+    segment = _segment(ts)
+    log_path, idx_path = _paths(segment, log_dir)
+    os.makedirs(log_dir, exist_ok=True)
+    new_segment = False
+    with file_lock(idx_path):
+        # 다른 프로세스가 먼저 기록했을 수 있으므로 잠금 안에서 마지막 ts를 다시 확인
+        last = read_index(segment, log_dir)
+        if len(last) and ts - float(last["ts"][-1]) < min_interval:
+            with _lock:
+                _last_ts[log_dir] = float(last["ts"][-1])
+            return False
+        new_segment = not os.path.exists(idx_path)
+        with open(log_path, "ab") as f:
+            offset = f.tell()
+            f.write(HEADER.pack(MAGIC, ZDICT_VERSION, ts, len(payload), zlib.crc32(payload)))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(idx_path, "ab") as f:
+            # 반쯤 쓰인 항목이 있으면 잘라내고 이어 씀
+            f.truncate(os.fstat(f.fileno()).st_size // INDEX.size * INDEX.size)
+            f.write(INDEX.pack(ts, offset, len(payload)))
+    with _lock:
+        _last_ts[log_dir] = ts
+    if new_segment:
+        prune(log_dir, now=ts)
+    return True
+
+def read_record(segment: str, offset: int, log_dir: str = LOG_DIR) -> Snapshot:
+    log_path, _ = _paths(segment, log_dir)
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        magic, version, ts, length, crc = HEADER.unpack(f.read(HEADER.size))
+        payload = f.read(length)
+    if magic != MAGIC or len(payload) != length or zlib.crc32(payload) != crc:
+        raise ValueError(f"corrupt snapshot record at {segment}:{offset}")
+    return _decode(version, payload)
+
+def locate(ts: float, log_dir: str = LOG_DIR) -> Optional[Tuple[str, int, float]]:
+    """
+    ts 시점에 화면에 있었을 스냅샷 (ts 이하 중 가장 최근) 위치
+    Returns: (segment, offset, fetched_at) 또는 None
+    세그먼트 이름 -> 인덱스 순으로 이진 탐색하므로 읽는 건 인덱스 몇 페이지 + 레코드 1건
+    """
+    names = segments(log_dir)
+    pos = int(np.searchsorted(names, _segment(ts), side="right"))
+    for segment in reversed(names[:pos]):
+        idx = read_index(segment, log_dir)
+        i = int(np.searchsorted(idx["ts"], ts, side="right"))
+        if i > 0:
+            return segment, int(idx["offset"][i - 1]), float(idx["ts"][i - 1])
+    return None
+
+def seek(ts: float, log_dir: str = LOG_DIR) -> Optional[Snapshot]:
+    loc = locate(ts, log_dir)
+    return read_record(loc[0], loc[1], log_dir) if loc else None
+
+def bounds(log_dir: str = LOG_DIR) -> Optional[Tuple[float, float]]:
+    """(첫 스냅샷 ts, 마지막 스냅샷 ts)"""
+    names = segments(log_dir)
+    first = next((idx for idx in (read_index(s, log_dir) for s in names) if len(idx)), None)
+    last = next((idx for idx in (read_index(s, log_dir) for s in reversed(names)) if len(idx)), None)
+    if first is None or last is None:
+        return None
+    return float(first["ts"][0]), float(last["ts"][-1])
+
+def timestamps(start: float, end: float, log_dir: str = LOG_DIR) -> np.ndarray:
+    """[start, end] 구간의 스냅샷 시각 (스크럽/스텝 이동용)"""
+    out = []
+    for segment in segments(log_dir):
+        if segment < _segment(start) or segment > _segment(end):
+            continue
+        ts = read_index(segment, log_dir)["ts"]
+        lo, hi = np.searchsorted(ts, start, side="left"), np.searchsorted(ts, end, side="right")
+        out.append(np.array(ts[lo:hi]))
+    return np.concatenate(out) if out else np.empty(0)
+
+def prune(log_dir: str = LOG_DIR, now: Optional[float] = None, retention_days: int = RETENTION_DAYS) -> int:
+    """보관 기간이 지난 세그먼트 삭제 (세그먼트 단위라 로그 자체는 다시 쓰지 않음)"""
+    cutoff = _segment((now or time.time()) - retention_days * 86400)
+    removed = 0
+    for segment in segments(log_dir):
+        if segment >= cutoff:
+            break
+        for path in _paths(segment, log_dir):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        removed += 1
+    return removed
+
+def rebuild_index(segment: str, log_dir: str = LOG_DIR) -> int:
+    """로그를 처음부터 훑어 인덱스를 다시 만듦 (인덱스 유실/손상 시). 깨진 꼬리 레코드는 제외"""
+    log_path, idx_path = _paths(segment, log_dir)
+    entries = []
+    with open(log_path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        magic, _, ts, length, crc = HEADER.unpack_from(data, offset)
+        payload = data[offset + HEADER.size:offset + HEADER.size + length]
+        if magic != MAGIC or len(payload) != length or zlib.crc32(payload) != crc:
+            break
+        entries.append(INDEX.pack(ts, offset, length))
+        offset += HEADER.size + length
+    with file_lock(idx_path):
+        with open(idx_path, "wb") as f:
+            f.write(b"".join(entries))
+    return len(entries)
+
+def record_snapshot(snap: Snapshot) -> bool:
+    """틱 경로용: 기록 실패가 대시보드 렌더링을 막지 않도록 예외를 삼킴"""
+    try:
+        return append_snapshot(snap)
+    except (OSError, ValueError):
+        return False
@@ -0,0 +1,171 @@
+# services/snapshot.py
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from services.bitget import fetch_positions, fetch_account
+from services.upbit import fetch_usdt_krw
+from services.fanout import fetch_concurrently
+from utils.filecache import atomic_write, cached_read
+from utils.telemetry import timed
+
+# 수집기(collector.py)가 발행하는 최신 스냅샷 -> 대시보드는 읽기만 함
+PUBLISHED_FILE = "data/live_snapshot.json"
+
+@dataclass(frozen=True)
+class Snapshot:
+    """한 번의 폴링 결과 (모든 세션이 공유하므로 읽기 전용)"""
+    positions: Tuple[Mapping[str, Any], ...] = ()
+    account: Optional[Mapping[str, Any]] = None
+    usdt_rate: Optional[float] = None
+    errors: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+    fetched_at: float = 0.0
+    # 계정/상품별 요약 (다중 계정 모드에서 드릴다운용)
+    breakdown: Tuple[Mapping[str, Any], ...] = ()
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+def _freeze(d: Optional[Dict]) -> Optional[Mapping]:
+    return MappingProxyType(dict(d)) if d is not None else None
+
+@timed("snapshot.load")
+def load_live_snapshot(api_key: str, api_secret: str, passphrase: str,
+                       product_type: str, margin_coin: str, timeout: float = 8.0,
+                       previous: Optional[Snapshot] = None) -> Snapshot:
+    """
+    포지션/계좌/환율을 병렬 조회해 Snapshot을 만듭니다.
+    일부 소스가 실패하면 직전 스냅샷의 값을 유지하고 errors에 기록합니다.
+    """
+    results, errors = fetch_concurrently({
+        "positions": lambda: fetch_positions(api_key, api_secret, passphrase, product_type, margin_coin),
+        "account": lambda: fetch_account(api_key, api_secret, passphrase, product_type, margin_coin),
+        "usdt_rate": fetch_usdt_krw,
+    }, timeout=timeout)
+
+    pos_data, pos_res = results.get("positions", ([], {}))
+    acct_data, acct_res = results.get("account", (None, {}))
+    usdt_rate = results.get("usdt_rate")
+
+    # _private_get은 예외 대신 에러 코드를 반환하므로 응답 코드도 확인
+    for name, res in (("positions", pos_res), ("account", acct_res)):
+        if name not in errors and res.get("code") != "00000":
+            errors[name] = res.get("msg") or f"code {res.get('code')}"
+
+    positions = tuple(_freeze(p) for p in pos_data)
+    account = _freeze(acct_data)
+    if previous is not None:
+        if "positions" in errors:
+            positions = previous.positions
+        if "account" in errors or account is None:
+            account = previous.account
+        if usdt_rate is None:
+            usdt_rate = previous.usdt_rate
+
+    return Snapshot(positions, account, usdt_rate, MappingProxyType(errors), time.time())
+
+class SnapshotService:
+    """
+    프로세스 전역 스냅샷 캐시 (stale-while-revalidate)
+    - age < ttl        : 캐시 그대로 반환
+    - age < max_stale  : 캐시를 반환하고 백그라운드에서 1회만 갱신
+    - 그 외(최초 포함) : 동기 갱신 (동시 요청은 하나의 fetch를 기다림)
+    브라우저 탭이 N개여도 API 호출은 ttl당 1회로 제한됩니다.
+    """
+
+    def __init__(self, loader: Callable[[Optional[Snapshot]], Snapshot], ttl: float = 10.0, max_stale: float = 60.0):
+        self._loader = loader
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = threading.Lock()          # 동기 갱신 single-flight
+        self._refreshing = threading.Event()   # 백그라운드 갱신 진행 여부
+
+    def _refresh(self) -> Snapshot:
+        try:
+            snap = self._loader(self._snapshot)
+        except Exception as e:
+            prev = self._snapshot or Snapshot()
+            snap = Snapshot(prev.positions, prev.account, prev.usdt_rate,
+                            MappingProxyType({"snapshot": str(e)}), prev.fetched_at, prev.breakdown)
+        self._snapshot = snap
+        return snap
+
+    def _refresh_in_background(self) -> None:
+        if self._refreshing.is_set():
+            return
+        self._refreshing.set()
+
+        def _run():
+            try:
+                with self._lock:
+                    self._refresh()
+            finally:
+                self._refreshing.clear()
+
+        threading.Thread(target=_run, name="snapshot-refresh", daemon=True).start()
+
+    def get(self) -> Snapshot:
+        snap = self._snapshot
+        if snap is not None and snap.fetched_at > 0:
+            if snap.age < self.ttl:
+                return snap
+            if snap.age < self.max_stale:
+                self._refresh_in_background()
+                return snap
+
+        with self._lock:
+            # 락을 기다리는 동안 다른 세션이 이미 갱신했을 수 있음
+            snap = self._snapshot
+            if snap is not None and snap.fetched_at > 0 and snap.age < self.ttl:
+                return snap
+            return self._refresh()
+
+def snapshot_to_dict(snap: Snapshot) -> Dict[str, Any]:
+    """JSON 직렬화용 dict (발행 파일 / 스냅샷 로그 공용)"""
+    return {
+        "positions": [dict(p) for p in snap.positions],
+        "account": dict(snap.account) if snap.account is not None else None,
+        "usdt_rate": snap.usdt_rate,
+        "errors": dict(snap.errors),
+        "fetched_at": snap.fetched_at,
+        "breakdown": [dict(b) for b in snap.breakdown],
+    }
+
+def snapshot_from_dict(data: Mapping[str, Any]) -> Snapshot:
+    return Snapshot(
+        tuple(_freeze(p) for p in data.get("positions") or []),
+        _freeze(data.get("account")),
+        data.get("usdt_rate"),
+        MappingProxyType(data.get("errors") or {}),
+        float(data.get("fetched_at") or 0.0),
+        tuple(_freeze(b) for b in data.get("breakdown") or []),
+    )
+
+def publish_snapshot(snap: Snapshot, path: str = PUBLISHED_FILE) -> None:
+    """스냅샷을 파일로 원자적으로 교체 (published_at = 수집기 하트비트)"""
+    payload = dict(snapshot_to_dict(snap), published_at=time.time())
+    atomic_write(path, json.dumps(payload, ensure_ascii=False))
+
+def _parse_published(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["snapshot"] = snapshot_from_dict(data)
+    return data
+
+def load_published_snapshot(max_age: float, path: str = PUBLISHED_FILE) -> Optional[Snapshot]:
+    """
+    수집기가 max_age초 안에 발행한 스냅샷이 있으면 반환, 없으면 None (수집기 미동작)
+    파일이 바뀔 때만 다시 파싱합니다.
+    """
+    try:
+        data = cached_read(path, _parse_published)
+    except (OSError, ValueError):
+        return None
+    if not data or time.time() - float(data.get("published_at") or 0.0) > max_age:
+        return None
+    return data["snapshot"]
@@ -0,0 +1,203 @@
+# services/stress.py
+"""
+현재 포지션에 가격 충격 시나리오를 적용하는 스트레스 엔진
+
+- 시나리오 행렬 shocks: (시나리오 수, 심볼 수), 값은 수익률 (-0.1 = -10%)
+- 모든 계산은 (시나리오 x 포지션) 배열 연산 한 번 (500 포지션 x 5000 시나리오 ≈ 수십 ms)
+- 선형 근사: 손익 변화 = signed_notional x 충격 (코인 마진은 positions_frame에서 이미 USD 환산)
+- 청산 판정은 거래소가 준 청산가 기준 (교차 마진에서 다른 포지션 손익으로 청산가가 움직이는 효과는 무시)
+  청산된 포지션은 청산가까지의 손실만 반영하고 이후 노출/증거금에서 제외
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.telemetry import timed
+
+DEFAULT_RANGE = 0.30      # 일괄 충격 그리드 범위 (±30%)
+DEFAULT_STEP = 0.01       # 1% 간격
+MIN_SHOCK = -0.99         # 가격이 0 이하로 내려가지 않도록 하한
+
+@dataclass(frozen=True)
+class Book:
+    """시나리오 계산에 필요한 포지션 배열 (프레임당 한 번만 만듦)"""
+    symbols: Tuple[str, ...]        # 고유 심볼 (시나리오 행렬의 열 순서)
+    sym_idx: np.ndarray             # 포지션 -> 심볼 열 인덱스
+    signed_notional: np.ndarray
+    margin: np.ndarray
+    liq_shock: np.ndarray           # 청산가에 도달하는 충격 (청산가 없으면 NaN)
+    direction: np.ndarray           # LONG 1 / SHORT -1 / 그 외 0
+
+@dataclass(frozen=True)
+class StressResult:
+    shocks: np.ndarray              # (S, K) 심볼별 충격
+    equity: np.ndarray              # (S,) 시나리오별 자산
+    pnl: np.ndarray                 # (S,) 현재 대비 손익 변화
+    margin_ratio_pct: np.ndarray    # (S,) 남은 증거금 / 자산 (자산 <= 0이면 inf)
+    liquidated: np.ndarray          # (S, N) 포지션별 청산 여부
+
+    @property
+    def n_liquidated(self) -> np.ndarray:
+        return self.liquidated.sum(axis=1)
+
+@dataclass(frozen=True)
+class SymbolGrid:
+    """심볼 하나씩만 움직였을 때의 결과 (K 심볼 x G 충격)"""
+    symbols: Tuple[str, ...]
+    grid: np.ndarray                # (G,)
+    equity: np.ndarray              # (K, G)
+    pnl: np.ndarray                 # (K, G)
+    margin_ratio_pct: np.ndarray    # (K, G)
+    n_liquidated: np.ndarray        # (K, G)
+
+_cache_lock = threading.Lock()
+_cache: Dict[str, object] = {"frame": None, "book": None}
+
+def build_book(df: pd.DataFrame) -> Book:
+    """positions_frame 결과를 배열로 변환 (같은 프레임은 재사용)"""
+    with _cache_lock:
+        if _cache["frame"] is df:
+            return _cache["book"]
+    symbols, sym_idx = np.unique(df["symbol"].to_numpy(dtype=str), return_inverse=True)
+    side = df["side"].to_numpy(dtype=str)
+    mark = df["mark"].to_numpy(dtype="float64")
+    liq = df["liq"].to_numpy(dtype="float64")
+    valid = (liq > 0) & (mark > 0)
+    book = Book(
+        symbols=tuple(symbols.tolist()),
+        sym_idx=sym_idx.astype(np.intp),
+        signed_notional=df["signed_notional"].to_numpy(dtype="float64"),
+        margin=df["margin"].to_numpy(dtype="float64"),
+        liq_shock=np.where(valid, liq / np.where(valid, mark, 1.0) - 1.0, np.nan),
+        direction=np.where(side == "SHORT", -1.0, np.where(side == "LONG", 1.0, 0.0)),
+    )
+    with _cache_lock:
+        _cache.update(frame=df, book=book)
+    return book
+
+# ---------------------------
+# 시나리오 생성
+# ---------------------------
+def shock_grid(lo: float = -DEFAULT_RANGE, hi: float = DEFAULT_RANGE, step: float = DEFAULT_STEP) -> np.ndarray:
+    """lo..hi (양끝 포함) 충격 벡터, 부동소수 누적 오차 없이 정수 스텝으로 생성"""
+    n = int(round((hi - lo) / step))
+    return np.clip(lo + np.arange(n + 1) * step, MIN_SHOCK, None)
+
+def uniform_shocks(n_symbols: int, grid: Optional[np.ndarray] = None) -> np.ndarray:
+    """모든 심볼이 같은 폭으로 움직이는 시나리오 (S, K)"""
+    grid = shock_grid() if grid is None else np.asarray(grid, dtype="float64")
+    return np.repeat(grid[:, None], n_symbols, axis=1)
+
+def correlated_shocks(n_symbols: int, n_scenarios: int = 5000, vol: float = 0.10, corr: float = 0.7,
+                      seed: Optional[int] = 0) -> np.ndarray:
+    """
+    단일 팩터 모델로 상관된 충격 생성 (S, K)
+    z = sqrt(corr) * 시장 + sqrt(1 - corr) * 개별 -> 모든 심볼 쌍의 상관계수 = corr
+    vol은 시나리오 한 번의 충격 표준편차 (0.10 = 10%)
+    """
+    if not 0.0 <= corr <= 1.0:
+        raise ValueError("corr must be in [0, 1]")
+    rng = np.random.default_rng(seed)
+    market = rng.standard_normal((n_scenarios, 1))
+    idio = rng.standard_normal((n_scenarios, n_symbols))
+    z = np.sqrt(corr) * market + np.sqrt(1.0 - corr) * idio
+    return np.clip(z * vol, MIN_SHOCK, None)
+
+# ---------------------------
+# 시나리오 평가
+# ---------------------------
+@timed("stress.run")
+def run_scenarios(book: Book, equity: float, shocks: np.ndarray) -> StressResult:
+    """
+    shocks: (S, K) -> 시나리오별 자산 / 증거금 비율 / 청산 포지션
+    """
+    shocks = np.asarray(shocks, dtype="float64")
+    if shocks.ndim != 2 or shocks.shape[1] != len(book.symbols):
+        raise ValueError(f"shocks must be (scenarios, {len(book.symbols)})")
+    pos_shock = shocks[:, book.sym_idx]                     # (S, N)
+
+    # LONG: 충격 <= 청산 충격 / SHORT: 충격 >= 청산 충격 (NaN 비교는 항상 False -> 청산가 없는 포지션 제외)
+    with np.errstate(invalid="ignore"):
+        liquidated = ((book.direction * (pos_shock - book.liq_shock)) <= 0) & (book.direction != 0)
+    # 청산된 포지션은 청산가에서 손익 확정
+    pnl = np.where(liquidated, book.liq_shock, pos_shock) @ book.signed_notional
+
+    equity_s = equity + pnl
+    # bool @ float 은 BLAS를 타지 않으므로 float로 바꿔 곱함
+    margin_left = book.margin.sum() - liquidated.astype("float64") @ book.margin
+    return StressResult(shocks=shocks, equity=equity_s, pnl=pnl, margin_ratio_pct=_margin_ratio(margin_left, equity_s),
+                        liquidated=liquidated)
+
+def _margin_ratio(margin_left: np.ndarray, equity_s: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(equity_s > 0, margin_left / np.where(equity_s > 0, equity_s, 1.0) * 100.0, np.inf)
+
+@timed("stress.per_symbol")
+def run_per_symbol(book: Book, equity: float, grid: Optional[np.ndarray] = None) -> SymbolGrid:
+    """
+    심볼별 충격 그리드 (다른 심볼은 고정)
+    K x G 개의 시나리오를 (K*G, K) 행렬로 만들지 않고 포지션 x 그리드 (N, G) 배열에서 심볼별로 합산
+    """
+    grid = shock_grid() if grid is None else np.asarray(grid, dtype="float64")
+    k, g = len(book.symbols), len(grid)
+    liq_shock = book.liq_shock[:, None]
+    direction = book.direction[:, None]
+    with np.errstate(invalid="ignore"):
+        liquidated = ((direction * (grid[None, :] - liq_shock)) <= 0) & (direction != 0)   # (N, G)
+    pos_pnl = np.where(liquidated, liq_shock, grid[None, :]) * book.signed_notional[:, None]
+
+    pnl = np.zeros((k, g))
+    np.add.at(pnl, book.sym_idx, pos_pnl)
+    n_liq = np.zeros((k, g), dtype=np.int64)
+    np.add.at(n_liq, book.sym_idx, liquidated)
+    liq_margin = np.zeros((k, g))
+    np.add.at(liq_margin, book.sym_idx, liquidated * book.margin[:, None])
+
+    equity_s = equity + pnl
+    ratio = _margin_ratio(book.margin.sum() - liq_margin, equity_s)
+    return SymbolGrid(symbols=book.symbols, grid=grid, equity=equity_s, pnl=pnl, margin_ratio_pct=ratio, n_liquidated=n_liq)
+
+def liquidation_ladder(df: pd.DataFrame, book: Optional[Book] = None) -> pd.DataFrame:
+    """
+    포지션별 청산까지 남은 가격 변동 (가까운 순)
+    Returns: symbol, account, side, notional, liq_shock_pct (음수 = 하락 시 청산)
+    """
+    book = build_book(df) if book is None else book
+    out = df[["symbol", "account", "side", "notional"]].copy()
+    out["liq_shock_pct"] = book.liq_shock * 100.0
+    out = out[out["liq_shock_pct"].notna()]
+    return out.iloc[np.argsort(np.abs(out["liq_shock_pct"].to_numpy()), kind="stable")].reset_index(drop=True)
+
+def summarize_scenarios(result: StressResult, equity: float, quantiles: Sequence[float] = (0.01, 0.05, 0.5)) -> Dict[str, float]:
+    """몬테카를로 시나리오 요약 (자산 분위수, 청산 확률, 평균 청산 포지션 수)"""
+    n_liq = result.n_liquidated
+    out = {f"equity_p{int(q * 100)}": float(v) for q, v in zip(quantiles, np.quantile(result.equity, quantiles))}
+    out.update({
+        "worst_pnl": float(result.pnl.min()),
+        "prob_any_liquidation": float((n_liq > 0).mean()),
+        "mean_liquidated": float(n_liq.mean()),
+        "prob_equity_wipeout": float((result.equity <= 0).mean()),
+        "equity": float(equity),
+    })
+    return out
+
+_mc_cache: Dict[str, object] = {"key": None, "book": None, "summary": None}
+
+def monte_carlo(book: Book, equity: float, vol: float = 0.10, corr: float = 0.7,
+                n_scenarios: int = 5000, seed: int = 0) -> Dict[str, float]:
+    """
+    상관 충격 시나리오 요약 (같은 포지션/조건이면 모든 세션이 결과를 공유)
+    시드를 고정하므로 같은 입력에는 항상 같은 결과
+    """
+    key = (equity, vol, corr, n_scenarios, seed)
+    with _cache_lock:
+        if _mc_cache["book"] is book and _mc_cache["key"] == key:
+            return _mc_cache["summary"]
+    shocks = correlated_shocks(len(book.symbols), n_scenarios, vol=vol, corr=corr, seed=seed)
+    summary = summarize_scenarios(run_scenarios(book, equity, shocks), equity)
+    with _cache_lock:
+        _mc_cache.update(key=key, book=book, summary=summary)
+    return summary
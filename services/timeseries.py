@@ -0,0 +1,140 @@
+# services/timeseries.py
+import threading
+import time
+import pandas as pd
+from typing import Optional
+
+from services.history import get_conn, DB_LOCK
+from utils.telemetry import timed
+
+# (테이블, 버킷 크기(초), 보관 기간(초, None=영구))
+RAW = ("equity_raw", 0, 3 * 86400)
+TIERS = [
+    ("equity_1m", 60, 30 * 86400),
+    ("equity_1h", 3600, 400 * 86400),
+    ("equity_1d", 86400, None),
+]
+KST_OFFSET = 9 * 3600           # 일봉 버킷은 KST 자정 기준
+TIMEFRAMES = {"1W": 7 * 86400, "1M": 30 * 86400, "All": None}
+MAX_POINTS = 2000               # 한 번에 차트로 보낼 최대 포인트 수
+PRUNE_INTERVAL = 3600           # 보관 기간 정리 주기(초)
+
+_schema_ready = False
+_last_prune = 0.0
+_prune_lock = threading.Lock()
+
+def _ensure_schema(conn) -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    with conn:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {RAW[0]} ("
+            " ts INTEGER PRIMARY KEY, equity REAL NOT NULL, upl REAL, margin REAL)"
+        )
+        for table, _, _ in TIERS:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " bucket INTEGER PRIMARY KEY,"
+                " open REAL, high REAL, low REAL, close REAL,"
+                " upl REAL, margin REAL, n INTEGER)"
+            )
+    _schema_ready = True
+
+def _bucket(ts: int, size: int) -> int:
+    if size >= 86400:
+        return (ts + KST_OFFSET) // size * size - KST_OFFSET
+    return ts // size * size
+
+@timed("timeseries.record_tick")
+def record_tick(equity: float, upl: float = 0.0, margin: float = 0.0, ts: Optional[float] = None) -> bool:
+    """
+    틱 단위 자산 기록 + 1m/1h/1d 롤업을 같은 트랜잭션에서 갱신합니다.
+    같은 ts(=공유 스냅샷 시각)는 한 번만 기록되므로 여러 세션이 호출해도 중복되지 않습니다.
+    """
+    ts = int(ts if ts is not None else time.time())
+    with DB_LOCK:
+        conn = get_conn()
+        _ensure_schema(conn)
+        with conn:
+            cur = conn.execute(f"INSERT OR IGNORE INTO {RAW[0]} (ts, equity, upl, margin) VALUES (?, ?, ?, ?)",
+                               (ts, float(equity), float(upl), float(margin)))
+            if cur.rowcount == 0:
+                return False
+            for table, size, _ in TIERS:
+                conn.execute(
+                    f"INSERT INTO {table} (bucket, open, high, low, close, upl, margin, n) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 1) "
+                    "ON CONFLICT(bucket) DO UPDATE SET "
+                    " high = MAX(high, excluded.high), low = MIN(low, excluded.low),"
+                    " close = excluded.close, upl = excluded.upl, margin = excluded.margin, n = n + 1",
+                    (_bucket(ts, size), equity, equity, equity, equity, upl, margin))
+    _maybe_prune(ts)
+    return True
+
+def _maybe_prune(now: int) -> None:
+    global _last_prune
+    if now - _last_prune < PRUNE_INTERVAL or not _prune_lock.acquire(blocking=False):
+        return
+    try:
+        _last_prune = now
+        with DB_LOCK:
+            conn = get_conn()
+            with conn:
+                conn.execute(f"DELETE FROM {RAW[0]} WHERE ts < ?", (now - RAW[2],))
+                for table, _, retention in TIERS:
+                    if retention is not None:
+                        conn.execute(f"DELETE FROM {table} WHERE bucket < ?", (now - retention,))
+    finally:
+        _prune_lock.release()
+
+def pick_tier(start_ts: int, end_ts: int, max_points: int = MAX_POINTS):
+    """구간 길이와 보관 기간을 보고 포인트 수가 max_points 이하인 가장 세밀한 해상도를 고름"""
+    span = max(1, end_ts - start_ts)
+    for table, size, retention in TIERS:
+        if (retention is None or span <= retention) and span / size <= max_points:
+            return table, size
+    return TIERS[-1][0], TIERS[-1][1]
+
+def _first_bucket(conn, default: int) -> int:
+    row = conn.execute(f"SELECT MIN(bucket) FROM {TIERS[-1][0]}").fetchone()
+    return row[0] if row and row[0] is not None else default
+
+def tier_for_timeframe(timeframe: str, now: Optional[int] = None):
+    """차트 기간(1W/1M/All) -> (테이블, 시작 ts)"""
+    now = int(now if now is not None else time.time())
+    span = TIMEFRAMES.get(timeframe)
+    with DB_LOCK:
+        conn = get_conn()
+        _ensure_schema(conn)
+        start_ts = now - span if span else _first_bucket(conn, now)
+    table, _ = pick_tier(start_ts, now)
+    return table, start_ts
+
+def chart_time(ts: Optional[float] = None) -> pd.Timestamp:
+    """
+    epoch 초 -> 차트 x축 시각 (tz 없는 KST, load_rows의 date와 같은 시계)
+    서버 로컬 시간대와 무관하므로 실시간 점/기간 컷오프가 버킷보다 앞서지 않음
+    """
+    ts = time.time() if ts is None else ts
+    return pd.Timestamp(int((ts + KST_OFFSET) * 1e9))
+
+def load_rows(table: str, start_ts: int, end_ts: Optional[int] = None) -> pd.DataFrame:
+    """
+    롤업 테이블에서 [start_ts, end_ts] 구간 조회 (PK 범위 스캔, raw는 읽지 않음)
+    Returns: DataFrame(ts, date[KST], equity, high, low, upl, margin)
+    """
+    if table not in {t for t, _, _ in TIERS}:
+        raise ValueError(f"unknown tier: {table}")
+    end_ts = int(end_ts if end_ts is not None else time.time())
+    with DB_LOCK:
+        conn = get_conn()
+        _ensure_schema(conn)
+        rows = conn.execute(
+            f"SELECT bucket, close, high, low, upl, margin FROM {table} "
+            "WHERE bucket >= ? AND bucket <= ? ORDER BY bucket",
+            (int(start_ts), end_ts)).fetchall()
+
+    df = pd.DataFrame(rows, columns=["ts", "equity", "high", "low", "upl", "margin"])
+    df.insert(1, "date", pd.to_datetime(df["ts"] + KST_OFFSET, unit="s"))
+    return df
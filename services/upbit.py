@@ -1,12 +1,21 @@
 # services/upbit.py
-import requests
-import streamlit as st
+import threading
+import time
 
-@st.cache_data(ttl=60)
-def fetch_usdt_krw() -> float | None:
+from services.http import http_get
+from utils.telemetry import timed, count_error
+
+RATE_TTL = 60  # 환율 캐시 유지 시간(초)
+
+# Streamlit 밖(수집기)에서도 쓰므로 st.cache_data 대신 프로세스 전역 TTL 캐시 사용
+_cache = {"value": None, "at": 0.0}
+_lock = threading.Lock()
+
+@timed("upbit ticker")
+def _fetch_usdt_krw() -> float | None:
     try:
         # 업비트 KRW-USDT 마켓 직접 조회
-        res = requests.get(
+        res = http_get(
             "https://api.upbit.com/v1/ticker",
             params={"markets": "KRW-USDT"},
             timeout=5
@@ -20,4 +29,14 @@ def fetch_usdt_krw() -> float | None:
     except Exception:
         pass
     
+    count_error("upbit ticker", "error")
     return None
+
+def fetch_usdt_krw() -> float | None:
+    with _lock:
+        if _cache["value"] is not None and time.time() - _cache["at"] < RATE_TTL:
+            return _cache["value"]
+        value = _fetch_usdt_krw()
+        if value is not None:
+            _cache.update(value=value, at=time.time())
+        return value
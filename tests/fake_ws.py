@@ -0,0 +1,180 @@
+# tests/fake_ws.py
+"""
+로컬 가짜 Bitget WS 서버 (표준 라이브러리만 사용, 텍스트 프레임만 지원)
+- "ping" -> "pong", login -> 성공 응답, subscribe -> 구독 확인 이벤트
+- 받은 메시지를 연결별로 기록하고, push()로 모든 연결에 메시지를 보내고, drop()으로 연결을 끊음
+BitgetStream(public_url=server.url, private_url=...) 으로 네트워크 없이 재접속 경로를 검증합니다.
+"""
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Dict, List
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+class _Client:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.received: List[object] = []    # 텍스트 메시지 (JSON이면 파싱한 값)
+        self._lock = threading.Lock()
+
+    def send_text(self, text: str) -> None:
+        data = text.encode()
+        n = len(data)
+        if n < 126:
+            header = struct.pack("!BB", 0x81, n)
+        elif n < 1 << 16:
+            header = struct.pack("!BBH", 0x81, 126, n)
+        else:
+            header = struct.pack("!BBQ", 0x81, 127, n)
+        with self._lock:
+            self.sock.sendall(header + data)
+
+    def close(self) -> None:
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+class FakeWSServer:
+    def __init__(self, host: str = "127.0.0.1"):
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind((host, 0))
+        self._listener.listen(8)
+        self.url = f"ws://{host}:{self._listener.getsockname()[1]}"
+        self.clients: List[_Client] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self) -> "FakeWSServer":
+        threading.Thread(target=self._accept_loop, name="fake-ws-accept", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._listener.close()
+        self.drop()
+
+    # ---------------------------
+    # 테스트에서 쓰는 조작/조회
+    # ---------------------------
+    def push(self, msg: Dict) -> None:
+        for c in self.live():
+            try:
+                c.send_text(json.dumps(msg))
+            except OSError:
+                pass
+
+    def drop(self) -> None:
+        """열린 연결을 모두 끊음 (거래소 쪽 연결 끊김 재현)"""
+        with self._lock:
+            clients, self.clients = self.clients, []
+        for c in clients:
+            c.close()
+
+    def live(self) -> List[_Client]:
+        with self._lock:
+            return list(self.clients)
+
+    def subscribed(self, client: _Client) -> List[Dict]:
+        """해당 연결에서 받은 subscribe args (보낸 순서대로)"""
+        return [a for m in list(client.received) if isinstance(m, dict) and m.get("op") == "subscribe"
+                for a in m.get("args", [])]
+
+    # ---------------------------
+    # 서버 루프
+    # ---------------------------
+    def _accept_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                sock, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), name="fake-ws-conn", daemon=True).start()
+
+    def _serve(self, sock: socket.socket) -> None:
+        client = _Client(sock)
+        try:
+            self._handshake(sock)
+            with self._lock:
+                self.clients.append(client)
+            while True:
+                text = self._recv_text(sock)
+                if text is None:
+                    break
+                self._handle(client, text)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                if client in self.clients:
+                    self.clients.remove(client)
+            client.close()
+
+    def _handshake(self, sock: socket.socket) -> None:
+        raw = b""
+        while b"\r\n\r\n" not in raw:
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise ValueError("closed during handshake")
+            raw += chunk
+        headers = {}
+        for line in raw.split(b"\r\n\r\n")[0].decode().split("\r\n")[1:]:
+            k, _, v = line.partition(":")
+            headers[k.strip().lower()] = v.strip()
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + _GUID).encode()).digest()).decode()
+        sock.sendall(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, n: int) -> bytes:
+        buf = b""
+        while len(buf) < n:
+            chunk = sock.recv(n - len(buf))
+            if not chunk:
+                raise ValueError("closed")
+            buf += chunk
+        return buf
+
+    def _recv_text(self, sock: socket.socket):
+        """다음 텍스트 프레임 (close 프레임이면 None). 클라이언트 프레임은 항상 마스킹됨"""
+        while True:
+            b0, b1 = self._recv_exact(sock, 2)
+            opcode, n = b0 & 0x0F, b1 & 0x7F
+            if n == 126:
+                n = struct.unpack("!H", self._recv_exact(sock, 2))[0]
+            elif n == 127:
+                n = struct.unpack("!Q", self._recv_exact(sock, 8))[0]
+            mask = self._recv_exact(sock, 4) if b1 & 0x80 else b"\0\0\0\0"
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._recv_exact(sock, n)))
+            if opcode == 0x8:
+                return None
+            if opcode == 0x1:
+                return payload.decode()
+
+    def _handle(self, client: _Client, text: str) -> None:
+        if text == "ping":
+            client.received.append(text)
+            client.send_text("pong")
+            return
+        msg = json.loads(text)
+        client.received.append(msg)
+        if msg.get("op") == "login":
+            client.send_text(json.dumps({"event": "login", "code": 0}))
+        elif msg.get("op") == "subscribe":
+            for arg in msg.get("args", []):
+                client.send_text(json.dumps({"event": "subscribe", "arg": arg}))
+
+def wait_for(cond: Callable[[], bool], timeout: float = 5.0, interval: float = 0.02) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(interval)
+    return cond()
@@ -0,0 +1,138 @@
+# tests/test_bitget_ws.py
+"""BitgetStream 재접속 경로: 로그인 -> 재구독 -> REST 재동기화 (가짜 WS 서버 사용)"""
+import threading
+import time
+from types import MappingProxyType
+
+import pytest
+
+pytest.importorskip("websocket")
+
+from services import bitget_ws
+from services.bitget_ws import BitgetStream
+from services.snapshot import Snapshot
+from tests.fake_ws import FakeWSServer, wait_for
+
+PRODUCT = "USDT-FUTURES"
+
+def _ticker(sym):
+    return {"instType": PRODUCT, "channel": "ticker", "instId": sym}
+
+def _position(sym, side="long", mark="100"):
+    return {"symbol": sym, "holdSide": side, "total": "1", "markPrice": mark}
+
+class _Rest:
+    """resync에 넘길 REST 스냅샷 (호출 횟수 기록)"""
+
+    def __init__(self, positions):
+        self.positions = positions
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> Snapshot:
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.05)   # 두 연결의 재접속 콜백이 겹치도록 약간 지연
+        return Snapshot(positions=tuple(MappingProxyType(p) for p in self.positions),
+                        account={"marginCoin": "USDT", "usdtEquity": "1000"}, fetched_at=time.time())
+
+@pytest.fixture
+def servers(monkeypatch):
+    monkeypatch.setattr(bitget_ws, "RECONNECT_BACKOFF", (0.1,))
+    public, private = FakeWSServer().start(), FakeWSServer().start()
+    yield public, private
+    public.stop()
+    private.stop()
+
+@pytest.fixture
+def stream(servers):
+    public, private = servers
+    rest = _Rest([_position("BTCUSDT")])
+    s = BitgetStream("key", "secret", "pass", resync=rest, public_url=public.url, private_url=private.url)
+    s.rest = rest
+    s.start()
+    yield s
+    s.stop()
+
+def _connected(server, stream_conn):
+    return stream_conn.connected and len(server.live()) == 1
+
+def test_initial_subscribe(servers, stream):
+    public, private = servers
+    assert wait_for(lambda: _connected(private, stream.private) and _connected(public, stream.public))
+    priv = private.live()[0]
+    assert wait_for(lambda: len(private.subscribed(priv)) == 2)
+    assert priv.received[0]["op"] == "login"
+    assert {a["channel"] for a in private.subscribed(priv)} == {"positions", "account"}
+    assert wait_for(lambda: _ticker("BTCUSDT") in public.subscribed(public.live()[0]))
+    assert stream.rest.calls == 1
+
+def test_position_push_adds_ticker(servers, stream):
+    public, private = servers
+    assert wait_for(lambda: _connected(private, stream.private) and _connected(public, stream.public))
+    private.push({"arg": {"instType": PRODUCT, "channel": "positions", "instId": "default"},
+                  "data": [_position("BTCUSDT"), _position("ETHUSDT", "short")]})
+    assert wait_for(lambda: _ticker("ETHUSDT") in public.subscribed(public.live()[0]))
+    public.push({"arg": _ticker("ETHUSDT"), "data": [{"instId": "ETHUSDT", "markPrice": "2500"}]})
+    assert wait_for(lambda: stream.state.positions.get(("ETHUSDT", "short"), {}).get("markPrice") == "2500.0")
+
+def test_reconnect_resubscribes_and_resyncs_once(servers, stream):
+    public, private = servers
+    assert wait_for(lambda: _connected(private, stream.private) and _connected(public, stream.public))
+    # 연결 중에 추가된 심볼 -> 재접속 후 전체 목록에 포함돼야 함
+    private.push({"arg": {"instType": PRODUCT, "channel": "positions", "instId": "default"},
+                  "data": [_position("BTCUSDT"), _position("ETHUSDT")]})
+    assert wait_for(lambda: _ticker("ETHUSDT") in public.subscribed(public.live()[0]))
+    assert stream.rest.calls == 1
+
+    # 재접속 후 REST가 돌려줄 상태 (끊긴 동안 SOL 포지션이 생김)
+    stream.rest.positions = [_position("BTCUSDT"), _position("ETHUSDT"), _position("SOLUSDT")]
+    old_public, old_private = public.live()[0], private.live()[0]
+    public.drop()
+    private.drop()
+
+    def reconnected(server, conn, old):
+        live = server.live()
+        return conn.connected and len(live) == 1 and live[0] is not old
+
+    assert wait_for(lambda: reconnected(private, stream.private, old_private)
+                    and reconnected(public, stream.public, old_public))
+    priv = private.live()[0]
+    assert wait_for(lambda: len(private.subscribed(priv)) == 2)
+    assert priv.received[0]["op"] == "login"
+
+    pub = public.live()[0]
+    want = [_ticker(s) for s in ("BTCUSDT", "ETHUSDT", "SOLUSDT")]
+    assert wait_for(lambda: all(t in public.subscribed(pub) for t in want))
+    # 같은 끊김으로 두 연결이 재접속해도 REST 재동기화는 한 번
+    time.sleep(0.5)
+    assert stream.rest.calls == 2
+    assert ("SOLUSDT", "long") in stream.state.positions
+    assert stream.snapshot().errors == {}
+
+def test_subscribe_while_handshaking_is_not_lost(servers, monkeypatch):
+    """run()이 구독 목록을 보낸 직후 ~ connected=True 사이에 추가된 구독도 전송돼야 함"""
+    public, private = servers
+    s = BitgetStream("key", "secret", "pass", resync=None, public_url=public.url, private_url=private.url)
+    conn = s.public
+    conn.subscribe([_ticker("BTCUSDT")])
+
+    sent = threading.Event()
+    real_send = conn._send
+
+    def send_then_race(payload):
+        real_send(payload)
+        if isinstance(payload, dict) and payload.get("op") == "subscribe" and not sent.is_set():
+            sent.set()
+            # 다른 스레드가 이 틈에 구독 추가 (잠금 때문에 connected=True 이후에 처리돼야 함)
+            t = threading.Thread(target=conn.subscribe, args=([_ticker("ETHUSDT")],))
+            t.start()
+            t.join(0.2)
+
+    monkeypatch.setattr(conn, "_send", send_then_race)
+    threading.Thread(target=conn.run, daemon=True).start()
+    try:
+        assert wait_for(lambda: len(public.live()) == 1)
+        assert wait_for(lambda: _ticker("ETHUSDT") in public.subscribed(public.live()[0]))
+    finally:
+        conn.stop()
@@ -0,0 +1,73 @@
+# tests/test_klines.py
+"""refresh_tail 페이지 이동: Bitget candles처럼 endTime 이전의 최신 limit개만 돌려주는 가짜 거래소 사용"""
+import threading
+
+import pytest
+
+from services import klines
+
+STEP = klines.GRANULARITY_MS["1m"]
+KEY = ("BTCUSDT", "1m", "USDT-FUTURES")
+
+class _Exchange:
+    """[start, end] 구간에서 endTime 쪽 최신 limit개를 돌려줌 (요청 기록)"""
+
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+        self.calls = []
+
+    def __call__(self, symbol, granularity, product_type="USDT-FUTURES", limit=100,
+                 start_ms=None, end_ms=None, history=False):
+        self.calls.append((start_ms, end_ms, limit))
+        end = self.now_ms if end_ms is None else min(end_ms, self.now_ms)
+        last = end // STEP * STEP
+        ts = [t for t in range(last, last - limit * STEP, -STEP) if start_ms is None or t >= start_ms]
+        return [[str(t), "1", "2", "0.5", "1.5", "10", "15"] for t in sorted(ts)]
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(klines, "DB_PATH", str(tmp_path / "market.db"))
+    monkeypatch.setattr(klines, "_conn", None)
+    monkeypatch.setattr(klines, "_last_refresh", {})
+    yield
+    if klines._conn is not None:
+        klines._conn.close()
+
+def _all_ts():
+    with klines._lock:
+        return [r[0] for r in klines._get_conn().execute(
+            "SELECT ts FROM candles WHERE symbol = ? AND granularity = ? AND product_type = ? ORDER BY ts", KEY)]
+
+def test_refresh_tail_fills_gap_longer_than_one_page(store, monkeypatch):
+    now_ms = 10_000 * STEP + 30_000          # 진행 중인 봉 하나 포함
+    last = now_ms - 2500 * STEP               # 2500봉 공백 -> 페이지 3개
+    now_ms_aligned = now_ms // STEP * STEP
+    ex = _Exchange(now_ms)
+    monkeypatch.setattr(klines, "fetch_candles", ex)
+    monkeypatch.setattr(klines.time, "time", lambda: now_ms / 1000)
+    klines._upsert(KEY, [[last // STEP * STEP, 1, 1, 1, 1, 1, 1]])
+
+    klines.refresh_tail(*KEY)
+
+    ts = _all_ts()
+    assert ts == list(range(last // STEP * STEP, now_ms_aligned + STEP, STEP))   # 빈 구간 없이 현재 봉까지
+    assert len(ex.calls) == 3
+    assert all(end is not None for _, end, _ in ex.calls)
+
+def test_refresh_tail_is_throttled_across_threads(store, monkeypatch):
+    now_ms = 10_000 * STEP
+    ex = _Exchange(now_ms)
+    monkeypatch.setattr(klines, "fetch_candles", ex)
+    monkeypatch.setattr(klines.time, "time", lambda: now_ms / 1000)
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        klines.refresh_tail(*KEY)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(ex.calls) == 1
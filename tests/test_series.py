@@ -0,0 +1,26 @@
+# tests/test_series.py
+"""EquitySeries.window: 세션마다 다른 현재 자산을 넣어도 공유 캐시/다른 세션 결과가 바뀌지 않아야 함"""
+import pandas as pd
+
+from services.series import EquitySeries
+
+def _series():
+    s = EquitySeries()
+    s.sync_daily(pd.DataFrame({"date": ["2026-01-01", "2026-01-02", "2026-01-03"], "equity": [100.0, 110.0, 105.0]}))
+    return s
+
+def test_window_appends_live_point_without_touching_cache():
+    s = _series()
+    now = pd.Timestamp("2026-01-03 12:00")
+    x1, y1 = s.window("All", 120.0, now=now)
+    x2, y2 = s.window("All", 90.0, now=now + pd.Timedelta(minutes=1))
+
+    assert list(y1) == [100.0, 110.0, 105.0, 120.0]
+    assert list(y2) == [100.0, 110.0, 105.0, 90.0]
+    assert x1[-1] == now.to_datetime64() and x2[-1] > x1[-1]
+    assert list(s.daily_y) == [100.0, 110.0, 105.0]
+
+def test_window_cutoff_excludes_old_points():
+    s = _series()
+    x, y = s.window("1W", 120.0, now=pd.Timestamp("2026-01-09 12:00"))
+    assert list(y) == [105.0, 120.0]
@@ -1,24 +1,21 @@
 # ui/cards.py
 import streamlit as st
-from utils.format import render_html, fnum
+from utils.markup import HtmlTemplate, memo_markup, emit_html
 
-def render_top_bar(total_equity, available, leverage, next_refresh="20s", usdt_rate=None):
-    # KRW 환산 헬퍼
-    def to_krw(val):
-        return f"<span style='font-size:0.9rem; color:#737373; margin-left:6px; font-weight:500;'>≈₩{val*usdt_rate:,.0f}</span>" if usdt_rate else ""
+# 템플릿은 모듈 로드 시 한 번만 정리되고, 입력값이 같으면 이전 마크업을 재사용
+_KRW_SPAN = HtmlTemplate("<span style='font-size:0.9rem; color:#737373; margin-left:6px; font-weight:500;'>≈₩{krw:,.0f}</span>")
+_RATE_DISPLAY = HtmlTemplate("<div style='font-size:0.8rem; color:#f5f5f5; font-weight:600; margin-bottom:4px;'>1 USDT ≈ {rate:,.0f} KRW</div>")
+_KRW_PNL = HtmlTemplate("<div style='font-size:0.8rem; color:#737373; margin-top:2px;'>≈{sign}₩{krw:,.0f}</div>")
 
-    # 환율 표시 HTML
-    rate_display = f"<div style='font-size:0.8rem; color:#f5f5f5; font-weight:600; margin-bottom:4px;'>1 USDT ≈ {usdt_rate:,.0f} KRW</div>" if usdt_rate else ""
-
-    html = f"""
+_TOP_BAR = HtmlTemplate("""
     <div style="display:flex; gap:40px; margin-bottom:24px; align-items:flex-start; padding: 0 4px;">
         <div>
             <div class="label" style="margin-bottom:4px;">총 자산 <span class="badge badge-neutral" style="margin-left:4px;">통합</span></div>
-            <div class="value-xl">${total_equity:,.2f}{to_krw(total_equity)}</div>
+            <div class="value-xl">${total_equity:,.2f}{krw_total}</div>
         </div>
         <div>
             <div class="label" style="margin-bottom:4px;">출금 가능 금액</div>
-            <div class="value-xl">${available:,.2f}{to_krw(available)}</div>
+            <div class="value-xl">${available:,.2f}{krw_available}</div>
             <div style="font-size:0.7rem; color:var(--text-tertiary); margin-top:2px;">여유 증거금 비중: 74.5%</div>
         </div>
         <div>
@@ -26,7 +23,7 @@ def render_top_bar(total_equity, available, leverage, next_refresh="20s", usdt_r
             <div class="value-xl" style="display:flex; align-items:center; gap:8px;">
                 {leverage:.2f}x <span class="badge badge-up">활성</span>
             </div>
-            <div style="font-size:0.7rem; color:var(--text-tertiary); margin-top:2px;">명목 가치: ${(total_equity * leverage):,.2f}</div>
+            <div style="font-size:0.7rem; color:var(--text-tertiary); margin-top:2px;">명목 가치: ${notional:,.2f}</div>
         </div>
         <div style="flex-grow:1; text-align:right; padding-top:4px;">
              {rate_display}
@@ -34,37 +31,9 @@ def render_top_bar(total_equity, available, leverage, next_refresh="20s", usdt_r
              <div style="color:var(--color-up); font-size:0.8rem; font-weight:500; cursor:pointer; margin-top:4px;">시스템 정상</div>
         </div>
     </div>
-    """
-    render_html(st, html)
-
-def render_left_summary(perp_equity, margin_usage, unrealized_pnl, roe_pct, positions, usdt_rate=None):
-    # Delta Logic
-    long_delta = sum(fnum(p.get('marginSize', 0)) * fnum(p.get('leverage', 0)) for p in positions if str(p.get('holdSide')).upper() == 'LONG')
-    short_delta = sum(fnum(p.get('marginSize', 0)) * fnum(p.get('leverage', 0)) for p in positions if str(p.get('holdSide')).upper() == 'SHORT')
-    net_delta = long_delta - short_delta
-    total_exposure = long_delta + short_delta
-    
-    equity_base = perp_equity if perp_equity > 0 else 1.0
-    delta_ratio = net_delta / equity_base
-
-    if delta_ratio > 0.05: bias_text, bias_color, bias_badge = "롱(매수)", "var(--color-up)", "badge-up"
-    elif delta_ratio < -0.05: bias_text, bias_color, bias_badge = "숏(매도)", "var(--color-down)", "badge-down"
-    else: bias_text, bias_color, bias_badge = "중립", "var(--text-secondary)", "badge-neutral"
-
-    long_pct = (long_delta / total_exposure * 100) if total_exposure > 0 else 0
-    short_pct = (short_delta / total_exposure * 100) if total_exposure > 0 else 0
-    pnl_cls = "text-up" if unrealized_pnl >= 0 else "text-down"
-    pnl_sign = "+" if unrealized_pnl >= 0 else ""
-
-    # [수정] KRW 문자열 생성
-    krw_equity = f"<span style='font-size:0.9rem; color:#737373; margin-left:6px; font-weight:500;'>≈₩{perp_equity*usdt_rate:,.0f}</span>" if usdt_rate else ""
-    krw_pnl = ""
-    if usdt_rate:
-        val = abs(unrealized_pnl * usdt_rate)
-        s_sign = "+" if unrealized_pnl >= 0 else "-"
-        krw_pnl = f"<div style='font-size:0.8rem; color:#737373; margin-top:2px;'>≈{s_sign}₩{val:,.0f}</div>"
+    """)
 
-    html = f"""
+_LEFT_SUMMARY = HtmlTemplate("""
     <div class="dashboard-card" style="height:400px; padding:24px; display:flex; flex-direction:column; justify-content:space-between;">
         <div>
             <div class="label">선물 자산</div>
@@ -74,7 +43,7 @@ def render_left_summary(perp_equity, margin_usage, unrealized_pnl, roe_pct, posi
                 <span class="text-mono" style="font-size:0.85rem; color:var(--text-primary);">{margin_usage:.2f}%</span>
             </div>
             <div class="progress-bg">
-                <div class="progress-fill" style="width:{min(margin_usage,100)}%; background:var(--color-up);"></div>
+                <div class="progress-fill" style="width:{usage_bar}%; background:var(--color-up);"></div>
             </div>
         </div>
         
@@ -85,15 +54,15 @@ def render_left_summary(perp_equity, margin_usage, unrealized_pnl, roe_pct, posi
             </div>
             <div class="flex-between" style="margin-top:8px;">
                 <span class="label">순 노출도</span>
-                <span class="text-mono" style="color:{bias_color}; font-size:0.9rem; font-weight:600;">{(delta_ratio*100):+.2f}%</span>
+                <span class="text-mono" style="color:{bias_color}; font-size:0.9rem; font-weight:600;">{delta_pct:+.2f}%</span>
             </div>
             <div class="progress-bg" style="display:flex; background:#1a1a1a; height:6px; margin-top:10px;">
                 <div style="width:{long_pct}%; background:var(--color-up);"></div>
                 <div style="width:{short_pct}%; background:var(--color-down);"></div>
             </div>
             <div class="flex-between" style="margin-top:6px; font-size:0.75rem;">
-                <span style="color:var(--color-up); font-weight:500;">${long_delta/1000:.0f}k</span>
-                <span style="color:var(--color-down); font-weight:500;">${short_delta/1000:.0f}k</span>
+                <span style="color:var(--color-up); font-weight:500;">${long_k:.0f}k</span>
+                <span style="color:var(--color-down); font-weight:500;">${short_k:.0f}k</span>
             </div>
         </div>
         
@@ -108,5 +77,58 @@ def render_left_summary(perp_equity, margin_usage, unrealized_pnl, roe_pct, posi
             {krw_pnl}
         </div>
     </div>
-    """
-    render_html(st, html)
+    """)
+
+def render_top_bar(total_equity, available, leverage, next_refresh="20s", usdt_rate=None):
+    model = (total_equity, available, leverage, next_refresh, usdt_rate)
+    emit_html(st, memo_markup("top_bar", model, lambda: _top_bar_html(*model)))
+
+def _top_bar_html(total_equity, available, leverage, next_refresh, usdt_rate):
+    # KRW 환산 헬퍼
+    def to_krw(val):
+        return _KRW_SPAN.render(krw=val * usdt_rate) if usdt_rate else ""
+
+    return _TOP_BAR.render(
+        total_equity=total_equity,
+        krw_total=to_krw(total_equity),
+        available=available,
+        krw_available=to_krw(available),
+        leverage=leverage,
+        notional=total_equity * leverage,
+        # 환율 표시 HTML
+        rate_display=_RATE_DISPLAY.render(rate=usdt_rate) if usdt_rate else "",
+        next_refresh=next_refresh,
+    )
+
+def render_left_summary(perp_equity, summary, usdt_rate=None):
+    # Delta Logic (services.positions.summarize에서 한 번에 계산된 값 사용)
+    model = (perp_equity, summary["usage_pct"], summary["upl"], summary["roe"], summary["long_notional"],
+             summary["short_notional"], summary["exposure"], summary["delta_ratio"], usdt_rate)
+    emit_html(st, memo_markup("left_summary", model, lambda: _left_summary_html(*model)))
+
+def _left_summary_html(perp_equity, margin_usage, unrealized_pnl, roe_pct, long_delta, short_delta,
+                       total_exposure, delta_ratio, usdt_rate):
+    if delta_ratio > 0.05: bias_text, bias_color, bias_badge = "롱(매수)", "var(--color-up)", "badge-up"
+    elif delta_ratio < -0.05: bias_text, bias_color, bias_badge = "숏(매도)", "var(--color-down)", "badge-down"
+    else: bias_text, bias_color, bias_badge = "중립", "var(--text-secondary)", "badge-neutral"
+
+    long_pct = (long_delta / total_exposure * 100) if total_exposure > 0 else 0
+    short_pct = (short_delta / total_exposure * 100) if total_exposure > 0 else 0
+    pnl_cls = "text-up" if unrealized_pnl >= 0 else "text-down"
+    pnl_sign = "+" if unrealized_pnl >= 0 else ""
+
+    # [수정] KRW 문자열 생성
+    krw_equity = _KRW_SPAN.render(krw=perp_equity * usdt_rate) if usdt_rate else ""
+    krw_pnl = ""
+    if usdt_rate:
+        krw_pnl = _KRW_PNL.render(sign="+" if unrealized_pnl >= 0 else "-", krw=abs(unrealized_pnl * usdt_rate))
+
+    return _LEFT_SUMMARY.render(
+        perp_equity=perp_equity, krw_equity=krw_equity,
+        margin_usage=margin_usage, usage_bar=min(margin_usage, 100),
+        bias_badge=bias_badge, bias_text=bias_text, bias_color=bias_color,
+        delta_pct=delta_ratio * 100, long_pct=long_pct, short_pct=short_pct,
+        long_k=long_delta / 1000, short_k=short_delta / 1000,
+        pnl_cls=pnl_cls, pnl_sign=pnl_sign, roe_pct=roe_pct, unrealized_pnl=unrealized_pnl,
+        krw_pnl=krw_pnl,
+    )
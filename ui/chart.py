@@ -1,27 +1,49 @@
 # ui/chart.py
-import plotly.graph_objects as go
 import streamlit as st
-import pandas as pd
-from datetime import timedelta
-from utils.format import render_html
+from utils.markup import HtmlTemplate, memo_markup, emit_html
+from utils.downsample import auto_downsample
+from ui.live_chart import render_live_chart
+from utils.telemetry import span
 
-def render_chart(history_df, current_equity, usdt_rate=None):
+# 헤더/리스크 줄 템플릿 (모듈 로드 시 한 번만 정리)
+_HEADER = HtmlTemplate("""
+    <div style="
+        position: relative;
+        text-align: right;
+        margin-bottom: -40px; 
+        z-index: 10;
+        padding-right: 10px;
+        pointer-events: none; /* 차트 인터랙션 방해 금지 */
+    ">
+        <div style="font-size:0.8rem; color:#848E9C; font-weight:500; margin-bottom:4px;">
+            {timeframe} 통합 손익  
+        </div>
+        <div class="text-mono" style="
+            color: {main_color}; 
+            font-weight: 600; 
+            font-size: 1.5rem; 
+            letter-spacing: -0.5px;
+            text-shadow: 0px 0px 10px {fill_color};
+        ">
+            {pnl_sign}${pnl_diff:,.2f}{krw_pnl_html}
+        </div>
+    </div>
+    """)
+
+_RISK = HtmlTemplate("""
+    <div class="text-mono" style="text-align:right; font-size:0.75rem; color:#848E9C; padding-top:6px;">
+        MDD <span class="{dd_cls}">{mdd:.1f}%</span>
+        · 변동성 {vol}%
+        · Sharpe {sharpe}
+        · Sortino {sortino}
+        · 손실구간 {underwater}일
+    </div>
+    """)
+
+def render_chart(series, current_equity, usdt_rate=None, risk=None):
     # ---------------------------
     # 1. 데이터 준비 및 기간 필터링
     # ---------------------------
-    if history_df is None or history_df.empty:
-        df = pd.DataFrame({'date': [pd.Timestamp.now().strftime('%Y-%m-%d')], 'equity': [current_equity]})
-    else:
-        df = history_df.copy()
-        last_date = str(df['date'].iloc[-1])
-        today_str = pd.Timestamp.now().strftime('%Y-%m-%d')
-        
-        if last_date != today_str:
-            new_row = pd.DataFrame({'date': [today_str], 'equity': [current_equity]})
-            df = pd.concat([df, new_row], ignore_index=True)
-            
-    df['date'] = pd.to_datetime(df['date'])
-    
     # [기간 필터 UI] - 차트 상단에 배치
     # Streamlit 1.40+ 에서는 st.pills 사용 가능, 하위 버전은 st.radio로 대체
     c_filter, c_empty = st.columns([0.4, 0.6])
@@ -35,22 +57,22 @@ def render_chart(history_df, current_equity, usdt_rate=None):
             key="chart_tf"
         )
 
-    # [필터 로직]
-    cutoff_date = df['date'].min()
-    if timeframe == "1W":
-        cutoff_date = pd.Timestamp.now() - timedelta(weeks=1)
-    elif timeframe == "1M":
-        cutoff_date = pd.Timestamp.now() - timedelta(days=30)
-    
-    filtered_df = df[df['date'] >= cutoff_date]
-    if filtered_df.empty:
-        filtered_df = df.tail(1) # 데이터가 없으면 마지막 점이라도 표시
+    # [필터 로직] 캐시된 시계열에서 끝 부분만 갱신하고 이진 탐색으로 기간 창을 자름
+    # (일별 기록 + 기간별 인트라데이 롤업 + 현재 자산 1점)
+    with span("ui.chart.series"):
+        series.sync_intraday(timeframe)
+        xs, ys = series.window(timeframe, current_equity)
+
+    # [리스크 지표] 엔진이 증분으로 유지하는 값을 읽기만 함 (필터 오른쪽 빈 칸에 표시)
+    if risk is not None:
+        with c_empty:
+            emit_html(st, _risk_html(risk.metrics(timeframe, live_equity=current_equity)))
 
     # ---------------------------
     # 2. PnL 계산 (필터링된 기간 기준)
     # ---------------------------
-    start_val = filtered_df['equity'].iloc[0]
-    end_val = filtered_df['equity'].iloc[-1]
+    start_val = ys[0]
+    end_val = ys[-1]
     pnl_diff = end_val - start_val
     pnl_sign = "+" if pnl_diff >= 0 else ""
     
@@ -68,39 +90,50 @@ def render_chart(history_df, current_equity, usdt_rate=None):
     # ---------------------------
     # 3. Header HTML (오른쪽 상단 배치 스타일)
     # ---------------------------
-    header_html = f"""
-    <div style="
-        position: relative;
-        text-align: right;
-        margin-bottom: -40px; 
-        z-index: 10;
-        padding-right: 10px;
-        pointer-events: none; /* 차트 인터랙션 방해 금지 */
-    ">
-        <div style="font-size:0.8rem; color:#848E9C; font-weight:500; margin-bottom:4px;">
-            {timeframe} 통합 손익  
-        </div>
-        <div class="text-mono" style="
-            color: {main_color}; 
-            font-weight: 600; 
-            font-size: 1.5rem; 
-            letter-spacing: -0.5px;
-            text-shadow: 0px 0px 10px {fill_color};
-        ">
-            {pnl_sign}${pnl_diff:,.2f}{krw_pnl_html}
-        </div>
-    </div>
-    """
-    render_html(st, header_html)
+    model = (timeframe, pnl_sign, pnl_diff, main_color, fill_color, krw_pnl_html)
+    emit_html(st, memo_markup("chart_header", model, lambda: _HEADER.render(
+        timeframe=timeframe, main_color=main_color, fill_color=fill_color,
+        pnl_sign=pnl_sign, pnl_diff=pnl_diff, krw_pnl_html=krw_pnl_html)))
 
     # ---------------------------
-    # 4. Plotly Chart 설정 (이미지 스타일 적용)
+    # 4. Plotly Chart (레이아웃은 세션당 1회, 이후에는 변경된 점만 전송)
     # ---------------------------
+    # 포인트가 차트 폭보다 많으면 고점/저점을 보존하며 다운샘플 (LTTB)
+    with span("ui.chart.downsample"):
+        plot_x, plot_y = auto_downsample(xs, ys)
+
+    # Y축 범위 계산 (여백 추가)
+    min_y = ys.min()
+    max_y = ys.max()
+    padding = (max_y - min_y) * 0.2 if max_y != min_y else max_y * 0.05
+    y_range = [min_y - padding, max_y + padding]
+
+    render_live_chart(
+        plot_x, plot_y,
+        build_spec=lambda: _build_figure(main_color, fill_color),
+        spec_key=(timeframe, main_color),
+        y_range=y_range,
+        height=350,
+    )
+
+def _risk_html(m):
+    def fmt(v, spec):
+        return "-" if v is None else format(v, spec)
+    return _RISK.render(
+        dd_cls="text-down" if m["max_drawdown_pct"] < 0 else "text-up",
+        mdd=m["max_drawdown_pct"],
+        vol=fmt(m["volatility_pct"], ".0f"),
+        sharpe=fmt(m["sharpe"], ".2f"),
+        sortino=fmt(m["sortino"], ".2f"),
+        underwater=m["underwater_days"],
+    )
+
+def _build_figure(main_color, fill_color):
+    """차트 스펙 (데이터 없이 트레이스 스타일 + 레이아웃, 이미지 스타일 적용)"""
+    import plotly.graph_objects as go  # 차트를 처음 그릴 때 로드 (앱 기동 시 import 비용 제외)
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=filtered_df['date'], 
-        y=filtered_df['equity'],
         mode='lines+markers', # 선과 마커(점) 모두 표시
         line=dict(
             color=main_color, 
@@ -116,15 +149,9 @@ def render_chart(history_df, current_equity, usdt_rate=None):
         fill='tozeroy', 
         fillcolor=fill_color,
         hoverinfo='y+x',
-        hovertemplate='<span style="color:#000">Date: %{x|%m-%d}<br>Equity: $%{y:,.2f}</span><extra></extra>'
+        hovertemplate='<span style="color:#000">Date: %{x|%m-%d %H:%M}<br>Equity: $%{y:,.2f}</span><extra></extra>'
     ))
 
-    # Y축 범위 계산 (여백 추가)
-    min_y = filtered_df['equity'].min()
-    max_y = filtered_df['equity'].max()
-    padding = (max_y - min_y) * 0.2 if max_y != min_y else max_y * 0.05
-    y_range = [min_y - padding, max_y + padding]
-
     fig.update_layout(
         template="plotly_dark",
         paper_bgcolor='rgba(0,0,0,0)', # 배경 투명
@@ -147,7 +174,6 @@ def render_chart(history_df, current_equity, usdt_rate=None):
             showline=False,
             showticklabels=True,
             tickfont=dict(size=11, color="#848E9C", family="Inter"),
-            range=y_range,
             fixedrange=True,
             side='left'          # Y축 왼쪽 배치
         ),
@@ -159,5 +185,4 @@ def render_chart(history_df, current_equity, usdt_rate=None):
             font=dict(color="#fff")
         )
     )
-
-    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False, 'staticPlot': False})
+    return fig
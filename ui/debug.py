@@ -0,0 +1,32 @@
+# ui/debug.py
+import pandas as pd
+import streamlit as st
+from utils.telemetry import stage_stats, error_counts
+from services.ratelimit import get_limiter
+
+def render_debug_panel():
+    """?debug=1 일 때만 보이는 틱 구간별 지연/에러/리미터 현황"""
+    with st.expander("Debug · 구간별 지연", expanded=True):
+        stats = stage_stats()
+        if stats:
+            df = pd.DataFrame(stats).set_index("stage").sort_values("p95_ms", ascending=False)
+            st.dataframe(df.style.format("{:,.1f}", subset=[c for c in df.columns if c.endswith("_ms")]))
+        else:
+            st.caption("아직 측정된 구간이 없습니다.")
+
+        c1, c2 = st.columns(2)
+        with c1:
+            st.caption("API 에러")
+            errors = error_counts()
+            if errors:
+                st.dataframe(pd.DataFrame(errors), hide_index=True)
+            else:
+                st.caption("없음")
+        with c2:
+            st.caption("Rate limit 예산")
+            usage = get_limiter().usage()
+            if usage:
+                cols = ["endpoint", "key", "used_1m", "headroom_pct", "waiting_high", "waiting_low", "throttled", "server_limited"]
+                st.dataframe(pd.DataFrame(usage)[cols], hide_index=True)
+            else:
+                st.caption("없음")
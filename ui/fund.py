@@ -0,0 +1,76 @@
+# ui/fund.py
+import streamlit as st
+from services.fund import MANAGER, subscribe, redeem, charge_performance_fee, investor_history
+
+ACTIONS = ["입금", "출금", "성과보수 정산"]
+NEW_INVESTOR = "+ 새 투자자"
+
+def render_nav_history(history_df, investors):
+    """일별 NAV와 투자자별 평가액 추이 (좌수 원장 기준)"""
+    if history_df is None or history_df.empty:
+        return
+    names = sorted(investors, key=lambda n: investors[n], reverse=True)
+    c_title, c_pick = st.columns([0.7, 0.3], vertical_alignment="center")
+    with c_title:
+        st.caption("NAV 추이 (일별 자산 / 해당 날짜 기준 보유 좌수)")
+    with c_pick:
+        who = st.selectbox("투자자", ["전체"] + names, key="nav_history_investor", label_visibility="collapsed")
+    df = investor_history(history_df, None if who == "전체" else who)
+    if df["nav"].isna().all():
+        st.caption("좌수 원장 기록이 없습니다.")
+        return
+    df = df.set_index("date")
+    if who == "전체":
+        st.line_chart(df[["nav"]], height=220)
+    else:
+        st.line_chart(df[[f"{who} value"]].rename(columns={f"{who} value": f"{who} 평가액 (USDT)"}), height=220)
+
+def render_fund_admin(equity, investors):
+    """
+    입출금/성과보수를 좌수 원장에 기록 (services.fund)
+    거래소에 이미 반영된 입출금이면 현재 자산에서 금액을 되돌려 직전 자산 기준 NAV로 좌수를 계산
+    """
+    with st.expander("입출금 기록"):
+        with st.form("fund_event", clear_on_submit=True):
+            c_action, c_who, c_amount = st.columns(3)
+            action = c_action.selectbox("종류", ACTIONS)
+            pick = c_who.selectbox("투자자", [n for n in sorted(investors) if n != MANAGER] + [NEW_INVESTOR])
+            amount = c_amount.number_input("금액 (USDT)", min_value=0.0, step=100.0, format="%.2f")
+            c_new, c_date, c_applied = st.columns(3)
+            new_name = c_new.text_input("새 투자자 이름", help=f"투자자에서 '{NEW_INVESTOR}'를 고른 경우")
+            date = c_date.date_input("날짜 (KST)", value=None, help="비우면 오늘")
+            applied = c_applied.checkbox("거래소 잔고에 이미 반영됨", value=True)
+            submitted = st.form_submit_button("기록")
+        if not submitted:
+            return
+        investor = new_name.strip() if pick == NEW_INVESTOR else pick
+        day = date.isoformat() if date else None
+        # 입출금 직전 자산 (거래소에 이미 반영된 금액은 되돌림)
+        base = equity
+        if applied and action == "입금":
+            base -= amount
+        elif applied and action == "출금":
+            base += amount
+        if equity <= 0 or base <= 0:
+            st.error("자산 조회 결과가 없어 NAV를 계산할 수 없습니다.")
+            return
+        try:
+            if action == "성과보수 정산":
+                event = charge_performance_fee(equity, date=day)
+                st.toast("성과보수 발행" if event else "HWM 이하 (발행 없음)")
+            else:
+                if not investor:
+                    st.error("투자자 이름을 입력하세요.")
+                    return
+                if amount <= 0:
+                    st.error("금액을 입력하세요.")
+                    return
+                if action == "입금":
+                    subscribe(investor, amount, base, date=day)
+                else:
+                    redeem(investor, amount, base, date=day)
+                st.toast(f"{investor} {action} ${amount:,.2f} 기록")
+        except ValueError as e:
+            st.error(str(e))
+            return
+        st.rerun()
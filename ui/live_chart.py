@@ -0,0 +1,73 @@
+# ui/live_chart.py
+import json
+import os
+import numpy as np
+import streamlit as st
+import streamlit.components.v1 as components
+
+_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "equity_chart")
+_component = None
+
+def _get_component():
+    """컴포넌트 등록 (plotly.js는 컴포넌트 폴더에 함께 커밋된 번들 사용, 실행 중에 파일을 쓰지 않음)"""
+    global _component
+    if _component is None:
+        _component = components.declare_component("equity_chart", path=_COMPONENT_DIR)
+    return _component
+
+def _x_to_str(x: np.ndarray) -> list:
+    return np.datetime_as_string(np.asarray(x, dtype="datetime64[s]"), unit="s").tolist()
+
+def _diff(old_x: np.ndarray, old_y: np.ndarray, new_x: np.ndarray, new_y: np.ndarray):
+    """
+    이전에 보낸 배열과 비교해 (앞에서 버릴 개수, 유지할 개수)를 구함
+    겹치는 구간이 없거나 절반 이상 바뀌었으면 None (full 전송이 더 쌈)
+    """
+    if not len(old_x) or not len(new_x):
+        return None
+    drop = int(np.searchsorted(old_x, new_x[0], side="left"))
+    if drop >= len(old_x) or old_x[drop] != new_x[0]:
+        return None
+    ox, oy = old_x[drop:], old_y[drop:]
+    m = min(len(ox), len(new_x))
+    changed = (ox[:m] != new_x[:m]) | (oy[:m] != new_y[:m])
+    keep = int(np.argmax(changed)) if changed.any() else m
+    if len(new_x) - keep > len(new_x) // 2 + 1:
+        return None
+    return drop, keep
+
+def render_live_chart(x: np.ndarray, y: np.ndarray, build_spec, spec_key, y_range, height=350, key="equity_chart"):
+    """
+    Plotly 차트를 커스텀 컴포넌트로 그림
+    - 레이아웃/스타일(build_spec)은 spec_key가 바뀔 때만 전송 (세션당 1회)
+    - 이후 틱은 바뀐 포인트만 patch로 전송 -> 브라우저는 extendTraces/react로 반영
+    """
+    x = np.asarray(x, dtype="datetime64[s]")
+    y = np.asarray(y, dtype="float64")
+    state_key = f"_{key}_sent"
+    sent = st.session_state.get(state_key)
+
+    # 프론트엔드가 동기화를 잃었으면(iframe 재마운트 등) full 재전송
+    resync = (st.session_state.get(key) or {}).get("resync")
+    need_full = sent is None or sent["spec"] != spec_key or (resync and resync != sent.get("resync"))
+
+    patch = None if need_full else _diff(sent["x"], sent["y"], x, y)
+    rev = (sent["rev"] + 1) if sent else 1
+    y_range = [float(v) for v in y_range]
+
+    if patch is None:
+        fig = build_spec()
+        spec = json.loads(fig.to_json())
+        trace = spec["data"][0]
+        trace["x"], trace["y"] = _x_to_str(x), y.tolist()
+        spec["layout"].setdefault("yaxis", {})["range"] = y_range
+        msg = {"op": "full", "rev": rev, "data": [trace], "layout": spec["layout"],
+               "config": {"displayModeBar": False, "staticPlot": False, "responsive": True},
+               "height": height}
+    else:
+        drop, keep = patch
+        msg = {"op": "patch", "base": sent["rev"], "rev": rev, "drop": drop, "keep": keep,
+               "x": _x_to_str(x[keep:]), "y": y[keep:].tolist(), "yrange": y_range}
+
+    st.session_state[state_key] = {"spec": spec_key, "rev": rev, "x": x, "y": y, "resync": resync}
+    _get_component()(msg=msg, key=key, default=None, height=height)
@@ -0,0 +1,45 @@
+# ui/market.py
+import streamlit as st
+from services.klines import get_klines
+from services.timeseries import KST_OFFSET
+from ui.toolbar import render_toolbar
+from utils.telemetry import span
+
+CANDLE_LIMIT = 200  # 차트에 그리는 봉 수
+
+def render_market_chart(positions=None):
+    """
+    심볼/봉 단위를 고르고 로컬 캔들 저장소(services.klines)에서 읽어 그림
+    tail만 증분 갱신하므로 재실행마다 거래소에 전체 구간을 다시 요청하지 않음 (수집기가 있으면 이미 채워져 있음)
+    """
+    symbol, granularity = render_toolbar(positions)
+    with span("ui.market.klines"):
+        df = get_klines(symbol, granularity, limit=CANDLE_LIMIT)
+    if df.empty:
+        st.caption("캔들 데이터를 불러오지 못했습니다.")
+        return
+    st.plotly_chart(_build_figure(df), width="stretch", config={"displayModeBar": False},
+                    key="market_chart")
+
+def _build_figure(df):
+    import pandas as pd
+    import plotly.graph_objects as go  # 시세 탭을 처음 그릴 때 로드
+    fig = go.Figure(go.Candlestick(
+        x=df["timestamp"] + pd.Timedelta(seconds=KST_OFFSET),  # 저장소는 UTC, 표시는 KST
+        open=df["open"], high=df["high"], low=df["low"], close=df["close"],
+        increasing=dict(line=dict(color="#2EBD85"), fillcolor="#2EBD85"),
+        decreasing=dict(line=dict(color="#F6465D"), fillcolor="#F6465D"),
+    ))
+    fig.update_layout(
+        template="plotly_dark",
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=40, r=20, t=10, b=30),
+        height=380,
+        xaxis=dict(showgrid=False, rangeslider=dict(visible=False),
+                   tickfont=dict(size=11, color="#848E9C", family="Inter")),
+        yaxis=dict(showgrid=True, gridcolor='#2B3139', griddash='dot', side='right',
+                   tickfont=dict(size=11, color="#848E9C", family="Inter")),
+        showlegend=False,
+    )
+    return fig
@@ -0,0 +1,63 @@
+# ui/pnl.py
+import time
+import streamlit as st
+from services.ledger import pnl_breakdown, sync_error
+from services.timeseries import KST_OFFSET
+from utils.markup import HtmlTemplate, memo_markup, emit_html
+
+PERIOD_DAYS = 30            # 집계 기간 (bill 장부 기준)
+MODES = {"심볼별": "symbol", "일별": "day"}
+
+_EMPTY = HtmlTemplate("<div style='padding:40px; text-align:center; color:#525252; font-size:0.85rem;'>{text}</div>")
+
+_PNL_HEADER = HtmlTemplate("""
+    <div class="dashboard-card" style="padding:0; overflow:hidden; min-height:200px;">
+        <div class="table-header">
+            <div style="flex:1.2;">{key_label}</div>
+            <div style="flex:1.2; text-align:right;">실현 손익</div>
+            <div style="flex:1; text-align:right;">수수료</div>
+            <div style="flex:1; text-align:right;">펀딩비</div>
+            <div style="flex:1.2; text-align:right;">순손익</div>
+        </div>
+    """)
+
+_PNL_ROW = HtmlTemplate("""
+        <div class="table-row">
+            <div style="flex:1.2;"><span style="font-weight:600; font-size:0.9rem; color:var(--text-primary);">{key}</span></div>
+            <div style="flex:1.2; text-align:right;"><span class="text-mono {pnl_cls}">${pnl:+,.2f}</span></div>
+            <div style="flex:1; text-align:right;"><span class="text-mono" style="color:var(--text-secondary);">${fees:+,.2f}</span></div>
+            <div style="flex:1; text-align:right;"><span class="text-mono" style="color:var(--text-secondary);">${funding:+,.2f}</span></div>
+            <div style="flex:1.2; text-align:right;"><span class="text-mono {net_cls}" style="font-weight:600;">${net:+,.2f}</span></div>
+        </div>
+        """)
+
+_PNL_FOOTER = HtmlTemplate("""<div style="padding:12px 20px; background:#141414; border-top:1px solid var(--border-color); text-align:right; font-size:0.75rem; color:var(--text-tertiary);">최근 {days}일 합계 · 실현 <span class="text-mono {pnl_cls}">${pnl:+,.2f}</span> · 수수료 <span class="text-mono">${fees:+,.2f}</span> · 펀딩 <span class="text-mono">${funding:+,.2f}</span> · 순손익 <span class="text-mono {net_cls}">${net:+,.2f}</span></div></div>""")
+
+def _cls(v):
+    return "text-up" if v >= 0 else "text-down"
+
+def render_pnl_breakdown():
+    """bill 장부(services.ledger) 기준 실현 손익 / 수수료 / 펀딩 집계 (API 호출 없이 SQLite 집계만)"""
+    mode = st.radio("집계", list(MODES), key="pnl_mode", horizontal=True, label_visibility="collapsed")
+    by = MODES[mode]
+    # KST 날짜 단위로 창을 고정 (일별 집계 키와 같은 기준, 같은 날에는 같은 model -> 마크업 재사용)
+    day = int((time.time() + KST_OFFSET) // 86400)
+    start_ms = int(((day - PERIOD_DAYS + 1) * 86400 - KST_OFFSET) * 1000)
+    df = pnl_breakdown(by, start_ms=start_ms)
+    header = _PNL_HEADER.render(key_label="심볼" if by == "symbol" else "날짜 (KST)")
+    if df.empty:
+        err = sync_error()
+        emit_html(st, header + "\n" + _EMPTY.render(text="bill 장부가 비어 있습니다" + (f" ({err})" if err else "")) + "</div>")
+        return
+    # 심볼별은 순손익 절댓값 큰 순, 일별은 최근 날짜부터
+    df = df.reindex(df["net"].abs().sort_values(ascending=False).index) if by == "symbol" else df.iloc[::-1]
+    model = (by, day, tuple(df.itertuples(index=False, name=None)))
+    emit_html(st, memo_markup("pnl_breakdown", model, lambda: _pnl_html(header, df)))
+
+def _pnl_html(header, df):
+    rows = [dict(key=key or "-", pnl=pnl, fees=fees, funding=funding, net=net, pnl_cls=_cls(pnl), net_cls=_cls(net))
+            for key, pnl, fees, funding, net in df.itertuples(index=False, name=None)]
+    total = df[["realized_pnl", "fees", "funding", "net"]].sum()
+    footer = _PNL_FOOTER.render(days=PERIOD_DAYS, pnl=total["realized_pnl"], fees=total["fees"], funding=total["funding"],
+                                net=total["net"], pnl_cls=_cls(total["realized_pnl"]), net_cls=_cls(total["net"]))
+    return header + "\n" + _PNL_ROW.render_many(rows) + footer
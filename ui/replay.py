@@ -0,0 +1,51 @@
+# ui/replay.py
+from datetime import datetime, timedelta
+import streamlit as st
+from services.replay import KST, neighbor
+from services.snaplog import bounds, MIN_INTERVAL
+
+def _to_dt(ts):
+    # 슬라이더는 tz 없는 KST 시각으로 표시
+    return datetime.fromtimestamp(ts, tz=KST).replace(tzinfo=None)
+
+def _to_ts(dt):
+    return dt.replace(tzinfo=KST).timestamp()
+
+def _step(step):
+    """◀/▶: 슬라이더 값을 바로 옆 스냅샷 시각으로 이동 (위젯이 그려지기 전 콜백에서 변경)"""
+    target = neighbor(_to_ts(st.session_state["replay_at"]), step)
+    if target is not None:
+        st.session_state["replay_at"] = _to_dt(target)
+
+def render_replay_bar():
+    """
+    재현 시점 선택 바 (?replay=1)
+    Returns: 선택한 시각(ts) 또는 None (기록된 스냅샷 없음)
+    """
+    span = bounds()
+    if span is None:
+        st.info("기록된 스냅샷이 없습니다. 대시보드나 collector.py가 동작하는 동안 자동으로 쌓입니다.")
+        return None
+    first, last = _to_dt(span[0]), _to_dt(span[1])
+    if first == last:
+        last = first + timedelta(seconds=1)
+    # 범위 밖 값(보관 기간 정리 등)은 가장 최근 시각으로
+    current = st.session_state.get("replay_at")
+    if current is None or not first <= current <= last:
+        st.session_state["replay_at"] = last
+
+    c_prev, c_slider, c_next = st.columns([0.06, 0.88, 0.06], vertical_alignment="bottom")
+    with c_prev:
+        st.button("◀", key="replay_prev", on_click=_step, args=(-1,), help="이전 스냅샷")
+    with c_slider:
+        at = st.slider("재현 시각 (KST)", min_value=first, max_value=last, step=timedelta(seconds=int(MIN_INTERVAL)),
+                       format="YYYY-MM-DD HH:mm:ss", key="replay_at")
+    with c_next:
+        st.button("▶", key="replay_next", on_click=_step, args=(1,), help="다음 스냅샷")
+    return _to_ts(at)
+
+def render_replay_caption(frame):
+    """실제로 그려진 스냅샷 시각 (요청 시각 이하 중 가장 최근)"""
+    shown = _to_dt(frame.snapshot.fetched_at)
+    gap = frame.at - frame.snapshot.fetched_at
+    st.caption(f"재현 모드 · 스냅샷 {shown:%Y-%m-%d %H:%M:%S} KST" + (f" ({gap:,.0f}초 전 기록)" if gap >= 1 else ""))
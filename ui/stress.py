@@ -0,0 +1,134 @@
+# ui/stress.py
+import numpy as np
+import streamlit as st
+from services.stress import build_book, shock_grid, uniform_shocks, run_scenarios, run_per_symbol, liquidation_ladder, monte_carlo
+from utils.markup import HtmlTemplate, emit_html
+
+TABLE_STEP = 0.05           # 표에 보여줄 충격 간격 (계산은 1% 간격 전체)
+LADDER_ROWS = 8             # 청산 임박 포지션 표시 개수
+MC_SCENARIOS = 5000         # 상관 충격 시나리오 수
+MODES = ["일괄 충격", "심볼별 충격", "상관 충격"]
+
+_EMPTY = HtmlTemplate("<div style='padding:40px; text-align:center; color:#525252; font-size:0.85rem;'>{text}</div>")
+
+_SCENARIO_HEADER = HtmlTemplate("""
+    <div class="dashboard-card" style="padding:0; overflow:hidden;">
+        <div class="table-header">
+            <div style="flex:0.8;">가격 변동</div>
+            <div style="flex:1.4; text-align:right;">자산 (USDT)</div>
+            <div style="flex:1.4; text-align:right;">손익 변화</div>
+            <div style="flex:1.1; text-align:right;">증거금 비율</div>
+            <div style="flex:0.8; text-align:right;">청산</div>
+        </div>
+    """).source
+
+_SCENARIO_ROW = HtmlTemplate("""
+        <div class="table-row">
+            <div style="flex:0.8;"><span class="text-mono {shock_cls}">{shock:+.0f}%</span></div>
+            <div style="flex:1.4; text-align:right;"><span class="text-mono" style="color:var(--text-primary);">${equity:,.2f}</span></div>
+            <div style="flex:1.4; text-align:right;"><span class="text-mono {pnl_cls}">${pnl:+,.2f}</span></div>
+            <div style="flex:1.1; text-align:right;"><span class="text-mono">{ratio_text}</span></div>
+            <div style="flex:0.8; text-align:right;"><span class="text-mono" style="color:{liq_color};">{n_liq}</span></div>
+        </div>
+        """)
+
+_LADDER_HEADER = HtmlTemplate("""
+    <div class="dashboard-card" style="padding:0; overflow:hidden;">
+        <div class="table-header">
+            <div style="flex:1;">청산 임박</div>
+            <div style="flex:0.6; text-align:center;">포지션</div>
+            <div style="flex:1.2; text-align:right;">명목 가치</div>
+            <div style="flex:1; text-align:right;">청산까지</div>
+        </div>
+    """).source
+
+_LADDER_ROW = HtmlTemplate("""
+        <div class="table-row">
+            <div style="flex:1;">
+                <div style="font-weight:600; font-size:0.9rem; color:var(--text-primary);">{sym}</div>
+                <div class="label" style="margin-top:2px;">{account}</div>
+            </div>
+            <div style="flex:0.6; text-align:center;"><span class="badge {badge}">{side}</span></div>
+            <div style="flex:1.2; text-align:right;"><span class="text-mono">${notional:,.0f}</span></div>
+            <div style="flex:1; text-align:right;"><span class="text-mono" style="color:#e0a040;">{dist:+.2f}%</span></div>
+        </div>
+        """)
+
+_MC_SUMMARY = HtmlTemplate("""
+    <div class="dashboard-card" style="padding:20px 24px;">
+        <div class="flex-between"><span class="label">시나리오</span><span class="text-mono">{n:,}회 · 변동성 {vol:.0f}% · 상관 {corr:.2f}</span></div>
+        <div class="flex-between" style="margin-top:10px;"><span class="label">자산 1% / 5% / 50% 분위</span>
+            <span class="text-mono">${p1:,.0f} / ${p5:,.0f} / ${p50:,.0f}</span></div>
+        <div class="flex-between" style="margin-top:10px;"><span class="label">최악 손익</span><span class="text-mono text-down">${worst:+,.2f}</span></div>
+        <div class="flex-between" style="margin-top:10px;"><span class="label">청산 발생 확률</span><span class="text-mono">{p_liq:.1f}%</span></div>
+        <div class="flex-between" style="margin-top:10px;"><span class="label">평균 청산 포지션 수</span><span class="text-mono">{mean_liq:.1f}</span></div>
+        <div class="flex-between" style="margin-top:10px;"><span class="label">자산 소진 확률</span><span class="text-mono">{p_wipe:.2f}%</span></div>
+    </div>
+    """)
+
+def render_stress(positions, equity):
+    """현재 포지션 기준 가격 충격 시나리오 (계산은 services.stress, 여기서는 표시만)"""
+    if positions.empty:
+        emit_html(st, _SCENARIO_HEADER + "\n" + _EMPTY.render(text="No open positions") + "</div>")
+        return
+    book = build_book(positions)
+
+    c_mode, c_opt = st.columns([0.4, 0.6], vertical_alignment="center")
+    with c_mode:
+        mode = st.radio("시나리오", MODES, key="stress_mode", horizontal=True, label_visibility="collapsed")
+
+    c_main, c_side = st.columns([3, 2])
+    if mode == "일괄 충격":
+        result = run_scenarios(book, equity, uniform_shocks(len(book.symbols)))
+        with c_main:
+            _render_scenarios(shock_grid(), result.equity, result.pnl, result.margin_ratio_pct, result.n_liquidated)
+    elif mode == "심볼별 충격":
+        # 명목 가치가 큰 심볼부터
+        order = positions.groupby("symbol")["notional"].sum().sort_values(ascending=False).index.tolist()
+        with c_opt:
+            symbol = st.selectbox("심볼", order, key="stress_symbol", label_visibility="collapsed")
+        grid = run_per_symbol(book, equity)
+        k = book.symbols.index(symbol)
+        with c_main:
+            _render_scenarios(grid.grid, grid.equity[k], grid.pnl[k], grid.margin_ratio_pct[k], grid.n_liquidated[k])
+    else:
+        with c_opt:
+            c_vol, c_corr = st.columns(2)
+            vol = c_vol.slider("변동성 (%)", 1, 50, 10, key="stress_vol")
+            corr = c_corr.slider("상관계수", 0.0, 1.0, 0.7, 0.05, key="stress_corr")
+        summary = monte_carlo(book, equity, vol=vol / 100, corr=corr, n_scenarios=MC_SCENARIOS)
+        with c_main:
+            emit_html(st, _MC_SUMMARY.render(
+                n=MC_SCENARIOS, vol=vol, corr=corr, p1=summary["equity_p1"], p5=summary["equity_p5"], p50=summary["equity_p50"],
+                worst=summary["worst_pnl"], p_liq=summary["prob_any_liquidation"] * 100,
+                mean_liq=summary["mean_liquidated"], p_wipe=summary["prob_equity_wipeout"] * 100,
+            ))
+    with c_side:
+        _render_ladder(positions, book)
+
+def _render_scenarios(grid, equity, pnl, ratio, n_liq):
+    # 1% 간격 중 TABLE_STEP 배수만 표시 (정수 bp로 비교해 부동소수 오차 회피)
+    show = np.flatnonzero(np.round(grid * 10000).astype(np.int64) % int(round(TABLE_STEP * 10000)) == 0)
+    rows = [dict(
+        shock=grid[i] * 100, shock_cls="text-up" if grid[i] > 0 else ("text-down" if grid[i] < 0 else ""),
+        equity=equity[i], pnl=pnl[i], pnl_cls="text-up" if pnl[i] >= 0 else "text-down",
+        ratio_text="자산 소진" if not np.isfinite(ratio[i]) else f"{ratio[i]:.1f}%",
+        n_liq=int(n_liq[i]), liq_color="var(--color-down)" if n_liq[i] else "var(--text-tertiary)",
+    ) for i in show]
+    emit_html(st, _SCENARIO_HEADER + "\n" + _SCENARIO_ROW.render_many(rows) + "</div>")
+
+    # 처음 청산이 생기는 충격 (하락/상승 각각)
+    hit = np.flatnonzero(n_liq > 0)
+    down = [grid[i] for i in hit if grid[i] < 0]
+    up = [grid[i] for i in hit if grid[i] > 0]
+    parts = [f"하락 {max(down) * 100:+.0f}%" if down else None, f"상승 {min(up) * 100:+.0f}%" if up else None]
+    st.caption("첫 청산: " + (" / ".join(p for p in parts if p) or "범위 내 없음"))
+
+def _render_ladder(positions, book):
+    ladder = liquidation_ladder(positions, book).head(LADDER_ROWS)
+    if ladder.empty:
+        emit_html(st, _LADDER_HEADER + "\n" + _EMPTY.render(text="청산가 정보 없음") + "</div>")
+        return
+    rows = [dict(sym=r.symbol, account=r.account, side=r.side or "LONG", badge="badge-down" if r.side == "SHORT" else "badge-up",
+                 notional=r.notional, dist=r.liq_shock_pct) for r in ladder.itertuples()]
+    emit_html(st, _LADDER_HEADER + "\n" + _LADDER_ROW.render_many(rows) + "</div>")
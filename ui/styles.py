@@ -1,247 +1,41 @@
 # ui/styles.py
-def inject(st):
-    st.markdown("""
-<style>
-/* 폰트 설정 */
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&family=JetBrains+Mono:wght@400;500;600;700&display=swap');
-
-:root {
-    --bg-app: #0f0f0f;
-    --bg-card: #141414;
-    --bg-hover: #1f1f1f;
-    --border-color: #262626;
-
-    --text-primary: #f5f5f5;
-    --text-secondary: #a3a3a3;
-    --text-tertiary: #525252;
-
-    --color-up: #3dd995;
-    --color-down: #ff4d4d;
-
-    --font-base: 'Inter', sans-serif;
-    --font-mono: 'JetBrains Mono', monospace;
-
-    --radius-md: 8px;
-}
-
-html, body, .stApp {
-    background-color: var(--bg-app) !important;
-    font-family: var(--font-base);
-    color: var(--text-primary);
-    letter-spacing: -0.01em;
-}
-
-/* 레이아웃 폭 고정 + 중앙정렬 */
-.main .block-container {
-    max-width: 1278px !important;
-    padding-top: 2rem !important;
-    padding-bottom: 3rem !important;
-    padding-left: 1rem !important;
-    padding-right: 1rem !important;
-    margin: auto;
-}
-
-/* 기본 헤더 숨김 */
-header[data-testid="stHeader"] { display: none; }
-
-/* gap 0은 겹침/클리핑 유발 가능 → 최소 간격 */
-div[data-testid="stVerticalBlock"] { gap: 1.0rem; }
-
-/* 카드 */
-.dashboard-card {
-    background-color: var(--bg-card);
-    border: 1px solid var(--border-color);
-    border-radius: var(--radius-md);
-}
-
-/* 텍스트 유틸 */
-.flex-between { display: flex; justify-content: space-between; align-items: center; }
-.label { font-size: 0.75rem; color: var(--text-secondary); font-weight: 500; }
-.value-xl { font-family: var(--font-mono); font-size: 1.5rem; font-weight: 700; color: var(--text-primary); letter-spacing: -0.03em; }
-.text-mono { font-family: var(--font-mono); }
-.text-up { color: var(--color-up) !important; }
-.text-down { color: var(--color-down) !important; }
-
-/* 뱃지 */
-.badge {
-    padding: 2px 8px;
-    border-radius: 9999px;
-    font-size: 0.7rem;
-    font-weight: 600;
-}
-.badge-neutral { background: #262626; color: #a3a3a3; }
-.badge-up { background: rgba(61, 217, 149, 0.1); color: var(--color-up); }
-.badge-down { background: rgba(255, 77, 77, 0.1); color: var(--color-down); }
-
-/* 프로그레스 */
-.progress-bg {
-    width: 100%;
-    height: 6px;
-    background: #1a1a1a;
-    border-radius: 3px;
-    overflow: hidden;
-    margin-top: 8px;
-}
-.progress-fill { height: 100%; }
-
-/* 테이블 */
-.table-header {
-    display: flex;
-    padding: 12px 20px;
-    border-bottom: 1px solid var(--border-color);
-    font-size: 0.75rem;
-    color: var(--text-secondary);
-    font-weight: 500;
-}
-.table-row {
-    display: flex;
-    padding: 14px 20px;
-    align-items: center;
-    border-bottom: 1px solid var(--border-color);
-    transition: background 0.1s;
-}
-.table-row:last-child { border-bottom: none; }
-.table-row:hover { background-color: var(--bg-hover); }
-
-/* 탭 */
-div[data-testid="stTabs"] { gap: 0px; }
-div[data-testid="stTabs"] button {
-    font-size: 0.85rem;
-    color: var(--text-secondary);
-    background: transparent;
-    border: none;
-    padding: 10px 20px;
-    font-weight: 500;
-    transition: color 0.2s;
-}
-div[data-testid="stTabs"] button:hover { color: var(--text-primary); }
-div[data-testid="stTabs"] button[aria-selected="true"] {
-    color: var(--text-primary) !important;
-    border-bottom: 2px solid var(--color-up) !important;
-}
-
-/* ✅ Tabs 안에서 panel overflow로 잘리는 케이스 방지 (1번만) */
-div[data-testid="stTabs"] [role="tabpanel"] { overflow: visible !important; }
+import hashlib
+import os
+import re
+from functools import lru_cache
+
+# Streamlit 정적 파일 서빙(.streamlit/config.toml의 enableStaticServing) 경로
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+STYLESHEET = "hyperdash.css"
+
+@lru_cache(maxsize=1)
+def _bundle():
+    """
+    Returns: (css, fingerprint)
+    프로세스당 한 번만 읽고 해시 (파일을 고치면 재시작 후 새 ?v= 로 캐시 무효화)
+    """
+    with open(os.path.join(STATIC_DIR, STYLESHEET), encoding="utf-8") as f:
+        css = f.read()
+    return css, hashlib.sha256(css.encode()).hexdigest()[:8]
+
+# 정적 서빙이 꺼져 있을 때 CSS에서 걷어낼 폰트 파일 참조 (local()/시스템 폰트만 남김)
+_FONT_URL = re.compile(r",\s*url\('fonts/[^']+'\)\s*format\('woff2'\)")
+
+def _static_url(base_path: str, name: str) -> str:
+    """server.baseUrlPath 아래의 정적 파일 절대 경로 (페이지 URL 모양과 무관하게 같은 곳을 가리킴)"""
+    base = base_path.strip("/")
+    return f"/{base}/app/static/{name}" if base else f"/app/static/{name}"
+
+@lru_cache(maxsize=4)
+def _tag(static_serving: bool, base_path: str = "") -> str:
+    css, fingerprint = _bundle()
+    if static_serving:
+        # 매 실행마다 보내는 건 한 줄짜리 import뿐, 본문은 브라우저가 캐시
+        # CSS 안의 url('fonts/...')는 CSS 파일 위치 기준이라 app/static/fonts/ 로 풀림
+        return f'<style>@import url("{_static_url(base_path, STYLESHEET)}?v={fingerprint}");</style>'
+    # 정적 서빙이 꺼져 있으면 예전처럼 인라인으로 보냄 (static/fonts/*.woff2를 받을 경로가 없으므로 설치된 폰트/시스템 폰트만 사용)
+    return f"<style>\n{_FONT_URL.sub('', css)}</style>"
 
-/* =========================
-   PnL Chart Card
-   ========================= */
-.chart-card{
-  padding: 0; /* 카드 자체 패딩 제거 -> 영역을 헤더/바디가 담당 */
-}
-
-/* 헤더 */
-.chart-head{
-  padding: 14px 16px 12px 16px;  /* ✅ 모서리 붙는 느낌 제거 */
-  border-bottom: 1px solid rgba(38,38,38,0.55); /* ✅ 선을 조금 연하게 */
-  margin: 0; /* ✅ 불필요한 간격 제거 */
-}
-
-.chart-head-grid{
-  display: grid;
-  grid-template-columns: 1fr auto;
-  align-items: center;  /* ✅ 수직 정렬 안정화 */
-  column-gap: 12px;
-}
-
-.chart-left{
-  display:flex;
-  gap:10px;
-  align-items:center;
-}
-
-.chart-title{
-  font-size:0.95rem;
-  font-weight:600;
-  color: var(--text-primary);
-  line-height: 1.2;
-}
-
-.chart-badge{
-  background:#262626;
-  color:#8a8a8a;
-  padding:2px 8px;
-  border-radius:999px;
-  font-size:0.7rem;
-  font-weight:600;
-}
-
-.chart-right{ text-align:right; }
-
-.chart-label{
-  font-size:0.75rem;
-  color:#8a8a8a;
-  margin-bottom:2px;
-  font-weight:500;
-}
-
-.chart-pnl{
-  font-family: var(--font-mono);
-  font-weight:700;
-  font-size:1.1rem;
-  letter-spacing:-0.5px;
-  line-height: 1.15;
-  display:flex;
-  justify-content:flex-end;
-  gap:8px;
-  flex-wrap:wrap;
-}
-
-.chart-krw{
-  font-size:0.85rem;
-  color:#8a8a8a;
-  font-weight:500;
-}
-
-/* ✅ 차트 영역에 “카드 안쪽 여백” 만들기 */
-.chart-card div[data-testid="stPlotlyChart"],
-.chart-card .stPlotlyChart{
-  padding: 10px 12px 12px 12px;  /* ✅ 차트가 너무 꽉 차 보이는 문제 해결 */
-  min-height: 300px !important;
-}
-
-.chart-card div[data-testid="stPlotlyChart"] > div,
-.chart-card .stPlotlyChart > div{
-  border-radius: 10px;
-  overflow: hidden; /* ✅ 라운딩에 맞춰 깔끔하게 클리핑 */
-}
-
-/* Plotly 내부 렌더 케이스별 높이 보장 */
-.chart-card .js-plotly-plot,
-.chart-card .plot-container,
-.chart-card .svg-container,
-.chart-card iframe{
-  min-height: 300px !important;
-}
-
-/* 라디오 버튼을 탭/버튼 스타일로 변경 */
-div[role="radiogroup"] {
-    background-color: #141414;
-    padding: 4px;
-    border-radius: 8px;
-    display: inline-flex;
-    gap: 0px;
-}
-
-div[role="radiogroup"] label {
-    background-color: transparent;
-    border: none;
-    margin-right: 0px !important;
-    padding: 4px 12px;
-    border-radius: 6px;
-    transition: all 0.2s;
-}
-
-/* 선택된 항목 스타일 */
-div[role="radiogroup"] label[data-checked="true"] {
-    background-color: #262626 !important;
-    color: #3dd995 !important; /* Mint Color */
-    font-weight: 600;
-}
-
-/* 텍스트 크기 조정 */
-div[role="radiogroup"] p {
-    font-size: 0.8rem;
-}
-</style>
-""", unsafe_allow_html=True)
+def inject(st):
+    st.markdown(_tag(bool(st.get_option("server.enableStaticServing")), st.get_option("server.baseUrlPath") or ""),
+                unsafe_allow_html=True)
@@ -1,19 +1,21 @@
 # ui/table.py
+import math
 import streamlit as st
-from utils.format import render_html, normalize_symbol, fnum, safe_pct
+from services.positions import view_positions
+from ui.stress import render_stress
+from ui.fund import render_nav_history, render_fund_admin
+from ui.pnl import render_pnl_breakdown
+from ui.market import render_market_chart
+from utils.markup import HtmlTemplate, memo_markup, memo_rows, emit_html
 
-def render_bottom_section(st, positions, nav_data, usdt_rate=None):
-    st.markdown('<div style="margin-top:24px;"></div>', unsafe_allow_html=True)
-    
-    tab1, tab2, tab3 = st.tabs(["보유 포지션", "투자자 현황", "주문 내역"])
-    
-    with tab1: _render_positions(positions)
-    # [수정] usdt_rate 전달
-    with tab2: _render_investors(nav_data, usdt_rate)
-    with tab3: st.info("대기 중인 주문이 없습니다.")
+PAGE_SIZE = 25  # 한 번에 그리는 포지션 행 수 (나머지는 페이지 이동으로)
+SORT_OPTIONS = {"명목 가치": "notional", "미실현 손익": "upl", "ROE": "roe", "청산 거리": "liq_dist_pct"}
 
-def _render_positions(positions):
-    header = """
+# 템플릿은 모듈 로드 시 한 번만 정리 (행은 값이 바뀐 것만 다시 만듦)
+_EMPTY = HtmlTemplate("<div style='padding:40px; text-align:center; color:#525252; font-size:0.85rem;'>{text}</div>")
+_KRW_SUB = HtmlTemplate("<div style='font-size:0.75rem; color:#525252; margin-top:2px;'>≈₩{krw:,.0f}</div>")
+
+_POSITIONS_HEADER = HtmlTemplate("""
     <div class="dashboard-card" style="padding:0; overflow:hidden; min-height:200px;">
         <div class="table-header">
             <div style="flex:1;">자산</div>
@@ -24,30 +26,13 @@ def _render_positions(positions):
             <div style="flex:1.1; text-align:right;">시장가</div>
             <div style="flex:1.1; text-align:right;">청산</div>
         </div>
-    """
-    rows = ""
-    if not positions: rows = "<div style='padding:40px; text-align:center; color:#525252; font-size:0.85rem;'>No open positions</div>"
-    
-    for p in positions:
-        sym = normalize_symbol(p.get("symbol"))
-        side = str(p.get("holdSide", "")).upper()
-        lev = fnum(p.get("leverage"))
-        upl = fnum(p.get("unrealizedPL"))
-        margin = fnum(p.get("marginSize"))
-        entry = fnum(p.get("averageOpenPrice"))
-        mark = fnum(p.get("markPrice"))
-        liq = fnum(p.get("liquidationPrice"))
-        val = margin * lev
-        roe = safe_pct(upl, margin)
-        pnl_cls = "text-up" if upl >= 0 else "text-down"
-        badge = "badge-up" if side != "SHORT" else "badge-down"
-        side_text = side if side else "LONG"
-
-        rows += f"""
+    """).source
+
+_POSITION_ROW = HtmlTemplate("""
         <div class="table-row">
             <div style="flex:1;">
                 <div style="font-weight:600; font-size:0.9rem; color:var(--text-primary);">{sym}</div>
-                <div class="label" style="margin-top:2px;">{lev:.0f}x</div>
+                <div class="label" style="margin-top:2px;">{lev:.0f}x{account}</div>
             </div>
             <div style="flex:0.6; text-align:center;">
                 <span class="badge {badge}">{side_text}</span>
@@ -63,15 +48,38 @@ def _render_positions(positions):
             <div style="flex:1.1; text-align:right;"><span class="text-mono" style="font-size:0.9rem;">${mark:,.1f}</span></div>
             <div style="flex:1.1; text-align:right;"><span class="text-mono" style="color:#e0a040; font-size:0.9rem;">${liq:,.1f}</span></div>
         </div>
-        """
-    render_html(st, header + rows + "</div>")
+        """)
 
-def _render_investors(nav_data, usdt_rate=None):
-    investors = nav_data.get("investors", {})
-    current_nav = nav_data.get("nav", 1.0)
-    total_units = nav_data.get("total_units", 1.0)
-    
-    header = """
+_PAGE_FOOTER = HtmlTemplate("""<div style="padding:10px 20px; border-top:1px solid var(--border-color); text-align:right; font-size:0.75rem; color:var(--text-tertiary);">{start}–{end} / {total} · {page}/{n_pages} 페이지</div>""")
+
+_ACCOUNTS_HEADER = HtmlTemplate("""
+    <div class="dashboard-card" style="padding:0; overflow:hidden; min-height:200px;">
+        <div class="table-header">
+            <div style="flex:1.2;">계정</div>
+            <div style="flex:1.2;">상품</div>
+            <div style="flex:1.4; text-align:right;">자산 (USDT)</div>
+            <div style="flex:1.2; text-align:right;">가용</div>
+            <div style="flex:1.2; text-align:right;">미실현 손익</div>
+            <div style="flex:0.6; text-align:right;">포지션</div>
+        </div>
+    """).source
+
+_ACCOUNT_ROW = HtmlTemplate("""
+        <div class="table-row">
+            <div style="flex:1.2; font-weight:600; font-size:0.9rem; color:var(--text-primary);">{name}</div>
+            <div style="flex:1.2;"><span class="badge badge-neutral">{pt}</span></div>
+            <div style="flex:1.4; text-align:right;">
+                <div class="text-mono" style="color:var(--text-primary);">${equity:,.2f}</div>
+                <div class="label" style="margin-top:2px;">{share:.1f}%</div>
+                {krw_html}
+            </div>
+            <div style="flex:1.2; text-align:right;"><span class="text-mono" style="color:var(--text-secondary);">${available:,.2f}</span></div>
+            <div style="flex:1.2; text-align:right;"><span class="text-mono {pnl_cls}">{upl_text}</span></div>
+            <div style="flex:0.6; text-align:right;"><span class="text-mono">{count_text}</span></div>
+        </div>
+        """)
+
+_INVESTORS_HEADER = HtmlTemplate("""
     <div class="dashboard-card" style="padding:0; overflow:hidden; min-height:200px;">
         <div class="table-header">
             <div style="flex:1.5;">투자자</div>
@@ -79,20 +87,9 @@ def _render_investors(nav_data, usdt_rate=None):
             <div style="flex:1.2; text-align:right;">지분율</div>
             <div style="flex:1.5; text-align:right;">평가액 (USDT)</div>
         </div>
-    """
-    rows = ""
-    for name, units in sorted(investors.items(), key=lambda x: x[1], reverse=True):
-        pct = (units / total_units * 100) if total_units else 0
-        val_usd = units * current_nav
-        initial = name.split()[-1][0] if " " in name else name[0]
-        
-        # [추가] KRW 표시
-        krw_html = ""
-        if usdt_rate:
-            val_krw = val_usd * usdt_rate
-            krw_html = f"<div style='font-size:0.75rem; color:#525252; margin-top:2px;'>≈₩{val_krw:,.0f}</div>"
-        
-        rows += f"""
+    """).source
+
+_INVESTOR_ROW = HtmlTemplate("""
         <div class="table-row">
             <div style="flex:1.5; display:flex; align-items:center; gap:12px;">
                 <div style="width:24px; height:24px; background:#1f1f1f; border:1px solid #333; border-radius:50%; display:flex; align-items:center; justify-content:center; font-size:0.7rem; font-weight:600; color:#fff;">{initial}</div>
@@ -105,6 +102,136 @@ def _render_investors(nav_data, usdt_rate=None):
                 {krw_html}
             </div>
         </div>
-        """
-    footer = f"""<div style="padding:12px 20px; background:#141414; border-top:1px solid var(--border-color); text-align:right; font-size:0.75rem; color:var(--text-tertiary);">현재 NAV: <span class="text-mono" style="color:#fff;">${current_nav:,.4f}</span></div></div>"""
-    render_html(st, header + rows + footer)
+        """)
+
+_INVESTORS_FOOTER = HtmlTemplate("""<div style="padding:12px 20px; background:#141414; border-top:1px solid var(--border-color); text-align:right; font-size:0.75rem; color:var(--text-tertiary);">현재 NAV: <span class="text-mono" style="color:#fff;">${nav:,.4f}</span>{hwm_html}</div></div>""")
+
+def render_bottom_section(st, positions, nav_data, usdt_rate=None, breakdown=(), equity=0.0, history_df=None, fund_admin=False,
+                          market=False):
+    st.markdown('<div style="margin-top:24px;"></div>', unsafe_allow_html=True)
+
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["보유 포지션", "계정별", "스트레스", "손익 분석", "투자자 현황", "시세", "주문 내역"])
+
+    with tab1: _render_positions(positions)
+    with tab2: _render_accounts(breakdown, positions, usdt_rate)
+    with tab3: render_stress(positions, equity)
+    with tab4: render_pnl_breakdown()
+    # [수정] usdt_rate 전달
+    with tab5:
+        _render_investors(nav_data, usdt_rate)
+        render_nav_history(history_df, nav_data.get("investors", {}))
+        # 입출금 기록은 라이브 화면에서만 (재현 모드는 읽기 전용)
+        if fund_admin:
+            render_fund_admin(equity, nav_data.get("investors", {}))
+    with tab6:
+        # 캔들은 로컬 저장소에서 읽고 tail만 거래소에 요청 (재현 모드는 네트워크를 쓰지 않으므로 생략)
+        if market:
+            render_market_chart(positions)
+        else:
+            st.info("재현 모드에서는 시세 차트를 표시하지 않습니다.")
+    with tab7: st.info("대기 중인 주문이 없습니다.")
+
+def _position_row(row):
+    sym, side, lev, upl, entry, mark, liq, val, roe, account = row
+    pnl_cls = "text-up" if upl >= 0 else "text-down"
+    return _POSITION_ROW.render(
+        sym=sym, lev=lev, account=account, val=val, upl=upl, roe=roe, entry=entry, mark=mark, liq=liq,
+        pnl_cls=pnl_cls, badge="badge-up" if side != "SHORT" else "badge-down", side_text=side if side else "LONG",
+    )
+
+def _render_positions(positions):
+    if positions.empty:
+        emit_html(st, _POSITIONS_HEADER + "\n" + _EMPTY.render(text="No open positions") + "</div>")
+        return
+
+    # 정렬/필터/페이지는 서버에서 처리하고 보이는 행만 전송 (위젯 상태는 세션별)
+    c_query, c_sort, c_desc, c_page = st.columns([0.34, 0.26, 0.16, 0.24], vertical_alignment="center")
+    with c_query:
+        query = st.text_input("심볼/계정 검색", key="pos_query", placeholder="심볼 또는 계정 검색",
+                              label_visibility="collapsed")
+    with c_sort:
+        sort_label = st.selectbox("정렬", list(SORT_OPTIONS), key="pos_sort", label_visibility="collapsed")
+    with c_desc:
+        # 청산 거리는 가까운 순(오름차순)이 기본
+        descending = st.toggle("내림차순", value=SORT_OPTIONS[sort_label] != "liq_dist_pct", key=f"pos_desc_{sort_label}")
+
+    sort_by = SORT_OPTIONS[sort_label]
+    _, total = view_positions(positions, sort_by, descending, query, 0, 0)
+    n_pages = max(1, math.ceil(total / PAGE_SIZE))
+    if st.session_state.get("pos_page", 1) > n_pages:
+        st.session_state["pos_page"] = n_pages
+    with c_page:
+        page = st.number_input("페이지", min_value=1, max_value=n_pages, step=1, key="pos_page",
+                               label_visibility="collapsed")
+    offset = (int(page) - 1) * PAGE_SIZE
+    page_df, _ = view_positions(positions, sort_by, descending, query, offset, PAGE_SIZE)
+
+    # 계정이 2개 이상일 때만 계정명을 표시
+    multi_account = positions["account"].nunique() > 1
+    accounts = [" · " + a for a in page_df["account"].tolist()] if multi_account else [""] * len(page_df)
+    # 컬럼 단위로 꺼내 행 tuple을 만들고, 이전 틱과 같은 행은 캐시된 마크업을 재사용
+    cols = [page_df[c].tolist() for c in ("symbol", "side", "leverage", "upl", "entry", "mark", "liq", "notional", "roe")]
+    rows = memo_rows("positions", zip(*cols, accounts), _position_row)
+    if not total:
+        rows = _EMPTY.render(text="No matching positions")
+    footer = ""
+    if total > PAGE_SIZE or query:
+        footer = _PAGE_FOOTER.render(start=offset + 1 if total else 0, end=min(offset + PAGE_SIZE, total), total=total,
+                                     page=int(page), n_pages=n_pages)
+    emit_html(st, _POSITIONS_HEADER + "\n" + rows + footer + "</div>")
+
+def _render_accounts(breakdown, positions, usdt_rate=None):
+    """계정/상품별 드릴다운 (자산은 breakdown, 손익/포지션 수는 포지션 프레임에서 집계)"""
+    if not breakdown:
+        emit_html(st, _ACCOUNTS_HEADER + "\n" + _EMPTY.render(text="No accounts") + "</div>")
+        return
+    upl_by_account = positions.groupby("account")["upl"].agg(["sum", "count"])
+    model = (tuple((b["account"], b["productType"], b["usdtEquity"], b["available"]) for b in breakdown),
+             tuple(upl_by_account.itertuples(name=None)), usdt_rate)
+    emit_html(st, memo_markup("accounts", model, lambda: _accounts_html(breakdown, upl_by_account, usdt_rate)))
+
+def _accounts_html(breakdown, upl_by_account, usdt_rate):
+    total_equity = sum(b["usdtEquity"] for b in breakdown) or 1.0
+    seen = set()
+    rows = []
+    for b in breakdown:
+        name, pt = b["account"], b["productType"]
+        equity, available = b["usdtEquity"], b["available"]
+        # 포지션 손익은 계정 단위로 집계 (같은 계정의 첫 상품 행에만 표시)
+        first = name not in seen
+        seen.add(name)
+        upl, count = None, None
+        if first:
+            upl, count = upl_by_account.loc[name].tolist() if name in upl_by_account.index else (0.0, 0)
+        rows.append(dict(
+            name=name if first else "", pt=pt, equity=equity, share=equity / total_equity * 100,
+            krw_html=_KRW_SUB.render(krw=equity * usdt_rate) if usdt_rate else "",
+            available=available, pnl_cls="text-up" if (upl or 0) >= 0 else "text-down",
+            upl_text="" if upl is None else f"${upl:+,.2f}", count_text="" if count is None else int(count),
+        ))
+    return _ACCOUNTS_HEADER + "\n" + _ACCOUNT_ROW.render_many(rows) + "</div>"
+
+def _render_investors(nav_data, usdt_rate=None):
+    investors = nav_data.get("investors", {})
+    model = (tuple(sorted(investors.items())), nav_data.get("nav", 1.0), nav_data.get("total_units", 1.0),
+             nav_data.get("hwm") or 0.0, usdt_rate)
+    emit_html(st, memo_markup("investors", model, lambda: _investors_html(nav_data, usdt_rate)))
+
+def _investors_html(nav_data, usdt_rate=None):
+    investors = nav_data.get("investors", {})
+    current_nav = nav_data.get("nav", 1.0)
+    total_units = nav_data.get("total_units", 1.0)
+
+    rows = []
+    for name, units in sorted(investors.items(), key=lambda x: x[1], reverse=True):
+        pct = (units / total_units * 100) if total_units else 0
+        val_usd = units * current_nav
+        initial = name.split()[-1][0] if " " in name else name[0]
+        # [추가] KRW 표시
+        krw_html = _KRW_SUB.render(krw=val_usd * usdt_rate) if usdt_rate else ""
+        rows.append(dict(initial=initial, name=name, units=units, pct=pct, val_usd=val_usd, krw_html=krw_html))
+
+    hwm = nav_data.get("hwm") or 0.0
+    hwm_html = f" · HWM: <span class='text-mono' style='color:#fff;'>${hwm:,.4f}</span>" if hwm > 0 else ""
+    footer = _INVESTORS_FOOTER.render(nav=current_nav, hwm_html=hwm_html)
+    return _INVESTORS_HEADER + "\n" + _INVESTOR_ROW.render_many(rows) + footer
@@ -22,6 +22,12 @@ def render_toolbar(positions=None, default_symbol="BTCUSDT", default_gran_label=
         c1, c2 = st.columns([0.4, 0.6], vertical_alignment="center")
 
         with c1:
+            # 보유 포지션 심볼 중에서 선택 (포지션이 없으면 기본 심볼만 표시)
+            symbols = {normalize_symbol(default_symbol), st.session_state.selected_symbol}
+            if positions is not None and len(positions):
+                symbols |= {normalize_symbol(s) for s in positions["symbol"] if s}
+            if len(symbols) > 1:
+                st.selectbox("Symbol", sorted(symbols), key="selected_symbol", label_visibility="collapsed")
             sym = st.session_state.selected_symbol
             st.markdown(f"""
             <div style='display:flex; align-items:center; gap:8px;'>
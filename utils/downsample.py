@@ -0,0 +1,103 @@
+# utils/downsample.py
+import numpy as np
+import pandas as pd
+
+# 차트 영역 폭(px) 기준 최대 포인트 수 (1278px 레이아웃의 3/4 컬럼 ≈ 950px)
+MAX_CHART_POINTS = 1000
+
+def _as_float(x: np.ndarray) -> np.ndarray:
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: 남길 포인트의 인덱스를 반환합니다.
+    첫/마지막 점은 항상 포함되고, 각 버킷에서 (이전 선택점, 다음 버킷 평균)과
+    가장 큰 삼각형을 만드는 점을 골라 고점/저점이 보존됩니다.
+    버킷 내부 면적 계산은 벡터화되어 있어 반복 횟수는 n_out에만 비례합니다.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # 포인트가 아주 많으면 버킷별 min/max로 먼저 후보를 줄임 (MinMaxLTTB)
+    if n > 8 * n_out:
+        pre = minmax_indices(y, 4 * n_out)
+        return pre[lttb_indices(np.asarray(x)[pre], np.asarray(y)[pre], n_out)]
+
+    xf, yf = _as_float(np.asarray(x)), np.asarray(y, dtype=np.float64)
+    # 첫/마지막 점을 제외한 n-2개를 n_out-2개 버킷으로 분할
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+
+    # 각 버킷의 평균 (다음 버킷 평균 c 계산용) -> reduceat으로 한 번에
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(xf[:-1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(yf[:-1], edges[:-1]) / counts
+    avg_x = np.append(avg_x, xf[-1])
+    avg_y = np.append(avg_y, yf[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        bx, by = xf[lo:hi], yf[lo:hi]
+        area = np.abs((xf[a] - cx) * (by - yf[a]) - (xf[a] - bx) * (cy - yf[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+
+    # 전체 최고점/최저점은 해당 버킷의 선택점을 대체해서라도 반드시 포함
+    for extreme in (int(np.argmax(yf)), int(np.argmin(yf))):
+        if 0 < extreme < n - 1:
+            out[np.searchsorted(edges, extreme, side="right")] = extreme
+    return out
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int = MAX_CHART_POINTS):
+    idx = lttb_indices(x, y, n_out)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """버킷별 최소/최대 점 인덱스 (완전 벡터화, 결과는 최대 n_out개)"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    n_buckets = n_out // 2
+    if n <= n_out or n_buckets < 1:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    pad = n_buckets * size - n
+    # 부족한 칸은 마지막 값으로 채워서 (n_buckets, size) 2D로 변형
+    grid = np.concatenate([y, np.full(pad, y[-1])]).reshape(n_buckets, size)
+    base = np.arange(n_buckets) * size
+    lo = np.minimum(base + grid.argmin(axis=1), n - 1)
+    hi = np.minimum(base + grid.argmax(axis=1), n - 1)
+    return np.unique(np.concatenate([[0, n - 1], lo, hi]))
+
+def downsample_ohlc(df: pd.DataFrame, n_out: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """
+    캔들 DataFrame(timestamp, open, high, low, close, vol, ...)을 n_out개 이하로 병합
+    (open=첫 값, high=최대, low=최소, close=마지막, 거래량=합)
+    """
+    n = len(df)
+    if n <= n_out:
+        return df
+    starts = (np.arange(n_out) * n / n_out).astype(np.int64)
+    ends = np.append(starts[1:], n) - 1
+    out = {
+        "timestamp": df["timestamp"].to_numpy()[starts],
+        "open": df["open"].to_numpy(dtype=np.float64)[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(dtype=np.float64), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(dtype=np.float64), starts),
+        "close": df["close"].to_numpy(dtype=np.float64)[ends],
+    }
+    for col in ("vol", "amount"):
+        if col in df.columns:
+            out[col] = np.add.reduceat(df[col].to_numpy(dtype=np.float64), starts)
+    return pd.DataFrame(out)
+
+def auto_downsample(x, y, threshold: int = MAX_CHART_POINTS):
+    """포인트 수가 threshold를 넘을 때만 LTTB 적용"""
+    if len(y) <= threshold:
+        return x, y
+    return lttb(x, y, threshold)
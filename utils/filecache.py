@@ -0,0 +1,84 @@
+# utils/filecache.py
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import fcntl  # 프로세스 간 잠금 (리눅스/맥)
+except ImportError:  # Windows 등에서는 스레드 잠금만 사용
+    fcntl = None
+
+_cache: Dict[Tuple[str, Callable], Tuple[Tuple[int, int], Any]] = {}
+_cache_lock = threading.Lock()
+_path_locks: Dict[str, threading.RLock] = {}
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def cached_read(path: str, parser: Callable[[str], Any], default: Any = None) -> Any:
+    """
+    파일을 stat해서 mtime/size가 바뀌었을 때만 parser(path)로 다시 읽음
+    캐시 키는 (경로, parser)이므로 같은 파일을 다른 형태로 파싱해도 각각 캐시됨
+    반환값은 모든 세션이 공유하므로 호출하는 쪽에서 수정하지 말 것
+    """
+    key = _stat_key(path)
+    if key is None:
+        return default
+    with _cache_lock:
+        hit = _cache.get((path, parser))
+        if hit is not None and hit[0] == key:
+            return hit[1]
+    value = parser(path)
+    with _cache_lock:
+        _cache[(path, parser)] = (key, value)
+    return value
+
+def invalidate(path: str) -> None:
+    with _cache_lock:
+        for k in [k for k in _cache if k[0] == path]:
+            del _cache[k]
+
+@contextmanager
+def file_lock(path: str):
+    """
+    같은 파일에 대한 쓰기를 직렬화 (스레드 + 프로세스)
+    path 옆의 '.lock' 파일에 flock을 잡습니다.
+    """
+    with _cache_lock:
+        tlock = _path_locks.setdefault(path, threading.RLock())
+    with tlock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".lock", "a") as lf:
+            fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+
+def atomic_write(path: str, data: str, encoding: str = "utf-8") -> None:
+    """임시 파일에 쓴 뒤 rename -> 읽는 쪽은 항상 완전한 파일만 보게 됨"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    invalidate(path)
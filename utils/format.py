@@ -1,5 +1,6 @@
 # utils/format.py
 import streamlit as st
+from utils.markup import compact_html
 
 def fnum(v):
     try: return float(v)
@@ -13,6 +14,5 @@ def normalize_symbol(sym: str) -> str:
 
 def render_html(st, block: str):
     # [핵심] 모든 줄의 앞뒤 공백을 제거하여 마크다운 코드 블록 인식을 방지함
-    lines = [line.strip() for line in block.split('\n') if line.strip()]
-    clean_html = "\n".join(lines)
-    st.markdown(clean_html, unsafe_allow_html=True)
+    # (자주 갱신되는 블록은 utils.markup.HtmlTemplate로 정의 시점에 한 번만 정리)
+    st.markdown(compact_html(block), unsafe_allow_html=True)
@@ -0,0 +1,82 @@
+# utils/markup.py
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Tuple
+
+ROW_CACHE_SIZE = 4096   # 컴포넌트별로 보관하는 행 마크업 개수
+# 자리표시자만 있는 줄 (빈 값이면 빈 줄이 되어 마크다운의 HTML 블록이 끊기므로 앞 줄에 붙임)
+_LONE_FIELD = re.compile(r"\n(\{\w+\})(?=\n|$)")
+
+def compact_html(block: str) -> str:
+    """모든 줄의 앞뒤 공백을 제거 (마크다운이 들여쓴 줄을 코드 블록으로 인식하지 않도록)"""
+    return "\n".join(line.strip() for line in block.split("\n") if line.strip())
+
+class HtmlTemplate:
+    """
+    str.format 자리표시자를 쓰는 HTML 템플릿
+    공백 정리는 정의 시점에 한 번만 하므로 render()는 치환만 수행합니다.
+    (CSS 등에 중괄호를 그대로 쓰려면 {{ }} 로 이스케이프)
+    """
+    __slots__ = ("source", "_format")
+
+    def __init__(self, source: str):
+        self.source = _LONE_FIELD.sub(r"\1", compact_html(source))
+        self._format = self.source.format
+
+    def render(self, **fields: Any) -> str:
+        return self._format(**fields)
+
+    def render_many(self, rows: Iterable[Dict[str, Any]]) -> str:
+        """여러 행을 리스트에 모아 한 번에 join (문자열 += 반복으로 인한 2차 복사 없음)"""
+        fmt = self._format
+        return "\n".join(fmt(**r) for r in rows)
+
+_lock = threading.Lock()
+_blocks: Dict[str, Tuple[int, Hashable, str]] = {}
+_rows: Dict[str, "OrderedDict[Hashable, str]"] = {}
+
+def memo_markup(component: str, model: Hashable, build: Callable[[], str]) -> str:
+    """
+    컴포넌트 입력(model)이 직전과 같으면 이전 마크업을 그대로 반환
+    (모든 세션이 공유. model은 마크업에 쓰이는 값만 담은 tuple)
+    해시는 빠른 비교용이고, 충돌 시 다른 값의 마크업을 내보내지 않도록 model 자체를 == 로 확인
+    """
+    key = hash(model)
+    with _lock:
+        hit = _blocks.get(component)
+        if hit is not None and hit[0] == key and hit[1] == model:
+            return hit[2]
+    markup = build()
+    with _lock:
+        _blocks[component] = (key, model, markup)
+    return markup
+
+def memo_rows(component: str, rows: Iterable[Hashable], build_row: Callable[[Any], str]) -> str:
+    """
+    행 단위 캐시: 값이 바뀐 행만 다시 만들고 나머지는 이전 마크업을 재사용
+    (LRU로 ROW_CACHE_SIZE개까지 보관)
+    """
+    parts = []
+    with _lock:
+        cache = _rows.setdefault(component, OrderedDict())
+        for row in rows:
+            markup = cache.get(row)
+            if markup is None:
+                markup = cache[row] = build_row(row)
+                if len(cache) > ROW_CACHE_SIZE:
+                    cache.popitem(last=False)
+            else:
+                cache.move_to_end(row)
+            parts.append(markup)
+    return "\n".join(parts)
+
+def clear_memo() -> None:
+    """memo_markup/memo_rows 캐시를 모두 비움 (벤치마크에서 캐시 없는 첫 렌더 비용을 잴 때)"""
+    with _lock:
+        _blocks.clear()
+        _rows.clear()
+
+def emit_html(st, markup: str):
+    """이미 정리된 마크업을 그대로 출력 (render_html과 달리 줄 단위 정리를 다시 하지 않음)"""
+    st.markdown(markup, unsafe_allow_html=True)
@@ -0,0 +1,154 @@
+# utils/telemetry.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RESERVOIR_SIZE = 1024            # 구간별로 보관하는 최근 측정값 개수 (백분위 계산용)
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = "hyperdash"
+
+class _Stage:
+    __slots__ = ("samples", "count", "total", "max")
+
+    def __init__(self):
+        self.samples = deque(maxlen=RESERVOIR_SIZE)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+_stages: Dict[str, _Stage] = {}
+_errors: Dict[Tuple[str, str], int] = {}
+_lock = threading.Lock()
+
+def observe(name: str, seconds: float):
+    with _lock:
+        st = _stages.get(name)
+        if st is None:
+            st = _stages[name] = _Stage()
+        st.samples.append(seconds)
+        st.count += 1
+        st.total += seconds
+        st.max = max(st.max, seconds)
+
+@contextmanager
+def span(name: str):
+    """with span("stage"): ... 블록 실행 시간을 기록 (예외가 나도 기록)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started)
+
+def timed(name: Optional[str] = None) -> Callable:
+    """함수 실행 시간을 기록하는 데코레이터 (이름 생략 시 모듈.함수명)"""
+    def deco(fn):
+        label = name or f"{fn.__module__}.{fn.__name__}"
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def count_error(source: str, code: Any):
+    with _lock:
+        key = (source, str(code))
+        _errors[key] = _errors.get(key, 0) + 1
+
+def stage_stats() -> List[Dict[str, Any]]:
+    """구간별 호출 수 / 평균 / p50 / p95 / p99 / 최대 (ms, 최근 RESERVOIR_SIZE개 기준)"""
+    import numpy as np  # 조회 시에만 필요 (측정 경로는 numpy 없이 동작)
+    with _lock:
+        items = [(name, np.fromiter(st.samples, dtype="float64"), st.count, st.total, st.max)
+                 for name, st in _stages.items()]
+    out = []
+    for name, samples, count, total, max_s in sorted(items):
+        qs = np.quantile(samples, QUANTILES) if len(samples) else [0.0] * len(QUANTILES)
+        out.append({
+            "stage": name,
+            "count": count,
+            "mean_ms": total / count * 1000 if count else 0.0,
+            **{f"p{int(q * 100)}_ms": float(v) * 1000 for q, v in zip(QUANTILES, qs)},
+            "max_ms": max_s * 1000,
+        })
+    return out
+
+def error_counts() -> List[Dict[str, Any]]:
+    with _lock:
+        return [{"source": s, "code": c, "count": n} for (s, c), n in sorted(_errors.items())]
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _errors.clear()
+
+def _label(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text() -> str:
+    """Prometheus text exposition 형식 (구간 지연은 summary, 에러/리미터는 counter/gauge)"""
+    lines = [
+        f"# HELP {METRIC_PREFIX}_stage_seconds Latency of instrumented stages.",
+        f"# TYPE {METRIC_PREFIX}_stage_seconds summary",
+    ]
+    import numpy as np
+    with _lock:
+        items = [(name, np.fromiter(st.samples, dtype="float64"), st.count, st.total)
+                 for name, st in _stages.items()]
+    for name, samples, count, total in sorted(items):
+        lbl = f'stage="{_label(name)}"'
+        if len(samples):
+            for q, v in zip(QUANTILES, np.quantile(samples, QUANTILES)):
+                lines.append(f'{METRIC_PREFIX}_stage_seconds{{{lbl},quantile="{q}"}} {v:.6f}')
+        lines.append(f"{METRIC_PREFIX}_stage_seconds_sum{{{lbl}}} {total:.6f}")
+        lines.append(f"{METRIC_PREFIX}_stage_seconds_count{{{lbl}}} {count}")
+
+    lines += [
+        f"# HELP {METRIC_PREFIX}_api_errors_total API responses that were not successful.",
+        f"# TYPE {METRIC_PREFIX}_api_errors_total counter",
+    ]
+    for e in error_counts():
+        lines.append(f'{METRIC_PREFIX}_api_errors_total{{source="{_label(e["source"])}",code="{_label(e["code"])}"}} {e["count"]}')
+
+    # 리미터 상태 (순환 import 방지를 위해 지연 import)
+    from services.ratelimit import get_limiter
+    usage = get_limiter().usage()
+    lines += [
+        f"# HELP {METRIC_PREFIX}_ratelimit_headroom_ratio Remaining token bucket capacity.",
+        f"# TYPE {METRIC_PREFIX}_ratelimit_headroom_ratio gauge",
+    ]
+    for u in usage:
+        lines.append(f'{METRIC_PREFIX}_ratelimit_headroom_ratio{{endpoint="{_label(u["endpoint"])}",key="{_label(u["key"])}"}} {u["headroom_pct"] / 100:.4f}')
+    lines += [
+        f"# HELP {METRIC_PREFIX}_ratelimit_throttled_total Calls rejected by the local budget.",
+        f"# TYPE {METRIC_PREFIX}_ratelimit_throttled_total counter",
+    ]
+    for u in usage:
+        lines.append(f'{METRIC_PREFIX}_ratelimit_throttled_total{{endpoint="{_label(u["endpoint"])}",key="{_label(u["key"])}"}} {u["throttled"]}')
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # 스크랩마다 stderr에 찍히지 않도록
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """GET http://host:port/metrics 를 제공하는 데몬 스레드 서버 (기본은 로컬에서만 접근)"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server